@@ -1,24 +1,67 @@
 # backend/app/backtest.py
 
+import argparse
 import backtrader as bt
 import datetime
+import os
 import sys
 import yfinance as yf
 import pandas as pd  # Import pandas for DataFrame manipulation
 
+from data_feeds.bar_store import BarStore
+from data_feeds.arrow_feed import ArrowBarFeed
+
 # Import strategies from the strategies package
 from strategies_tester.moving_average_crossover import MovingAverageCrossover
 from strategies_tester.momentum_strategy import MomentumStrategy
 from strategies_tester.breakout_strategy import BreakoutStrategy
 from strategies_tester.bollinger_bands_strategy import BollingerBandsStrategy
 from strategies_tester.ict_strategy import ICTStrategy  # Import the new ICT Strategy
+from strategies_tester.vectorized import SIGNAL_FUNCTIONS, run_vectorized_backtest, parity_report
+from strategies_tester.optimizer import DEFAULT_GRIDS, parameter_grid, random_parameters, optimize
+from strategies_tester.walk_forward import walk_forward
+from strategies_tester.analyzers import EquityCurve
+from strategies_tester.result_cache import ResultCache, source_digest
+from utils.logger import get_logger
+
+# Symbols with their Yahoo Finance tickers and security types
+SYMBOLS = {
+    'EURUSD': ('EURUSD=X', 'CASH'),
+    'GBPUSD': ('GBPUSD=X', 'CASH'),
+    'USDX': ('DX-Y.NYB', 'IND')
+}
 
-def run_backtest(strategy, data_feeds, initial_cash=100000, commission=0.001):
+def run_backtest(strategy, data_feeds, initial_cash=100000, commission=0.001, params=None, verbose=True, plot=True,
+                 cache=None, exactbars=False):
     """
     Runs the backtest for the given strategy and data feeds.
+    Returns a dictionary with the report figures and the 'equity' curve.
+    
+    With a ResultCache, a run whose strategy source, params, input bars and broker settings were
+    seen before returns the stored results without running Cerebro (unless a plot is requested).
+    exactbars is passed to Cerebro: 1 keeps only as many bars per line as the indicators need,
+    which cannot be plotted.
     """
-    cerebro = bt.Cerebro()
-    cerebro.addstrategy(strategy)
+    if exactbars and exactbars > 0:
+        plot = False
+    key = None
+    frames = [getattr(data.p, 'dataname', None) for data in data_feeds]
+    if cache is not None and all(isinstance(df, pd.DataFrame) for df in frames):
+        resolved = dict(strategy.params._getitems())
+        resolved.update(params or {})
+        key = cache.key(
+            strategy, resolved, frames, f"backtrader {bt.__version__} {source_digest(run_backtest)}",
+            initial_cash=initial_cash, commission=commission, feeds=[data._name for data in data_feeds]
+        )
+        cached = None if plot else cache.get(key)
+        if cached is not None:
+            if verbose:
+                print(f"\nStarting Portfolio Value: {initial_cash:.2f} (cached result)")
+                print_report(cached)
+            return cached
+
+    cerebro = bt.Cerebro(exactbars=exactbars)
+    cerebro.addstrategy(strategy, **(params or {}))
     
     for data in data_feeds:
         cerebro.adddata(data)
@@ -30,48 +73,109 @@ def run_backtest(strategy, data_feeds, initial_cash=100000, commission=0.001):
     cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe_ratio')
     cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
     cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trade_analyzer')
+    cerebro.addanalyzer(EquityCurve, _name='equity')
     
-    print(f"\nStarting Portfolio Value: {cerebro.broker.getvalue():.2f}")
     results = cerebro.run()
     strat = results[0]
-    print(f"Ending Portfolio Value: {cerebro.broker.getvalue():.2f}")
-    
-    # Retrieve and print analyzer results safely
-    print("\n--- Backtest Report ---")
-    
-    # Sharpe Ratio
-    sharpe = strat.analyzers.sharpe_ratio.get_analysis().get('sharperatio', 'N/A')
-    print(f"Sharpe Ratio: {sharpe}")
-    
-    # Drawdown
-    drawdown = strat.analyzers.drawdown.get_analysis().get('max', {}).get('drawdown', 'N/A')
-    print(f"Max Drawdown: {drawdown}%")
-    
-    # Trade Analyzer
     trade_analyzer = strat.analyzers.trade_analyzer.get_analysis()
+    closed_trades = trade_analyzer.get('total', {}).get('closed', 0)
+    wins = trade_analyzer.get('won', {}).get('total', 0)
     
-    # Total Trades
-    total_trades = trade_analyzer.get('total', {}).get('total', 'N/A')
-    print(f"Total Trades: {total_trades}")
-    
-    # Wins
-    wins = trade_analyzer.get('won', {}).get('total', 'N/A')
-    print(f"Wins: {wins}")
-    
-    # Losses
-    losses = trade_analyzer.get('lost', {}).get('total', 'N/A')
-    print(f"Losses: {losses}")
-    
-    # Win Rate
-    win_rate = trade_analyzer.get('won', {}).get('perc', {}).get('total', 'N/A')
-    print(f"Win Rate: {win_rate}%")
+    report = {
+        'final_value': cerebro.broker.getvalue(),
+        'sharpe': strat.analyzers.sharpe_ratio.get_analysis().get('sharperatio'),
+        'max_drawdown': strat.analyzers.drawdown.get_analysis().get('max', {}).get('drawdown', 0.0),
+        'total_trades': trade_analyzer.get('total', {}).get('total', 0),
+        'closed_trades': closed_trades,
+        'wins': wins,
+        'losses': trade_analyzer.get('lost', {}).get('total', 0),
+        'win_rate': 100.0 * wins / closed_trades if closed_trades else None,
+        'pnl': trade_analyzer.get('pnl', {}).get('net', {}).get('total', 0.0),
+        'equity': strat.analyzers.equity.get_analysis(),
+    }
+    if key is not None:
+        cache.put(key, report)
     
-    # Optional: Total PnL
-    pnl = trade_analyzer.get('pnl', {}).get('net', {}).get('total', 'N/A')
-    print(f"Total PnL: {pnl}")
+    if verbose:
+        print(f"\nStarting Portfolio Value: {initial_cash:.2f}")
+        print_report(report)
     
     # Plot the results without volume to prevent axis limit errors
-    cerebro.plot(volume=False)
+    if plot:
+        cerebro.plot(volume=False)
+    return report
+
+def print_report(report):
+    """
+    Prints the report figures returned by run_backtest or run_vectorized_backtest.
+    """
+    print(f"Ending Portfolio Value: {report['final_value']:.2f}")
+    print("\n--- Backtest Report ---")
+    print(f"Sharpe Ratio: {report['sharpe'] if report['sharpe'] is not None else 'N/A'}")
+    print(f"Max Drawdown: {report['max_drawdown']}%")
+    print(f"Total Trades: {report['total_trades']}")
+    print(f"Wins: {report['wins']}")
+    print(f"Losses: {report['losses']}")
+    print(f"Win Rate: {report['win_rate'] if report['win_rate'] is not None else 'N/A'}%")
+    print(f"Total PnL: {report['pnl']}")
+
+def download_yfinance(ticker, start, end, interval='1m'):
+    """
+    Download bars from Yahoo Finance with lowercase OHLCV columns.
+    """
+    df = yf.download(ticker, start=start, end=end, interval=interval, progress=False)
+    if df.empty:
+        return df
+
+    # yfinance returns (Price, Ticker) MultiIndex columns; keep the price level
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    # Rename columns to match Backtrader's expectations
+    rename_map = {
+        'Open': 'open',
+        'High': 'high',
+        'Low': 'low',
+        'Close': 'close',
+        'Volume': 'volume'
+    }
+    df = df.rename(columns={col: rename_map.get(str(col), str(col)) for col in df.columns})
+    return df[[col for col in rename_map.values() if col in df.columns]]
+
+def load_bars(store, ticker, sec_type, start, end, interval='1m'):
+    """
+    Load bars from the local bar store, downloading only the range not cached yet.
+    """
+    df = store.get(
+        ('yfinance', ticker, sec_type, interval),
+        start,
+        end,
+        lambda range_start, range_end: download_yfinance(ticker, range_start, range_end, interval)
+    )
+    # Backtrader works with naive datetimes; the store keeps UTC
+    if not df.empty:
+        df.index = df.index.tz_localize(None)
+    return df
+
+def stream_feeds(store, start, end, interval='1m'):
+    """
+    Tops up the bar store and returns one memory-mapped Arrow feed per symbol,
+    so the bars are streamed in chunks instead of loaded into DataFrames.
+    """
+    data_feeds = []
+    for name, (ticker, sec_type) in SYMBOLS.items():
+        key = ('yfinance', ticker, sec_type, interval)
+        store.top_up(
+            key,
+            start,
+            end,
+            lambda range_start, range_end, ticker=ticker: download_yfinance(ticker, range_start, range_end, interval)
+        )
+        if not os.path.exists(store.path(key)):
+            print(f"No data found for {ticker}. Exiting.")
+            sys.exit(1)
+        data_feeds.append(ArrowBarFeed(path=store.export_arrow(key, start, end), name=name))
+    return data_feeds
 
 def get_user_choice():
     """
@@ -88,10 +192,134 @@ def get_user_choice():
     choice = input("Enter the number corresponding to your choice (1-5): ")
     return choice
 
+def parse_args():
+    """
+    Parses the command line options.
+    """
+    parser = argparse.ArgumentParser(description="Backtest a trading strategy")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--vectorized', action='store_true',
+                      help="Use the vectorized engine (strategies 1-4, first symbol only)")
+    mode.add_argument('--parity', action='store_true',
+                      help="Compare the vectorized engine against backtrader on the first symbol")
+    mode.add_argument('--stream', action='store_true',
+                      help="Stream bars from memory-mapped Arrow files with reduced-memory Cerebro (exactbars=1)")
+    mode.add_argument('--optimize', choices=['grid', 'random'],
+                      help="Sweep strategy parameters in parallel instead of a single run")
+    mode.add_argument('--walk-forward', metavar='IN_SAMPLE:OUT_OF_SAMPLE',
+                      help="Walk-forward optimization, window lengths in bars or time spans (e.g. 3D:1D)")
+    parser.add_argument('--days', type=int, default=7, help="Days of history to backtest (default: 7)")
+    parser.add_argument('--step', default=None, help="Walk-forward window step (default: out-of-sample length)")
+    parser.add_argument('--random', action='store_true',
+                        help="Search --samples random combinations per --walk-forward window instead of the grid")
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=SPEC',
+                        help="Search space for one parameter: v1,v2,... (grid or random) or low:high (random)")
+    parser.add_argument('--samples', type=int, default=100, help="Combinations drawn by --optimize random or --random")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for --optimize random or --random")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--top', type=int, default=10, help="Number of ranked results to print")
+    parser.add_argument('--cache', nargs='?', const='data/results', default=None, metavar='DIR',
+                        help="Reuse results of identical runs from a result cache (default dir: data/results)")
+    return parser.parse_args()
+
+def _parse_value(value):
+    """
+    Parses a parameter value as int, float or string.
+    """
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+def parse_search_space(specs, strategy):
+    """
+    Builds the search space from --param options, falling back to the strategy's default grid.
+    """
+    if not specs:
+        return dict(DEFAULT_GRIDS.get(strategy, {}))
+    space = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if ':' in values:
+            low, high = values.split(':', 1)
+            space[name] = (_parse_value(low), _parse_value(high))
+        else:
+            space[name] = [_parse_value(value) for value in values.split(',')]
+    return space
+
+def build_combinations(args, strategy):
+    """
+    Builds the parameter combinations to search from the command line options.
+    """
+    space = parse_search_space(args.param, strategy)
+    if not space:
+        print(f"No search space for {strategy.__name__}; pass --param NAME=SPEC. Exiting.")
+        sys.exit(1)
+    if args.optimize == 'random' or args.random:
+        return random_parameters(space, args.samples, args.seed)
+    if any(isinstance(values, tuple) for values in space.values()):
+        print("Ranges (low:high) are only supported by --optimize random and --random. Exiting.")
+        sys.exit(1)
+    return parameter_grid(space)
+
+def _parse_length(value):
+    """
+    Parses a window length: a number of bars or a time span such as '3D'.
+    """
+    return int(value) if value.isdigit() else value
+
+def run_walk_forward(args, strategy, frames):
+    """
+    Runs a walk-forward optimization and prints the per-window and out-of-sample results.
+    """
+    if strategy not in SIGNAL_FUNCTIONS:
+        print(f"{strategy.__name__} has no vectorized implementation. Exiting.")
+        sys.exit(1)
+    in_sample, _, out_of_sample = args.walk_forward.partition(':')
+    combinations = build_combinations(args, strategy)
+    
+    print(f"\nWalk-forward {strategy.__name__}: in-sample {in_sample}, out-of-sample {out_of_sample}, "
+          f"{len(combinations)} parameter combinations per window...")
+    results = walk_forward(
+        strategy,
+        frames,
+        combinations,
+        _parse_length(in_sample),
+        _parse_length(out_of_sample),
+        step=_parse_length(args.step) if args.step else None,
+        workers=args.workers
+    )
+    
+    print("\n--- Walk-Forward Windows ---")
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(results['windows'])
+    print("\n--- Stitched Out-of-Sample Results ---")
+    print_report(results['metrics'])
+    return results
+
+def run_optimization(args, strategy, frames):
+    """
+    Runs a parallel parameter sweep and prints the best combinations.
+    """
+    combinations = build_combinations(args, strategy)
+    
+    print(f"\nOptimizing {strategy.__name__} over {len(combinations)} parameter combinations...")
+    results = optimize(strategy, frames, combinations, workers=args.workers, cache_root=args.cache)
+    
+    print("\n--- Optimization Results (ranked by Sharpe, drawdown and PnL) ---")
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(results.head(args.top))
+    return results
+
 def main():
     """
     Main function to execute the backtest based on user-selected strategy.
     """
+    args = parse_args()
+    logger = get_logger('Backtest')
+    cache = ResultCache(args.cache) if args.cache else None
     choice = get_user_choice()
 
     strategy_map = {
@@ -109,66 +337,28 @@ def main():
         print("Invalid choice. Exiting.")
         sys.exit(1)
 
-    # Define symbols and their Yahoo Finance tickers
-    symbols = {
-        'EURUSD': 'EURUSD=X',
-        'GBPUSD': 'GBPUSD=X',
-        'USDX': 'DX-Y.NYB'
-    }
-
-    # Download data using yfinance
-    # Set start_date to 30 days before today
-    start_date = datetime.datetime.now() - datetime.timedelta(days=7)
-    end_date = datetime.datetime.now()
-    # df = yf.download(ticker, start=start_date, end=end_date, interval='1m')
+    # Load data from the local bar store (only missing bars are downloaded via yfinance)
+    # Set start_date to --days (default 7) days before today
+    start_date = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=args.days)
+    end_date = datetime.datetime.now(datetime.timezone.utc)
+    store = BarStore()
 
+    if args.stream:
+        print(f"\nStreaming EUR/USD, GBP/USD and USDX from {start_date.date()} to {end_date.date()}...")
+        run_backtest(strategy, stream_feeds(store, start_date, end_date), exactbars=1, cache=cache)
+        return
 
-    print(f"\nDownloading data for EUR/USD, GBP/USD, and USDX from {start_date.date()} to {end_date.date()}...")
+    print(f"\nLoading data for EUR/USD, GBP/USD, and USDX from {start_date.date()} to {end_date.date()}...")
 
     data_feeds = []
-    for name, ticker in symbols.items():
-        print(f"\nDownloading {name} data...")
-        df = yf.download(ticker, start=start_date, end=end_date, interval='1m')
+    for name, (ticker, sec_type) in SYMBOLS.items():
+        print(f"\nLoading {name} data...")
+        df = load_bars(store, ticker, sec_type, start_date, end_date)
         
         if df.empty:
             print(f"No data found for {ticker}. Exiting.")
             sys.exit(1)
         
-        # Debug: Print the first few rows and columns
-        print(f"\nDownloaded DataFrame for {name}:")
-        print(df.head())
-        print("\nDataFrame Columns:")
-        print(df.columns.values)
-        
-        # Ensure df.columns are single-level and strings
-        if isinstance(df.columns, pd.MultiIndex):
-            # Flatten the MultiIndex by joining the tuples into single strings
-            df.columns = ['_'.join(col).strip() for col in df.columns.values]
-        else:
-            # Convert all column names to strings (if they aren't already)
-            df.columns = [str(col) for col in df.columns]
-        
-        # Debug: Print the processed columns
-        print("\nProcessed DataFrame Columns:")
-        print(df.columns.values)
-        
-        # Rename columns to match Backtrader's expectations
-        # Mapping original columns to Backtrader's expected columns
-        rename_map = {
-            'Open': 'open',
-            'High': 'high',
-            'Low': 'low',
-            'Close': 'close',
-            'Volume': 'volume'
-        }
-        
-        # Rename the columns
-        df = df.rename(columns=rename_map)
-        
-        # Debug: Print the renamed columns
-        print("\nRenamed DataFrame Columns:")
-        print(df.columns.values)
-        
         # Re-order columns to match Backtrader's expectations
         required_order = ['open', 'high', 'low', 'close', 'volume']
         try:
@@ -177,9 +367,7 @@ def main():
             print(f"Missing required column: {e}. Exiting.")
             sys.exit(1)
         
-        # Debug: Print the final DataFrame head
-        print("\nFinal DataFrame Head:")
-        print(df.head())
+        logger.debug(f"{name} bars:\n{df.head()}")
         
         # Check for any NaN values in critical columns
         if df[required_order].isnull().values.any():
@@ -190,8 +378,30 @@ def main():
         data = bt.feeds.PandasData(dataname=df, name=name)
         data_feeds.append(data)
     
+    if args.walk_forward:
+        run_walk_forward(args, strategy, {data._name: data.p.dataname for data in data_feeds})
+        return
+
+    if args.optimize:
+        run_optimization(args, strategy, {data._name: data.p.dataname for data in data_feeds})
+        return
+
+    if args.vectorized or args.parity:
+        if strategy not in SIGNAL_FUNCTIONS:
+            print(f"{strategy.__name__} has no vectorized implementation. Exiting.")
+            sys.exit(1)
+        # The strategies only trade the first data feed
+        df = data_feeds[0].p.dataname
+        if args.parity:
+            print(f"\n--- Parity: backtrader vs vectorized on {data_feeds[0]._name} ---")
+            for metric, (expected, actual, match) in parity_report(strategy, df).items():
+                print(f"{metric}: {expected} / {actual} {'OK' if match else 'MISMATCH'}")
+        else:
+            print_report(run_vectorized_backtest(strategy, df, cache=cache))
+        return
+
     # Run backtest with the selected strategy and data feeds
-    run_backtest(strategy, data_feeds)
+    run_backtest(strategy, data_feeds, cache=cache)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,221 @@
+# backend/app/batch_backtest.py
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import backtrader as bt
+import pandas as pd
+import yaml
+
+import strategies_tester
+from backtest import SYMBOLS, load_bars, run_backtest
+from data_feeds.bar_store import BarStore
+from strategies_tester.vectorized import SIGNAL_FUNCTIONS, run_vectorized_backtest
+from strategies_tester.result_cache import ResultCache
+from utils.logger import get_logger
+
+# Non-interactive batch backtests. A job spec lists strategies, symbol sets and date ranges; every
+# combination becomes one job. Bars are topped up once in the parent process, then the jobs run
+# headlessly (no plots, no printing) in a process pool reading the bar store, and one row of
+# metrics per job is written to a JSON or Parquet results file.
+
+logger = get_logger('BatchBacktest')
+
+RESULT_METRICS = (
+    'final_value', 'sharpe', 'max_drawdown', 'total_trades', 'closed_trades', 'wins', 'losses', 'win_rate', 'pnl'
+)
+
+
+def expand_jobs(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Expand a job spec into one job per (strategy, symbol set, date range).
+
+    Spec keys:
+      strategies: names of strategies_tester classes, or {name, params} dictionaries
+      symbols: symbol names, or lists of names for multi-feed strategies (the first one is traded)
+      date_ranges: {start, end} dictionaries; a date-only end includes that whole day
+      defaults: interval, initial_cash, commission, engine ('backtrader', 'vectorized' or 'auto')
+
+    :param spec: Parsed job spec
+    :return: List of job dictionaries
+    """
+    defaults = {'interval': '1m', 'initial_cash': 100000, 'commission': 0.001, 'engine': 'backtrader'}
+    defaults.update(spec.get('defaults', {}))
+    strategies = [s if isinstance(s, dict) else {'name': s} for s in spec.get('strategies', [])]
+    symbol_sets = [s if isinstance(s, list) else [s] for s in spec.get('symbols', [])]
+    jobs = []
+    for strategy, symbols, date_range in itertools.product(strategies, symbol_sets, spec.get('date_ranges', [])):
+        job = dict(defaults)
+        job.update(
+            id=len(jobs),
+            strategy=strategy['name'],
+            params=strategy.get('params', {}),
+            symbols=symbols,
+            start=str(date_range['start']),
+            end=str(date_range['end'])
+        )
+        jobs.append(job)
+    return jobs
+
+
+def job_span(job: Dict[str, Any]) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    [start, end) span of a job's bars. An end without a time of day (midnight) includes that day.
+    """
+    start, end = pd.Timestamp(job['start']), pd.Timestamp(job['end'])
+    if end == end.normalize():
+        end += pd.Timedelta(days=1)
+    return start, end
+
+
+def _bar_key(name: str, interval: str):
+    ticker, sec_type = SYMBOLS[name]
+    return ('yfinance', ticker, sec_type, interval)
+
+
+def prefetch(store: BarStore, jobs: List[Dict[str, Any]]):
+    """
+    Top up the bar store for every (symbol, interval, date range) the jobs need, once each.
+
+    Runs in the parent process so downloads and Parquet writes never race between workers.
+    """
+    needed = {
+        (name, job['interval'], *job_span(job))
+        for job in jobs for name in job['symbols'] if name in SYMBOLS
+    }
+    for name, interval, start, end in sorted(needed):
+        ticker, sec_type = SYMBOLS[name]
+        load_bars(store, ticker, sec_type, start, end, interval)
+
+
+def run_job(job: Dict[str, Any], store_root: str, cache_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run one backtest job headlessly and return its result row.
+
+    Failures are reported in the row rather than raised, so one bad job does not stop the batch.
+    With a result cache configured, jobs whose inputs did not change are read from it.
+    """
+    row = {
+        'id': job['id'],
+        'strategy': job['strategy'],
+        'symbols': ','.join(job['symbols']),
+        'start': job['start'],
+        'end': job['end'],
+        'interval': job['interval'],
+        'params': json.dumps(job['params'], sort_keys=True, default=str),
+    }
+    started = time.perf_counter()
+    try:
+        strategy = getattr(strategies_tester, job['strategy'])
+        cache = ResultCache(**cache_config) if cache_config else None
+        store = BarStore(store_root)
+        start, end = job_span(job)
+        end = end.tz_localize('UTC') if end.tzinfo is None else end.tz_convert('UTC')  # The store keeps UTC
+        frames = {}
+        for name in job['symbols']:
+            if name not in SYMBOLS:
+                raise ValueError(f"Unknown symbol {name}")
+            df = store.load(_bar_key(name, job['interval']), start, end)
+            df = df[df.index < end]  # The store's end bound is inclusive
+            if df.empty:
+                raise ValueError(f"No cached bars for {name}")
+            df.index = df.index.tz_localize(None)
+            frames[name] = df[['open', 'high', 'low', 'close', 'volume']]
+
+        engine = job['engine']
+        if engine == 'auto':
+            engine = 'vectorized' if strategy in SIGNAL_FUNCTIONS else 'backtrader'
+        row['engine'] = engine
+        if engine == 'vectorized':
+            results = run_vectorized_backtest(
+                strategy, next(iter(frames.values())), job['params'], job['initial_cash'], job['commission'],
+                cache=cache
+            )
+        else:
+            data_feeds = [bt.feeds.PandasData(dataname=df, name=name) for name, df in frames.items()]
+            results = run_backtest(
+                strategy, data_feeds, initial_cash=job['initial_cash'], commission=job['commission'],
+                params=job['params'], verbose=False, plot=False, cache=cache
+            )
+        row.update({metric: results.get(metric) for metric in RESULT_METRICS})
+        row['status'] = 'ok'
+        row['error'] = None
+    except Exception as e:
+        row['status'] = 'error'
+        row['error'] = f"{type(e).__name__}: {e}"
+    row['elapsed'] = time.perf_counter() - started
+    return row
+
+
+def write_results(rows: List[Dict[str, Any]], path: str):
+    """
+    Write result rows to Parquet (.parquet) or compact JSON records (anything else).
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df = df.sort_values('id')
+    if path.endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_json(path, orient='records')
+
+
+def run_batch(spec: Dict[str, Any], workers: Optional[int] = None, output: Optional[str] = None) -> pd.DataFrame:
+    """
+    Run every job of a spec and write the results file.
+
+    :param spec: Parsed job spec (see expand_jobs); 'output', 'bar_store' and 'result_cache'
+                 ({root, max_entries, max_bytes}) keys are optional
+    :param workers: Number of worker processes (all cores if None)
+    :param output: Results path, overriding the spec's 'output'
+    :return: DataFrame with one row per job
+    """
+    jobs = expand_jobs(spec)
+    store_root = spec.get('bar_store', 'data/bars')
+    output = output or spec.get('output', 'results/backtests.parquet')
+    logger.info(f"Running {len(jobs)} backtest jobs")
+    if not jobs:
+        logger.warning("The job spec has no strategies, symbols or date ranges to combine")
+        write_results([], output)
+        return pd.DataFrame()
+
+    prefetch(BarStore(store_root), jobs)
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(run_job, job, store_root, spec.get('result_cache')) for job in jobs]
+        for future in futures:
+            row = future.result()
+            if row['status'] != 'ok':
+                logger.warning(f"Job {row['id']} ({row['strategy']} {row['symbols']}) failed: {row['error']}")
+            rows.append(row)
+
+    write_results(rows, output)
+    failed = sum(row['status'] != 'ok' for row in rows)
+    logger.info(f"Finished {len(rows)} jobs ({failed} failed); results written to {output}")
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a batch of backtests from a job spec")
+    parser.add_argument('spec', help="YAML or JSON job spec")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--output', default=None, help="Results file (.parquet or .json)")
+    args = parser.parse_args()
+
+    with open(args.spec, 'r') as file:
+        spec = yaml.safe_load(file)  # JSON is valid YAML
+    results = run_batch(spec, workers=args.workers, output=args.output)
+    sys.exit(1 if results.empty or (results['status'] != 'ok').all() else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# connections/__init__.py
+
+from .ibkr_pool import IBConnectionPool
+
+__all__ = ['IBConnectionPool']
@@ -0,0 +1,119 @@
+# connections/ibkr_pool.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List
+from ib_insync import IB
+from utils.logger import get_logger
+from utils.rate_limiter import MessageThrottle
+
+
+class IBConnectionPool:
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize a pool of IBKR sessions shared by data feeds and brokers.
+
+        Each session connects with its own client ID (clientId, clientId + 1, ...), so
+        components leasing from the pool never collide on the TWS side.
+
+        Every session has its own message throttle (message_rate, message_burst), shared by all
+        components leasing it, since IBKR enforces its message rate per client connection.
+
+        :param config: Broker configuration (host, port, clientId, pool_size, message_rate, message_burst)
+        """
+        self.host = config.get('host', '127.0.0.1')
+        self.port = config.get('port', 7497)
+        self.base_client_id = config.get('clientId', 1)
+        self.size = max(1, config.get('pool_size', 2))
+        self.sessions: List[IB] = [IB() for _ in range(self.size)]
+        self.leases: Dict[int, int] = {id(ib): 0 for ib in self.sessions}
+        self.throttles: Dict[int, MessageThrottle] = {id(ib): MessageThrottle.from_config(config) for ib in self.sessions}
+        self.logger = get_logger('IBConnectionPool')
+        self._lock = asyncio.Lock()
+
+    async def _connect_session(self, index: int):
+        """
+        Connect a single session if it is not connected yet.
+        """
+        ib = self.sessions[index]
+        if ib.isConnected():
+            return
+        client_id = self.base_client_id + index
+        try:
+            await ib.connectAsync(self.host, self.port, clientId=client_id)
+            if ib.isConnected():
+                self.logger.info(f"Pool session connected to IBKR (clientId={client_id})")
+            else:
+                self.logger.error(f"Failed to connect pool session (clientId={client_id})")
+        except asyncio.CancelledError:
+            self.logger.info("Connection attempt cancelled.")
+            raise
+        except Exception as e:
+            self.logger.error(f"API connection failed for clientId={client_id}: {e}")
+
+    async def start(self):
+        """
+        Connect every session in the pool concurrently.
+        """
+        async with self._lock:
+            await asyncio.gather(*[self._connect_session(i) for i in range(self.size)])
+
+    async def lease(self) -> IB:
+        """
+        Lease the least-loaded connected session, reconnecting sessions whose connection was lost.
+
+        Sessions that cannot connect are skipped, in order of load, and never counted as leased.
+
+        :return: Connected IB session (callers must not disconnect it; use release())
+        :raises ConnectionError: If no session of the pool can connect
+        """
+        async with self._lock:
+            for index in sorted(range(self.size), key=lambda i: self.leases[id(self.sessions[i])]):
+                await self._connect_session(index)
+                ib = self.sessions[index]
+                if ib.isConnected():
+                    self.leases[id(ib)] += 1
+                    return ib
+            raise ConnectionError(f"No IBKR pool session could connect to {self.host}:{self.port}")
+
+    def throttle(self, ib: IB) -> MessageThrottle:
+        """
+        Message throttle of a pool session; every call sent on the session must go through it.
+        """
+        return self.throttles[id(ib)]
+
+    def throttle_stats(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Per-lane throttle counters of each session, keyed by client ID.
+        """
+        return {
+            self.base_client_id + index: self.throttles[id(ib)].stats()
+            for index, ib in enumerate(self.sessions)
+        }
+
+    def release(self, ib: IB):
+        """
+        Return a leased session to the pool. The connection stays open for other users.
+        """
+        if id(ib) in self.leases and self.leases[id(ib)] > 0:
+            self.leases[id(ib)] -= 1
+
+    @asynccontextmanager
+    async def session(self):
+        """
+        Async context manager leasing a session for the duration of the block.
+        """
+        ib = await self.lease()
+        try:
+            yield ib
+        finally:
+            self.release(ib)
+
+    async def stop(self):
+        """
+        Disconnect every session in the pool.
+        """
+        for ib in self.sessions:
+            if ib.isConnected():
+                ib.disconnect()
+        self.logger.info("IBKR connection pool closed.")
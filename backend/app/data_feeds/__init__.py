@@ -1,5 +1,7 @@
 # data_feed/__init__.py
 
 from .ibkr_feed import IBKRDataFeed
+from .history_scheduler import HistoricalRequestScheduler
+from .bar_store import BarStore
 
-__all__ = ['IBKRDataFeed']
+__all__ = ['IBKRDataFeed', 'HistoricalRequestScheduler', 'BarStore']
@@ -0,0 +1,88 @@
+# data_feeds/arrow_feed.py
+
+import backtrader as bt
+import numpy as np
+import pyarrow as pa
+from backtrader.linebuffer import LineBuffer
+from utils.helpers import ns_to_num
+
+
+class ArrowBarFeed(bt.feed.DataBase):
+    """
+    Backtrader feed streaming bars from a memory-mapped Arrow IPC file (see BarStore.export_arrow).
+
+    Only one record batch is decoded at a time and the file itself is paged in by the OS, so the
+    feed's memory use does not grow with the length of the history. Combine with
+    cerebro's exactbars to keep the line buffers bounded as well.
+    """
+
+    params = (
+        ('path', None),
+    )
+
+    def start(self):
+        super(ArrowBarFeed, self).start()
+        self._source = pa.memory_map(self.p.path, 'r')
+        self._reader = pa.ipc.open_file(self._source)
+        self._batch_index = 0
+        self._rows = []
+        self._row = 0
+
+    def qbuffer(self, savemem=0, replaying=False):
+        # Keep one spare slot, so a bar taken back by rewind() does not push history out of the buffer
+        super(ArrowBarFeed, self).qbuffer(savemem=savemem, replaying=True)
+
+    def rewind(self, size=1):
+        """
+        Take back bars loaded ahead of the other feeds.
+
+        Cerebro rewinds a feed whose next bar is later than the other feeds' bars. The bounded
+        buffers of exactbars cannot move their index back, so the bar would be delivered early
+        and the one before it skipped; drop it instead and load it again on the next call.
+        """
+        if self.lines.datetime.mode != LineBuffer.QBuffer:
+            super(ArrowBarFeed, self).rewind(size)
+            return
+        self.backwards(size=size, force=True)
+        self._row -= size
+
+    def stop(self):
+        super(ArrowBarFeed, self).stop()
+        self._rows = []
+        self._reader = None
+        if getattr(self, '_source', None) is not None:
+            self._source.close()
+            self._source = None
+
+    def _next_batch(self) -> bool:
+        while self._batch_index < self._reader.num_record_batches:
+            batch = self._reader.get_batch(self._batch_index)
+            self._batch_index += 1
+            if batch.num_rows == 0:
+                continue
+            columns = batch.schema.names
+            dates = ns_to_num(batch.column('datetime').to_numpy())
+            zeros = np.zeros(batch.num_rows)
+            values = [
+                batch.column(c).to_numpy() if c in columns else zeros
+                for c in ('open', 'high', 'low', 'close', 'volume')
+            ]
+            self._rows = list(zip(dates.tolist(), *(v.tolist() for v in values)))
+            self._row = 0
+            return True
+        return False
+
+    def _load(self) -> bool:
+        if self._row >= len(self._rows) and not self._next_batch():
+            return False
+        dt, open_, high, low, close, volume = self._rows[self._row]
+        self._row += 1
+        lines = self.lines
+        lines.datetime[0] = dt
+        lines.open[0] = open_
+        lines.high[0] = high
+        lines.low[0] = low
+        lines.close[0] = close
+        lines.volume[0] = volume
+        lines.openinterest[0] = 0.0
+        return True
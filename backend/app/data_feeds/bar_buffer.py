@@ -0,0 +1,121 @@
+# data_feeds/bar_buffer.py
+
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+from models import Bar
+
+BAR_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class BarRingBuffer:
+    def __init__(self, capacity: int, indicator_columns: Sequence[str] = ()):
+        """
+        Initialize a fixed-capacity bar buffer for one symbol.
+
+        All storage is preallocated. Every row is written twice, at slot i and i + capacity,
+        so the most recent N rows are always one contiguous slice and can be returned as
+        zero-copy NumPy views without reordering.
+
+        :param capacity: Number of bars retained
+        :param indicator_columns: Extra float columns stored alongside OHLCV
+        """
+        if capacity <= 0:
+            raise ValueError("Bar buffer capacity must be positive")
+        self.capacity = capacity
+        self.columns = BAR_FIELDS + tuple(c for c in indicator_columns if c not in BAR_FIELDS)
+        self._timestamps = np.zeros(2 * capacity, dtype='datetime64[ns]')
+        self._data = {column: np.full(2 * capacity, np.nan) for column in self.columns}
+        self.head = 0   # Slot the next bar is written to
+        self.count = 0  # Number of bars currently held (<= capacity)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, bar: Bar, **indicators: float):
+        """
+        Append one bar, overwriting the oldest one when the buffer is full.
+
+        :param bar: Bar record (its timestamp is stored as naive UTC)
+        :param indicators: Indicator values for this bar, keyed by column name (NaN if omitted)
+        """
+        slot, mirror = self.head, self.head + self.capacity
+        self._timestamps[slot] = self._timestamps[mirror] = np.datetime64(bar.epoch_us(), 'us')
+        data = self._data
+        for column in BAR_FIELDS:
+            value = getattr(bar, column)
+            data[column][slot] = data[column][mirror] = np.nan if value is None else value
+        for column in self.columns[len(BAR_FIELDS):]:
+            value = indicators.get(column)
+            data[column][slot] = data[column][mirror] = np.nan if value is None else value
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def extend(self, df: pd.DataFrame):
+        """
+        Append the tail of a DataFrame (DatetimeIndex, OHLCV and/or indicator columns) in one vectorized write.
+
+        :param df: Bars to append, oldest first
+        """
+        df = df.iloc[-self.capacity:]
+        rows = len(df)
+        if rows == 0:
+            return
+        slots = (self.head + np.arange(rows)) % self.capacity
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        timestamps = index.to_numpy(dtype='datetime64[ns]')
+        self._timestamps[slots] = self._timestamps[slots + self.capacity] = timestamps
+        for column, values in self._data.items():
+            column_values = df[column].to_numpy(dtype=float) if column in df.columns else np.nan
+            values[slots] = values[slots + self.capacity] = column_values
+        self.head = (self.head + rows) % self.capacity
+        self.count = min(self.count + rows, self.capacity)
+
+    def set_latest(self, column: str, value: Optional[float]):
+        """
+        Set a column value on the most recent bar (e.g. an indicator computed after the bar arrived).
+        """
+        if self.count == 0:
+            raise IndexError("Bar buffer is empty")
+        slot = (self.head - 1) % self.capacity
+        value = np.nan if value is None else value
+        self._data[column][slot] = self._data[column][slot + self.capacity] = value
+
+    def _window(self, n: Optional[int]) -> slice:
+        n = self.count if n is None else min(n, self.count)
+        end = self.head + self.capacity
+        return slice(end - n, end)
+
+    def view(self, column: str, n: Optional[int] = None) -> np.ndarray:
+        """
+        Zero-copy view of a column over the most recent n bars (all held bars if n is None), oldest first.
+
+        The view is only valid until the next append; copy it if it must outlive that.
+        """
+        return self._data[column][self._window(n)]
+
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        Zero-copy view of the timestamps of the most recent n bars, oldest first.
+        """
+        return self._timestamps[self._window(n)]
+
+    def latest(self, column: str) -> float:
+        """
+        Value of a column on the most recent bar.
+        """
+        if self.count == 0:
+            raise IndexError("Bar buffer is empty")
+        return self._data[column][(self.head - 1) % self.capacity]
+
+    def to_frame(self, n: Optional[int] = None) -> pd.DataFrame:
+        """
+        Copy the most recent n bars into a DataFrame (for inspection; not for the hot path).
+        """
+        window = self._window(n)
+        return pd.DataFrame(
+            {column: values[window].copy() for column, values in self._data.items()},
+            index=pd.DatetimeIndex(self._timestamps[window].copy(), name='date')
+        )
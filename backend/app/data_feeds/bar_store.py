@@ -0,0 +1,283 @@
+# data_feeds/bar_store.py
+
+import asyncio
+import json
+import os
+import re
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+import pandas as pd
+from utils.logger import get_logger
+from utils.helpers import bar_size_to_timedelta
+
+# (source, symbol, sec_type, bar_size), e.g. ('IBKR', 'EURUSD', 'CASH', '1m')
+BarKey = Tuple[str, str, str, str]
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]', '_', str(value))
+
+
+def _to_utc(ts: Any) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize a bar DataFrame to a sorted, de-duplicated UTC DatetimeIndex named 'date'.
+
+    Accepts frames with a 'date' column (ib_insync) or a datetime index (yfinance).
+
+    :param df: Raw bar DataFrame
+    :return: Normalized DataFrame
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.copy()
+    if 'date' in df.columns:
+        df = df.set_index('date')
+    index = pd.to_datetime(df.index)
+    index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+    df.index = index.rename('date')
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index()
+
+
+class BarStore:
+    def __init__(self, root: str = 'data/bars'):
+        """
+        Initialize the on-disk bar store.
+
+        Bars are kept in one Parquet file per (source, symbol, sec_type, bar_size) key, so a
+        column such as 'close' can be read without touching the rest of the file.
+
+        :param root: Directory holding the Parquet files
+        """
+        self.root = root
+        self.logger = get_logger('BarStore')
+
+    def path(self, key: BarKey) -> str:
+        """
+        Path of the Parquet file backing a key.
+        """
+        source, symbol, sec_type, bar_size = key
+        return os.path.join(
+            self.root, _safe_name(source), _safe_name(sec_type), f"{_safe_name(symbol)}_{_safe_name(bar_size)}.parquet"
+        )
+
+    def load(self, key: BarKey, start: Any = None, end: Any = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load cached bars for a key, optionally restricted to [start, end].
+
+        :param key: (source, symbol, sec_type, bar_size)
+        :param start: Inclusive start timestamp
+        :param end: Inclusive end timestamp
+        :param columns: Subset of columns to read
+        :return: DataFrame indexed by UTC timestamp (empty if nothing is cached)
+        """
+        path = self.path(key)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        df = pd.read_parquet(path, columns=columns)
+        if start is not None:
+            df = df[df.index >= _to_utc(start)]
+        if end is not None:
+            df = df[df.index <= _to_utc(end)]
+        return df
+
+    def append(self, key: BarKey, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge new bars into the cached file. Newer rows replace cached rows with the same timestamp,
+        which also overwrites a bar that was still in progress when it was first stored.
+
+        :param key: (source, symbol, sec_type, bar_size)
+        :param df: New bars
+        :return: The merged DataFrame that was written
+        """
+        new = normalize_bars(df)
+        if new.empty:
+            return self.load(key)
+        cached = self.load(key)
+        merged = normalize_bars(pd.concat([cached, new])) if not cached.empty else new
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        merged.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+        return merged
+
+    def coverage_path(self, key: BarKey) -> str:
+        """
+        Path of the JSON file recording the span already requested from the remote source.
+        """
+        return os.path.splitext(self.path(key))[0] + '.coverage.json'
+
+    def coverage(self, key: BarKey) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Span of time already requested from the remote source for a key (None if never recorded).
+
+        It can extend past the cached bars, e.g. over a weekend the market was closed.
+        """
+        path = self.coverage_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            span = json.load(f)
+        return _to_utc(span['start']), _to_utc(span['end'])
+
+    def record_coverage(self, key: BarKey, start: Any, end: Any):
+        """
+        Extend the recorded coverage of a key with a range that was fetched successfully.
+        """
+        start, end = _to_utc(start), _to_utc(end)
+        covered = self.coverage(key)
+        if covered is not None:
+            start, end = min(start, covered[0]), max(end, covered[1])
+        path = self.coverage_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'start': start.isoformat(), 'end': end.isoformat()}, f)
+        os.replace(tmp_path, path)
+
+    def missing_ranges(self, key: BarKey, start: Any, end: Any) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Work out which parts of [start, end] are not covered by the cache.
+
+        Only the edges are considered: gaps inside the cached span are market closures. Edges
+        already requested once (see record_coverage) are not requested again even if they held no
+        bars, so a closed market (weekend, daily break) at either end is not re-fetched every run.
+
+        :param key: (source, symbol, sec_type, bar_size)
+        :param start: Requested start timestamp
+        :param end: Requested end timestamp
+        :return: List of (start, end) ranges to fetch from the remote source
+        """
+        start, end = _to_utc(start), _to_utc(end)
+        cached = self.load(key, columns=[])
+        if len(cached.index) == 0:
+            return [(start, end)]
+        bar = bar_size_to_timedelta(key[3])
+        first, last = cached.index[0], cached.index[-1]
+        covered_start, covered_end = self.coverage(key) or (first, last)
+        ranges = []
+        if start < min(first, covered_start) - bar:
+            # End past the first cached bar so that a working source always returns bars
+            ranges.append((start, first + bar))
+        if end > max(last, covered_end) + bar:
+            # Start from the last cached bar so it is refreshed if it was still in progress, but never
+            # before `start`: after a long outage only the requested span is fetched
+            ranges.append((max(last, start), end))
+        return ranges
+
+    def _merge_fetched(self, key: BarKey, range_start: pd.Timestamp, range_end: pd.Timestamp, df: pd.DataFrame):
+        """
+        Merge bars fetched for a missing range and record the range as covered.
+
+        Edge ranges include a cached bar, so an empty answer means the source failed (or, on the
+        first download, had nothing yet); the range is then left uncovered to be requested again.
+        """
+        if df is None or df.empty:
+            return
+        self.append(key, df)
+        self.record_coverage(key, range_start, range_end)
+
+    def top_up(self, key: BarKey, start: Any, end: Any, fetch: Callable[[pd.Timestamp, pd.Timestamp], pd.DataFrame]):
+        """
+        Fetch only the ranges of [start, end] missing from the cache and merge them in.
+
+        If the remote source is unavailable the cache is left as it is, so backtests can run offline.
+
+        :param key: (source, symbol, sec_type, bar_size)
+        :param start: Requested start timestamp
+        :param end: Requested end timestamp
+        :param fetch: Function fetching bars for a (start, end) range from the remote source
+        """
+        for range_start, range_end in self.missing_ranges(key, start, end):
+            try:
+                self._merge_fetched(key, range_start, range_end, fetch(range_start, range_end))
+            except Exception as e:
+                self.logger.warning(f"Failed to top up {key} for {range_start} - {range_end}, using cache: {e}")
+
+    def get(self, key: BarKey, start: Any, end: Any, fetch: Callable[[pd.Timestamp, pd.Timestamp], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Return bars for [start, end], fetching only the ranges missing from the cache.
+
+        :param key: (source, symbol, sec_type, bar_size)
+        :param start: Requested start timestamp
+        :param end: Requested end timestamp
+        :param fetch: Function fetching bars for a (start, end) range from the remote source
+        :return: DataFrame indexed by UTC timestamp
+        """
+        self.top_up(key, start, end, fetch)
+        return self.load(key, start, end)
+
+    async def get_async(
+        self,
+        key: BarKey,
+        start: Any,
+        end: Any,
+        fetch: Callable[[pd.Timestamp, pd.Timestamp], Awaitable[pd.DataFrame]]
+    ) -> pd.DataFrame:
+        """
+        Asynchronous variant of get() for async remote sources such as IBKR.
+
+        Parquet reads and writes run in a worker thread so they do not block the event loop.
+        """
+        for range_start, range_end in await asyncio.to_thread(self.missing_ranges, key, start, end):
+            try:
+                df = await fetch(range_start, range_end)
+                await asyncio.to_thread(self._merge_fetched, key, range_start, range_end, df)
+            except Exception as e:
+                self.logger.warning(f"Failed to top up {key} for {range_start} - {range_end}, using cache: {e}")
+        return await asyncio.to_thread(self.load, key, start, end)
+
+    def arrow_path(self, key: BarKey) -> str:
+        """
+        Path of the Arrow IPC export of a key (see export_arrow).
+        """
+        return os.path.splitext(self.path(key))[0] + '.arrow'
+
+    def export_arrow(self, key: BarKey, start: Any = None, end: Any = None, batch_size: int = 65536) -> str:
+        """
+        Export cached bars to an uncompressed Arrow IPC file that can be memory-mapped.
+
+        The Parquet file is streamed batch by batch, so the export never holds the whole history
+        in memory. Timestamps are written as int64 nanoseconds (UTC) in a 'datetime' column.
+
+        :param key: (source, symbol, sec_type, bar_size)
+        :param start: Inclusive start timestamp
+        :param end: Inclusive end timestamp
+        :param batch_size: Rows per record batch
+        :return: Path of the Arrow file
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        source = pq.ParquetFile(self.path(key))
+        columns = [c for c in ('open', 'high', 'low', 'close', 'volume') if c in source.schema_arrow.names]
+        start_ns = _to_utc(start).value if start is not None else None
+        end_ns = _to_utc(end).value if end is not None else None
+        schema = pa.schema([('datetime', pa.int64())] + [(c, pa.float64()) for c in columns])
+
+        path = self.arrow_path(key)
+        tmp_path = f"{path}.tmp"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+            for batch in source.iter_batches(batch_size=batch_size, columns=['date'] + columns):
+                dates = batch.column('date').cast(pa.timestamp('ns', tz='UTC')).cast(pa.int64())
+                mask = None
+                if start_ns is not None:
+                    mask = pc.greater_equal(dates, start_ns)
+                if end_ns is not None:
+                    upper = pc.less_equal(dates, end_ns)
+                    mask = upper if mask is None else pc.and_(mask, upper)
+                arrays = [dates] + [batch.column(c).cast(pa.float64()) for c in columns]
+                out = pa.RecordBatch.from_arrays(arrays, schema=schema)
+                if mask is not None:
+                    out = out.filter(mask)
+                if out.num_rows:
+                    writer.write_batch(out)
+        os.replace(tmp_path, path)
+        return path
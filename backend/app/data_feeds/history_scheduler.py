@@ -0,0 +1,119 @@
+# data_feeds/history_scheduler.py
+
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import pandas as pd
+from utils.logger import get_logger
+from utils.helpers import bar_size_to_timedelta
+from utils.rate_limiter import TokenBucket
+
+# IBKR historical data pacing rules
+IDENTICAL_REQUEST_INTERVAL = 15.0   # No identical requests within 15 seconds
+CONTRACT_BURST = 2                  # No six or more requests for the same contract within 2 seconds:
+CONTRACT_RATE = 1.5                 # a bucket of 2 refilled at 1.5/s admits at most 5 in any 2 seconds
+MAX_OPEN_REQUESTS = 50              # IBKR allows at most 50 simultaneous open historical requests
+
+
+class HistoricalRequestScheduler:
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize the historical request scheduler.
+
+        :param config: Pacing configuration (max_concurrent, requests_per_window, window_seconds,
+                       burst, requests_per_second, small_bar_seconds)
+        """
+        config = config or {}
+        self.logger = get_logger('HistoricalRequestScheduler')
+        self.semaphore = asyncio.Semaphore(min(config.get('max_concurrent', 10), MAX_OPEN_REQUESTS))
+
+        # The 60 requests / 10 minutes rule only applies to small bars (30 secs or less).
+        # A bucket of capacity B refilled at r tokens/s admits at most B + r * W requests in any
+        # W-second window, so r is derived from the limit to keep that sum at the limit.
+        limit = config.get('requests_per_window', 60)
+        window = config.get('window_seconds', 600)
+        burst = min(config.get('burst', limit // 2), limit - 1)
+        self.small_bar_seconds = config.get('small_bar_seconds', 30)
+        self.small_bar_bucket = TokenBucket(rate=(limit - burst) / window, capacity=burst)
+
+        # Larger bars are soft-throttled by TWS; keep a steady request rate to avoid it
+        requests_per_second = config.get('requests_per_second', 5)
+        self.request_bucket = TokenBucket(rate=requests_per_second, capacity=requests_per_second)
+
+        self.contract_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self.last_identical: Dict[Tuple[str, str, str, str, Optional[pd.Timestamp]], float] = {}
+
+    async def _pace(self, symbol: str, sec_type: str, duration: str, bar_size: str, end: Optional[pd.Timestamp] = None):
+        """
+        Wait until a request may be sent without breaching IBKR pacing rules.
+        """
+        key = (symbol, sec_type, duration, bar_size, end)
+        last = self.last_identical.get(key)
+        if last is not None:
+            remaining = IDENTICAL_REQUEST_INTERVAL - (time.monotonic() - last)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        self.last_identical[key] = time.monotonic()
+
+        contract_bucket = self.contract_buckets.get((symbol, sec_type))
+        if contract_bucket is None:
+            contract_bucket = TokenBucket(rate=CONTRACT_RATE, capacity=CONTRACT_BURST)
+            self.contract_buckets[(symbol, sec_type)] = contract_bucket
+        await contract_bucket.acquire()
+
+        if bar_size_to_timedelta(bar_size).total_seconds() <= self.small_bar_seconds:
+            await self.small_bar_bucket.acquire()
+        await self.request_bucket.acquire()
+
+    async def fetch(
+        self,
+        feed: Any,
+        symbol: str,
+        sec_type: str,
+        duration: str,
+        bar_size: str,
+        end: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        """
+        Fetch historical data through a feed once pacing and concurrency limits allow it.
+
+        :param feed: Connected IBKRDataFeed used to send the request
+        :param symbol: Symbol to fetch data for
+        :param sec_type: Security type
+        :param duration: Duration of historical data
+        :param bar_size: Size of each bar
+        :param end: End of the requested span (now if None)
+        :return: DataFrame containing historical data
+        """
+        await self._pace(symbol, sec_type, duration, bar_size, end)
+        async with self.semaphore:
+            return await feed.fetch_historical_data(
+                symbol=symbol,
+                sec_type=sec_type,
+                duration=duration,
+                bar_size=bar_size,
+                end=end
+            )
+
+    async def fetch_all(
+        self,
+        feed: Any,
+        symbols: List[Dict[str, Any]],
+        duration: str,
+        bar_size: str
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch historical data for several symbols concurrently.
+
+        :param feed: Connected IBKRDataFeed used to send the requests
+        :param symbols: List of symbol dictionaries ({'symbol': ..., 'sec_type': ...})
+        :param duration: Duration of historical data
+        :param bar_size: Size of each bar
+        :return: Dictionary mapping symbols to their historical DataFrames
+        """
+        names = [symbol_info.get('symbol') for symbol_info in symbols]
+        results = await asyncio.gather(*[
+            self.fetch(feed, symbol_info.get('symbol'), symbol_info.get('sec_type', 'CASH'), duration, bar_size)
+            for symbol_info in symbols
+        ])
+        return dict(zip(names, results))
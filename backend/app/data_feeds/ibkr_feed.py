@@ -1,29 +1,57 @@
 # data_feed/ibkr_feed.py
 
 import asyncio
-from typing import Dict, Any, Callable
-from ib_insync import IB, Forex, Stock, Future, Option, util
+import time
+from datetime import timedelta
+from typing import Dict, Any, Callable, List, Optional
+from ib_insync import IB, Forex, Stock, Future, Option, Index, util
 from utils.logger import get_logger
+from utils.rate_limiter import MessageThrottle
+from utils.helpers import to_ib_bar_size, bar_size_to_timedelta, ib_duration_to_timedelta, timedelta_to_ib_duration
+from .history_scheduler import HistoricalRequestScheduler
+from .bar_store import BarStore
+from models import Bar
 import pandas as pd
 
 class IBKRDataFeed:
-    def __init__(self, config: Dict[str, Any], callback: Callable[[Dict[str, Any]], Any] = None):
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        callback: Callable[[Bar], Any] = None,
+        scheduler: HistoricalRequestScheduler = None,
+        pool: Any = None,
+        last_timestamps: Optional[Dict[str, pd.Timestamp]] = None
+    ):
         """
         Initialize the IBKR Data Feed.
 
         :param config: Dictionary containing broker-specific configurations.
-        :param callback: Async function to call with aggregated bar data.
+        :param callback: Async function to call with each completed Bar.
+        :param scheduler: Shared historical request scheduler; a private one is created if omitted.
+        :param pool: Optional IBConnectionPool to lease a shared session from instead of opening a socket.
+        :param last_timestamps: Symbol -> UTC start of the last bar already handled (e.g. the end of the
+                                warm-up history); polling only forwards bars after it.
         """
         self.config = config
         self.callback = callback
-        self.ib = IB()
+        self.scheduler = scheduler or HistoricalRequestScheduler()
+        self.pool = pool
+        self.ib = IB() if pool is None else None
+        # Message throttle of the session; a pooled session's throttle is shared with its other users
+        self.throttle = MessageThrottle.from_config(config) if pool is None else None
         self.logger = get_logger('IBKRDataFeed')
         self.running = False
+        # Polling: start of the last bar forwarded per symbol
+        self.last_timestamps: Dict[str, pd.Timestamp] = dict(last_timestamps or {})
 
     async def connect(self):
         """
-        Asynchronously connect to IBKR.
+        Asynchronously connect to IBKR, or lease a session when a connection pool is used.
         """
+        if self.pool is not None:
+            self.ib = await self.pool.lease()
+            self.throttle = self.pool.throttle(self.ib)
+            return
         try:
             await self.ib.connectAsync(
                 self.config.get('host', '127.0.0.1'),
@@ -41,8 +69,13 @@ class IBKRDataFeed:
 
     async def disconnect(self):
         """
-        Asynchronously disconnect from IBKR.
+        Asynchronously disconnect from IBKR, or release the leased pool session.
         """
+        if self.pool is not None:
+            if self.ib is not None:
+                self.pool.release(self.ib)
+                self.ib = None
+            return
         if self.ib.isConnected():
             self.ib.disconnect()
             self.logger.info("Disconnected from IBKR")
@@ -52,13 +85,15 @@ class IBKRDataFeed:
         Define the contract for a given symbol and security type.
 
         :param symbol: Symbol to trade
-        :param sec_type: Security type (e.g., 'CASH', 'STK')
+        :param sec_type: Security type (e.g., 'CASH', 'STK', 'IND')
         :return: IB Insync Contract object
         """
         if sec_type == 'CASH':
             return Forex(symbol)
         elif sec_type == 'STK':
             return Stock(symbol, exchange='SMART', currency='USD')
+        elif sec_type == 'IND':
+            return Index(symbol, exchange='NYBOT', currency='USD')  # e.g. DX, the US dollar index
         elif sec_type == 'FUT':
             return Future(symbol, exchange='GLOBEX', currency='USD', lastTradeDateOrContractMonth='202412')
         elif sec_type == 'OPT':
@@ -69,7 +104,21 @@ class IBKRDataFeed:
         else:
             raise ValueError(f"Unsupported security type: {sec_type}")
 
-    async def fetch_historical_data(self, symbol: str, sec_type: str, duration: str, bar_size: str) -> pd.DataFrame:
+    @staticmethod
+    def what_to_show(sec_type: str) -> str:
+        """
+        Bar source for a security type: indices have no bid/ask, so their bars are built from trades.
+        """
+        return 'TRADES' if sec_type == 'IND' else 'MIDPOINT'
+
+    async def fetch_historical_data(
+        self,
+        symbol: str,
+        sec_type: str,
+        duration: str,
+        bar_size: str,
+        end: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
         """
         Asynchronously fetch historical data for a given symbol.
 
@@ -77,25 +126,62 @@ class IBKRDataFeed:
         :param sec_type: Security type.
         :param duration: Duration of historical data.
         :param bar_size: Size of each bar.
+        :param end: End of the requested span, as a UTC timestamp (now if None).
         :return: DataFrame containing historical data.
         """
         contract = self.get_contract(symbol, sec_type)
+        await self.throttle.acquire('data')
         try:
             bars = await self.ib.reqHistoricalDataAsync(
                 contract,
-                endDateTime='',
+                endDateTime=end.to_pydatetime() if end is not None else '',
                 durationStr=duration,
-                barSizeSetting=bar_size,
-                whatToShow='MIDPOINT',
+                barSizeSetting=to_ib_bar_size(bar_size),
+                whatToShow=self.what_to_show(sec_type),
                 useRTH=True,
-                formatDate=1
+                formatDate=2  # UTC timestamps
             )
             df = util.df(bars)
-            return df
+            return df if df is not None else pd.DataFrame()
         except Exception as e:
             self.logger.error(f"Failed to fetch historical data for {symbol}: {e}")
             return pd.DataFrame()
 
+    async def fetch_cached_history(
+        self,
+        store: BarStore,
+        symbol: str,
+        sec_type: str,
+        duration: str,
+        bar_size: str
+    ) -> pd.DataFrame:
+        """
+        Load historical data from the local bar store, requesting only the missing tail from IBKR.
+
+        Only completed bars are returned: the bar still in progress is stored (and overwritten on the
+        next top-up) but left out, so it is handled once, by the live feed, when it completes.
+
+        :param store: BarStore holding previously downloaded bars
+        :param symbol: Symbol to fetch data for.
+        :param sec_type: Security type.
+        :param duration: Duration of historical data.
+        :param bar_size: Size of each bar.
+        :return: DataFrame indexed by UTC timestamp.
+        """
+        end = pd.Timestamp.now(tz='UTC')
+        start = end - ib_duration_to_timedelta(duration)
+
+        async def fetch(range_start, range_end):
+            # IBKR durations are measured back from the end of the request
+            range_end = None if range_end >= end else range_end
+            span = timedelta_to_ib_duration((range_end or end) - range_start)
+            return await self.scheduler.fetch(self, symbol, sec_type, span, bar_size, end=range_end)
+
+        df = await store.get_async(('IBKR', symbol, sec_type, bar_size), start, end, fetch)
+        if df.empty:
+            return df
+        return df[df.index + bar_size_to_timedelta(bar_size) <= end]
+
     async def start(self):
         """
         Start the data feed.
@@ -108,33 +194,174 @@ class IBKRDataFeed:
     async def run(self):
         """
         Main loop to fetch and process data.
+
+        Dispatches to streaming or polling depending on `live.mode` in the configuration.
+        """
+        mode = self.config.get('live', {}).get('mode', 'poll')
+        if mode == 'stream':
+            await self.stream()
+        else:
+            await self.poll()
+
+    async def poll(self):
+        """
+        Polling loop aligned on bar closes.
+
+        Wakes `live.poll_offset` seconds (default 2) after each wall-clock bar boundary (bars are
+        aligned on multiples of their length since the Unix epoch, in UTC), re-requests the last
+        `live.poll_bars` bars (default 3) and forwards every completed bar newer than the last one
+        forwarded for that symbol. Each bar is handled exactly once, and a bar IBKR had not yet
+        published at the boundary is picked up on the next cycle.
         """
         symbols = self.config.get('symbols', [])
-        duration = self.config.get('historical', {}).get('duration', '1 D')
+        live_config = self.config.get('live', {})
         bar_size = self.config.get('historical', {}).get('bar_size', '1m')
+        bar_length = bar_size_to_timedelta(bar_size)
+        offset = live_config.get('poll_offset', 2)
+        # A few bars are enough to catch up after a slow cycle; warm-up history is loaded separately
+        duration = timedelta_to_ib_duration(bar_length * live_config.get('poll_bars', 3))
 
         while self.running:
             try:
+                await asyncio.sleep(self._seconds_to_next_close(bar_length, offset))
+                frames = await self.scheduler.fetch_all(self, symbols, duration, bar_size)
+                now = pd.Timestamp.now(tz='UTC')
                 for symbol_info in symbols:
                     symbol = symbol_info.get('symbol')
                     sec_type = symbol_info.get('sec_type', 'CASH')
-                    df = await self.fetch_historical_data(
-                        symbol=symbol,
-                        sec_type=sec_type,
-                        duration=duration,
-                        bar_size=bar_size
-                    )
-                    # Process data as needed (e.g., calculate indicators)
-                    if not df.empty and self.callback:
-                        latest_bar = df.iloc[-1].to_dict()
-                        await self.callback(latest_bar)
-                await asyncio.sleep(60)  # Fetch data every minute
+                    df = frames.get(symbol)
+                    if df is None or df.empty or not self.callback:
+                        continue
+                    for bar in self._new_completed_bars(df, self.last_timestamps.get(symbol), bar_length, now):
+                        bar_record = self.to_bar(bar, symbol, sec_type, bar_size)
+                        self.last_timestamps[symbol] = pd.to_datetime(bar.date, utc=True)
+                        await self.callback(bar_record)
             except asyncio.CancelledError:
                 self.logger.info("Data feed run cancelled.")
                 break
             except Exception as e:
                 self.logger.error(f"Error in data feed run: {e}")
-                await asyncio.sleep(60)  # Retry after delay
+
+    @staticmethod
+    def _seconds_to_next_close(bar_length: timedelta, offset: float) -> float:
+        """
+        Seconds until the next wall-clock bar boundary plus `offset`.
+        """
+        length = bar_length.total_seconds()
+        now = time.time()
+        return (now // length + 1) * length + offset - now
+
+    @staticmethod
+    def _new_completed_bars(
+        df: pd.DataFrame,
+        last_timestamp: Optional[pd.Timestamp],
+        bar_length: timedelta,
+        now: pd.Timestamp
+    ) -> List[Any]:
+        """
+        Completed bars of a polled frame that have not been forwarded yet, oldest first.
+
+        :param df: Polled bars (IBKR 'date' column holding each bar's start)
+        :param last_timestamp: UTC start of the last bar forwarded for the symbol (None if no warm-up
+                               history was handled for it)
+        :param bar_length: Length of one bar
+        :param now: Current UTC time; the bar still in progress is left out
+        :return: Rows to forward; only the newest completed bar if last_timestamp is None
+        """
+        starts = pd.to_datetime(df['date'], utc=True)
+        completed = df[(starts + bar_length <= now).to_numpy()]
+        if last_timestamp is None:
+            return list(completed.tail(1).itertuples(index=False))
+        newer = (starts[completed.index] > last_timestamp).to_numpy()
+        return list(completed[newer].itertuples(index=False))
+
+    async def stream(self):
+        """
+        Streaming loop built on IBKR `keepUpToDate` historical bar subscriptions.
+
+        IBKR pushes an update for the in-progress bar on every tick; only when a new bar
+        opens is the previous one complete, so each completed bar is queued exactly once
+        and handed to the callback in arrival order.
+        """
+        symbols = self.config.get('symbols', [])
+        bar_size = self.config.get('historical', {}).get('bar_size', '1m')
+        queue: asyncio.Queue = asyncio.Queue()
+        subscriptions = []
+
+        # Only a couple of bars are needed to seed the subscription; warm-up history is loaded separately
+        seed_seconds = max(int(bar_size_to_timedelta(bar_size).total_seconds()) * 2, 60)
+
+        try:
+            for symbol_info in symbols:
+                symbol = symbol_info.get('symbol')
+                sec_type = symbol_info.get('sec_type', 'CASH')
+                contract = self.get_contract(symbol, sec_type)
+                await self.throttle.acquire('data')
+                try:
+                    bars = await self.ib.reqHistoricalDataAsync(
+                        contract,
+                        endDateTime=end.to_pydatetime() if end is not None else '',
+                        durationStr=f"{seed_seconds} S",
+                        barSizeSetting=to_ib_bar_size(bar_size),
+                        whatToShow=self.what_to_show(sec_type),
+                        useRTH=True,
+                        formatDate=2,  # UTC timestamps
+                        keepUpToDate=True
+                    )
+                except Exception as e:
+                    self.logger.error(f"Failed to subscribe to bars for {symbol}: {e}")
+                    continue
+                bars.updateEvent += self._completed_bar_handler(queue, symbol, sec_type, bar_size)
+                subscriptions.append(bars)
+                self.logger.info(f"Streaming {bar_size} bars for {symbol}")
+
+            while self.running:
+                bar = await queue.get()
+                if self.callback:
+                    try:
+                        await self.callback(bar)
+                    except Exception as e:
+                        self.logger.error(f"Error handling bar for {bar.symbol}: {e}")
+        except asyncio.CancelledError:
+            self.logger.info("Data feed stream cancelled.")
+        finally:
+            for bars in subscriptions:
+                try:
+                    self.ib.cancelHistoricalData(bars)
+                except Exception as e:
+                    self.logger.error(f"Failed to cancel bar subscription: {e}")
+
+    def _completed_bar_handler(self, queue: asyncio.Queue, symbol: str, sec_type: str, bar_size: str):
+        """
+        Build an updateEvent handler that queues each bar once it has closed.
+        """
+        def on_update(bars, has_new_bar: bool):
+            if has_new_bar and len(bars) >= 2:
+                queue.put_nowait(self.to_bar(bars[-2], symbol, sec_type, bar_size))
+        return on_update
+
+    @staticmethod
+    def to_bar(bar: Any, symbol: str, sec_type: str, bar_size: str) -> Bar:
+        """
+        Convert an IBKR bar (BarData or DataFrame row) into the Bar record passed to callbacks.
+
+        :param bar: Object exposing date/open/high/low/close/volume attributes
+        :param symbol: Symbol the bar belongs to
+        :param sec_type: Security type of the symbol
+        :param bar_size: Bar size of the subscription
+        :return: Bar record
+        """
+        return Bar(
+            symbol,
+            sec_type,
+            bar_size,
+            pd.Timestamp(bar.date).to_pydatetime(),
+            bar.open,
+            bar.high,
+            bar.low,
+            bar.close,
+            bar.volume
+        )
 
     async def stop(self):
         """
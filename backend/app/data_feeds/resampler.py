@@ -0,0 +1,219 @@
+# data_feeds/resampler.py
+
+import inspect
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+from models import Bar
+from utils.helpers import bar_size_to_timedelta
+from utils.logger import get_logger
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_microseconds(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)  # Naive timestamps are UTC
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+class _Aggregate:
+    """
+    Bar of a higher timeframe being built from base bars.
+    """
+
+    __slots__ = ('start', 'end', 'sec_type', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, start: int, end: int, bar: Bar):
+        self.start = start
+        self.end = end
+        self.sec_type = bar.sec_type
+        self.open = bar.open
+        self.high = bar.high
+        self.low = bar.low
+        self.close = bar.close
+        self.volume = bar.volume or 0
+
+    def add(self, bar: Bar):
+        if bar.high > self.high:
+            self.high = bar.high
+        if bar.low < self.low:
+            self.low = bar.low
+        self.close = bar.close
+        self.volume += bar.volume or 0
+
+
+class BarResampler:
+    def __init__(self):
+        """
+        Build higher-timeframe bars incrementally from one base bar stream per symbol.
+
+        Bars are aligned on multiples of their length since the Unix epoch, in UTC (so 1h bars
+        start on the hour and 1d bars at 00:00 UTC), and are labelled with their start time like
+        IBKR bars. A bar is emitted as soon as the base bar that ends it arrives; if that base bar
+        is missing, it is emitted when the first base bar of a later period arrives.
+        Every base bar costs O(1) per target timeframe.
+        """
+        self.logger = get_logger('BarResampler')
+        # (symbol, base bar size) -> [(timeframe, length in microseconds)]
+        self.targets: Dict[Tuple[str, str], List[Tuple[str, int]]] = {}
+        self.base_lengths: Dict[str, int] = {}
+        self.aggregates: Dict[Tuple[str, str], _Aggregate] = {}
+        self.last_start: Dict[Tuple[str, str], int] = {}  # (symbol, base) -> start of the last base bar
+        self.callbacks: Dict[str, List[Callable[[Bar], Any]]] = {}
+
+    def add(self, symbol: str, base: str, timeframes: Sequence[str]):
+        """
+        Resample a symbol's base bars into the given timeframes.
+
+        :param symbol: Symbol
+        :param base: Bar size of the incoming bars (e.g. '1m')
+        :param timeframes: Target bar sizes; each must be a whole multiple of the base
+        """
+        base_length = bar_size_to_timedelta(base) // _MICROSECOND
+        targets = self.targets.setdefault((symbol, base), [])
+        for timeframe in timeframes:
+            length = bar_size_to_timedelta(timeframe) // _MICROSECOND
+            if length == base_length or any(timeframe == existing for existing, _ in targets):
+                continue
+            if length % base_length:
+                raise ValueError(f"Cannot build {timeframe} bars from {base} bars for {symbol}")
+            targets.append((timeframe, length))
+        targets.sort(key=lambda target: target[1])
+        self.base_lengths[base] = base_length
+
+    def seed(self, symbol: str, base: str, df: pd.DataFrame, sec_type: Optional[str] = None):
+        """
+        Replay the base history of the periods still open, so the first live bars are complete.
+
+        :param symbol: Symbol
+        :param base: Bar size of the history (must match a base registered with add())
+        :param df: Base bars indexed by start timestamp, oldest first
+        :param sec_type: Security type stored on the resampled bars
+        """
+        targets = self.targets.get((symbol, base))
+        if not targets or df.empty:
+            return
+        index = pd.DatetimeIndex(df.index)
+        last = _to_microseconds(index[-1].to_pydatetime())
+        since = min(last - last % length for _, length in targets)
+        cutoff = pd.Timestamp(since, unit='us', tz='UTC')
+        tail = df[index >= (cutoff if index.tz is not None else cutoff.tz_localize(None))]
+        for timestamp, row in zip(tail.index, tail[['open', 'high', 'low', 'close', 'volume']].itertuples(index=False)):
+            self.update(Bar(symbol, sec_type, base, timestamp.to_pydatetime(), *row))
+
+    def on(self, timeframe: str, callback: Callable[[Bar], Any]):
+        """
+        Register a callback (sync or async) for completed bars of a timeframe.
+        """
+        self.callbacks.setdefault(timeframe, []).append(callback)
+
+    def update(self, bar: Bar) -> List[Bar]:
+        """
+        Add one base bar.
+
+        :param bar: Base bar
+        :return: Higher-timeframe bars completed by this bar
+        """
+        base = bar.bar_size
+        symbol = bar.symbol
+        targets = self.targets.get((symbol, base))
+        if not targets:
+            return []
+        start = bar.epoch_us()
+        if start <= self.last_start.get((symbol, base), -1):
+            # Repeated bar (e.g. the last history bar delivered again by the stream) or out of order
+            self.logger.debug(f"Skipping {base} bar for {symbol} at {bar.timestamp}: not newer than the last one")
+            return []
+        self.last_start[(symbol, base)] = start
+        base_end = start + self.base_lengths[base]
+        completed = []
+        for timeframe, length in targets:
+            key = (symbol, timeframe)
+            aggregate = self.aggregates.get(key)
+            if aggregate is not None and start >= aggregate.end:
+                # The base bar closing the previous period never arrived
+                completed.append(self._emit(symbol, timeframe, aggregate))
+                aggregate = None
+            if aggregate is None:
+                period_start = start - start % length
+                aggregate = _Aggregate(period_start, period_start + length, bar)
+            else:
+                aggregate.add(bar)
+            if base_end >= aggregate.end:
+                completed.append(self._emit(symbol, timeframe, aggregate))
+                self.aggregates.pop(key, None)
+            else:
+                self.aggregates[key] = aggregate
+        return completed
+
+    def flush(self, symbol: Optional[str] = None) -> List[Bar]:
+        """
+        Emit the partial bars still being built (e.g. at shutdown or end of session).
+
+        :param symbol: Only flush this symbol's bars (all symbols if None)
+        :return: Partial bars, marked with partial=True
+        """
+        flushed = []
+        for key in [key for key in self.aggregates if symbol is None or key[0] == symbol]:
+            aggregate = self.aggregates.pop(key)
+            bar = self._emit(key[0], key[1], aggregate)
+            bar.partial = True
+            flushed.append(bar)
+        return flushed
+
+    async def process(self, bar: Bar) -> List[Bar]:
+        """
+        Add one base bar and run the callbacks of every bar it completes, in timeframe order.
+
+        :param bar: Base bar
+        :return: Completed bars
+        """
+        completed = self.update(bar)
+        for resampled in completed:
+            for callback in self.callbacks.get(resampled.bar_size, ()):
+                result = callback(resampled)
+                if inspect.isawaitable(result):
+                    await result
+        return completed
+
+    @staticmethod
+    def _emit(symbol: str, timeframe: str, aggregate: _Aggregate) -> Bar:
+        return Bar(
+            symbol,
+            aggregate.sec_type,
+            timeframe,
+            _EPOCH + timedelta(microseconds=aggregate.start),
+            aggregate.open,
+            aggregate.high,
+            aggregate.low,
+            aggregate.close,
+            aggregate.volume
+        )
+
+
+def resample_frame(df: pd.DataFrame, base: str, timeframe: str) -> pd.DataFrame:
+    """
+    Resample historical OHLCV bars with the same alignment as BarResampler (epoch-aligned, left-labelled).
+
+    Used to warm up higher-timeframe buffers from the base history without extra requests. A last
+    period the history does not cover to its end is left out; BarResampler.seed() picks it up.
+
+    :param df: Base bars indexed by start timestamp
+    :param base: Bar size of the base bars
+    :param timeframe: Target bar size
+    :return: Resampled bars (periods without base bars are dropped)
+    """
+    if df.empty:
+        return df
+    rule = pd.Timedelta(bar_size_to_timedelta(timeframe))
+    resampled = df.resample(rule, origin='epoch', label='left', closed='left').agg({
+        column: how for column, how in (
+            ('open', 'first'), ('high', 'max'), ('low', 'min'), ('close', 'last'), ('volume', 'sum')
+        ) if column in df.columns
+    })
+    resampled = resampled.dropna(subset=['close'])
+    if len(resampled) and resampled.index[-1] + rule > df.index[-1] + pd.Timedelta(bar_size_to_timedelta(base)):
+        resampled = resampled.iloc[:-1]
+    return resampled
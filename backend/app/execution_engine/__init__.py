@@ -1,5 +1,6 @@
 # execution_engine/__init__.py
 
-from .engine import ExecutionEngine
+from .engine import ExecutionEngine, OrderHandle
+from .order_book import OrderBook, OrderState, Position
 
-__all__ = ['ExecutionEngine']
\ No newline at end of file
+__all__ = ['ExecutionEngine', 'OrderHandle', 'OrderBook', 'OrderState', 'Position']
\ No newline at end of file
@@ -1,22 +1,42 @@
 # execution_engine/brokers/ibkr_broker.py
 
-from ib_insync import IB, Forex, Stock, Future, Option, MarketOrder, LimitOrder, StopOrder, Contract
+from ib_insync import IB, Forex, Stock, Future, Option, MarketOrder, LimitOrder, StopOrder, Contract, Trade
+from ib_insync import Order as IBOrder
 import asyncio
-from typing import Dict, Any
+import math
+from typing import Any, Callable, Dict, List, Optional
+from models import Order
 from utils.logger import get_logger
+from utils.rate_limiter import MessageThrottle
 
 class IBKRBroker:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], pool: Any = None):
+        """
+        Initialize the IBKR broker.
+
+        :param config: Dictionary containing broker-specific configurations.
+        :param pool: Optional IBConnectionPool to lease a shared session from instead of opening a socket.
+        """
         self.host = config.get('host', '127.0.0.1')
         self.port = config.get('port', 7497)
         self.clientId = config.get('clientId', 1)
-        self.ib = IB()
+        self.pool = pool
+        self.ib = IB() if pool is None else None
+        # Message throttle of the session; a pooled session's throttle is shared with its other users
+        self.throttle = MessageThrottle.from_config(config) if pool is None else None
+        # Attach the stop loss / take profit of entries as native child orders
+        self.bracket_orders = config.get('bracket_orders', True)
+        self.min_ticks: Dict[tuple, Optional[float]] = {}
         self.logger = get_logger('IBKRBroker')
 
     async def connect(self):
         """
-        Asynchronously connect to IBKR.
+        Asynchronously connect to IBKR, or lease a session when a connection pool is used.
         """
+        if self.pool is not None:
+            self.ib = await self.pool.lease()
+            self.throttle = self.pool.throttle(self.ib)
+            return
         try:
             await self.ib.connectAsync(self.host, self.port, clientId=self.clientId)
             if self.ib.isConnected():
@@ -30,41 +50,178 @@ class IBKRBroker:
 
     async def disconnect(self):
         """
-        Asynchronously disconnect from IBKR.
+        Asynchronously disconnect from IBKR, or release the leased pool session.
         """
+        if self.pool is not None:
+            if self.ib is not None:
+                self.pool.release(self.ib)
+                self.ib = None
+            return
         if self.ib.isConnected():
             self.ib.disconnect()
             self.logger.info("Disconnected from IBKR")
 
-    async def send_order(self, signal: Dict[str, Any]):
+    async def send_order(self, order: Order, on_status: Optional[Callable[[str, Trade], Any]] = None) -> List[Trade]:
         """
-        Asynchronously send an order based on the trading signal.
+        Place an order without waiting for the broker's answer.
 
-        :param signal: Dictionary containing order details.
-        """
-        symbol = signal.get('symbol')
-        action = signal.get('action')
-        price = signal.get('price')
-        quantity = signal.get('quantity')
-        sec_type = signal.get('sec_type', 'CASH')
-        currency = signal.get('currency', 'USD')
-        exchange = signal.get('exchange', 'IDEALPRO')
+        - 'MKT' / 'LMT' entries carrying a stop loss and/or take profit are sent as a native
+          bracket: the entry is the parent and the exits are child orders (a STP and a LMT that
+          cancel each other), so they rest at IBKR as soon as the entry fills.
+        - 'OCO' orders place only the two exits, in one OCA group, to protect an open position;
+          `action` is the closing side. They always have intent 'exit' (see Order).
+        Exit prices are rounded to the contract's minimum tick. Set `bracket_orders: false` in the
+        broker configuration to send entries alone.
 
-        contract = self.get_contract(symbol, sec_type, currency, exchange)
+        ib_insync sends the orders straight away and reports their progress through status events;
+        `on_status` is called with each new status of the entry (for OCO orders, of the pair:
+        'Filled' once either exit fills). The orders first wait for the session's message
+        throttle, in the 'exit' lane for orders reducing a position and the 'entry' lane otherwise.
 
-        if action == 'BUY':
-            order = MarketOrder('BUY', quantity)
-        elif action == 'SELL':
-            order = MarketOrder('SELL', quantity)
-        else:
+        :param order: Sized order.
+        :param on_status: Optional callback receiving (status, trade) on every status change.
+        :return: The ib_insync Trades placed (entry first, then take profit, then stop loss),
+                 or an empty list if the order could not be placed.
+        """
+        symbol = order.symbol
+        action = order.action
+        if action not in ('BUY', 'SELL'):
             self.logger.error(f"Invalid action: {action}")
-            return
+            return []
 
+        contract = self.get_contract(symbol, order.sec_type, order.currency, order.exchange)
         try:
-            trade = await self.ib.placeOrderAsync(contract, order)
-            self.logger.info(f"Order placed: {trade}")
+            legs = await self.build_orders(contract, order)
+        except ValueError as e:
+            self.logger.error(f"Invalid order for {symbol}: {e}")
+            return []
+
+        delay = await self.throttle.acquire('exit' if order.intent == 'exit' else 'entry', tokens=len(legs))
+        if delay > 0:
+            self.logger.info(f"Order for {symbol} delayed {1000 * delay:.1f} ms by the message throttle")
+        try:
+            trades = [self.ib.placeOrder(contract, leg) for leg in legs]
         except Exception as e:
             self.logger.error(f"Failed to place order for {symbol}: {e}")
+            return []
+        if on_status is not None:
+            if order.order_type == 'OCO':
+                handler = self._oco_status_handler(trades, on_status)
+                for trade in trades:
+                    trade.statusEvent += handler
+            else:
+                trades[0].statusEvent += lambda trade: on_status(trade.orderStatus.status, trade)
+        self.logger.info(f"Order placed: {trades[0]}" + (f" with {len(trades) - 1} exit orders" if len(trades) > 1 else ""))
+        return trades
+
+    async def build_orders(self, contract: Contract, order: Order) -> List[IBOrder]:
+        """
+        Translate an order into the ib_insync orders to place, in placement order.
+
+        Only the last leg of a bracket is transmitted, so IBKR activates the bracket as a whole. The
+        legs of an OCA group have no parent to release them, so each is transmitted.
+        """
+        action = order.action
+        quantity = order.quantity
+        exit_action = 'SELL' if action == 'BUY' else 'BUY'
+        has_stop = not math.isnan(order.stop_loss)
+        has_target = not math.isnan(order.take_profit)
+
+        if order.order_type == 'OCO':
+            if not (has_stop and has_target):
+                raise ValueError("OCO orders need both a stop loss and a take profit")
+            tick = await self.min_tick(contract)
+            oca_group = f"OCO-{self.ib.client.getReqId()}"
+            return self.ib.oneCancelsAll([
+                LimitOrder(action, quantity, self.round_to_tick(order.take_profit, tick),
+                           orderId=self.ib.client.getReqId(), transmit=True),
+                StopOrder(action, quantity, self.round_to_tick(order.stop_loss, tick),
+                          orderId=self.ib.client.getReqId(), transmit=True),
+            ], oca_group, 1)  # 1: cancel the other exit once one fills
+
+        if order.order_type == 'MKT':
+            parent = MarketOrder(action, quantity)
+        elif order.order_type == 'LMT':
+            if math.isnan(order.limit_price):
+                raise ValueError("LMT orders need a limit price")
+            parent = LimitOrder(action, quantity, order.limit_price)
+        else:
+            raise ValueError(f"Unsupported order type: {order.order_type}")
+
+        if not self.bracket_orders or order.intent == 'exit' or not (has_stop or has_target):
+            return [parent]
+
+        tick = await self.min_tick(contract)
+        parent.orderId = self.ib.client.getReqId()
+        parent.transmit = False
+        legs = [parent]
+        if has_target:
+            legs.append(LimitOrder(exit_action, quantity, self.round_to_tick(order.take_profit, tick),
+                                   orderId=self.ib.client.getReqId(), parentId=parent.orderId, transmit=False))
+        if has_stop:
+            legs.append(StopOrder(exit_action, quantity, self.round_to_tick(order.stop_loss, tick),
+                                  orderId=self.ib.client.getReqId(), parentId=parent.orderId, transmit=False))
+        legs[-1].transmit = True
+        return legs
+
+    async def min_tick(self, contract: Contract) -> Optional[float]:
+        """
+        Minimum price increment of a contract, requested once and cached (None if unavailable).
+        """
+        key = (contract.secType, contract.symbol, contract.currency)
+        if key not in self.min_ticks:
+            await self.throttle.acquire('data')
+            try:
+                details = await self.ib.reqContractDetailsAsync(contract)
+                self.min_ticks[key] = details[0].minTick if details else None
+            except Exception as e:
+                self.logger.error(f"Failed to get contract details for {contract.symbol}: {e}")
+                return None
+        return self.min_ticks[key]
+
+    @staticmethod
+    def round_to_tick(price: float, tick: Optional[float]) -> float:
+        """
+        Round a price to the nearest multiple of the minimum tick (unchanged if the tick is unknown).
+        """
+        if not tick:
+            return price
+        return round(round(price / tick) * tick, 10)
+
+    @staticmethod
+    def _oco_status_handler(trades: List[Trade], on_status: Callable[[str, Trade], Any]):
+        """
+        Combine the statuses of an OCA pair: filled once either leg fills, done once all legs are.
+        """
+        closed = ('Cancelled', 'ApiCancelled', 'Inactive')
+
+        def on_leg_status(trade: Trade):
+            status = trade.orderStatus.status
+            statuses = [leg.orderStatus.status for leg in trades]
+            if status == 'Filled':
+                on_status(status, trade)
+            elif status in closed:
+                # The other exit is still working (or already filled) until every leg is closed
+                if all(leg_status in closed for leg_status in statuses):
+                    on_status(status, trade)
+            elif 'Filled' not in statuses:
+                on_status(status, trade)
+        return on_leg_status
+
+    async def cancel_order(self, trade: Trade):
+        """
+        Cancel a working order. Cancels go ahead of every other queued message on the session.
+
+        :param trade: One of the ib_insync Trades returned by send_order (cancelling a bracket's
+                      entry also cancels its exits)
+        """
+        if trade.isDone():
+            return
+        await self.throttle.acquire('cancel')
+        try:
+            self.ib.cancelOrder(trade.order)
+        except Exception as e:
+            self.logger.error(f"Failed to cancel order {trade.order.orderId}: {e}")
 
     def get_contract(self, symbol: str, sec_type: str, currency: str, exchange: str) -> Contract:
         """
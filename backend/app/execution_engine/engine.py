@@ -1,55 +1,251 @@
 # execution_engine/engine.py
 
 import asyncio
-from typing import Dict, Any
+import time
+from typing import Callable, Dict, Any, List, Optional
 from .brokers import IBKRBroker  # Ensure this matches your actual package name
+from .order_book import OrderBook
+from models import Order
 from utils.logger import get_logger
 
+# Broker order states that confirm the broker has accepted the order
+ACKNOWLEDGED_STATES = ('PreSubmitted', 'Submitted', 'Filled')
+# Broker order states after which the order is no longer working
+TERMINAL_STATES = {'Filled': 'filled', 'Cancelled': 'cancelled', 'ApiCancelled': 'cancelled', 'Inactive': 'rejected'}
+
+
+class OrderHandle:
+    """
+    Tracks one order from the moment it is queued until the broker reports a final state.
+
+    status: 'queued' -> 'sent' (handed to the broker) -> 'acknowledged' (accepted by the broker)
+            -> 'filled' / 'cancelled' / 'rejected'
+    """
+
+    __slots__ = ('order', 'status', 'broker_status', 'trade', 'legs', 'error', 'queued_at', 'sent_at',
+                 'acknowledged_at', '_acknowledged', '_done', '_callbacks')
+
+    def __init__(self, order: Order):
+        self.order = order
+        self.status = 'queued'
+        self.broker_status = None  # Last status string reported by the broker
+        self.trade = None          # Broker-side order object (ib_insync Trade for IBKR)
+        self.legs = []             # Every broker-side order placed (entry first, then attached exits)
+        self.error = None
+        self.queued_at = time.monotonic()
+        self.sent_at = None
+        self.acknowledged_at = None
+        self._acknowledged = asyncio.Event()
+        self._done = asyncio.Event()
+        self._callbacks = []
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def on_status(self, broker_status: str, trade: Any = None):
+        """
+        Record a status update from the broker.
+        """
+        self.broker_status = broker_status
+        if trade is not None:
+            self.trade = trade
+        if self.done:
+            return
+        if broker_status in ACKNOWLEDGED_STATES and not self._acknowledged.is_set():
+            self.acknowledged_at = time.monotonic()
+            self.status = 'acknowledged'
+            self._acknowledged.set()
+        if broker_status in TERMINAL_STATES:
+            self._finish(TERMINAL_STATES[broker_status])
+
+    def _finish(self, status: str, error: Optional[str] = None):
+        if self.done:
+            return
+        self.status = status
+        self.error = error
+        # Waiters for an acknowledgement are released too; they check `status`
+        self._acknowledged.set()
+        self._done.set()
+        for callback in self._callbacks:
+            callback(self)
+        self._callbacks.clear()
+
+    def add_done_callback(self, callback: Callable[['OrderHandle'], Any]):
+        """
+        Call `callback(handle)` once the order reaches a final state (right away if it already has).
+        """
+        if self.done:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    async def wait_acknowledged(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the broker acknowledges the order (or it fails).
+
+        :return: True if the order was acknowledged, False on failure or timeout
+        """
+        try:
+            await asyncio.wait_for(self._acknowledged.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.acknowledged_at is not None
+
+    async def wait_done(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the order reaches a final state.
+
+        :return: False on timeout
+        """
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def __repr__(self) -> str:
+        return f"OrderHandle({self.order!r}, status={self.status})"
+
+
 class ExecutionEngine:
-    def __init__(self, broker_configs: Dict[str, Any]):
+    def __init__(self, broker_configs: Dict[str, Any], connection_pools: Dict[str, Any] = None):
+        """
+        Initialize the Execution Engine.
+
+        Orders are accepted into one bounded queue per broker and submitted by that broker's
+        worker tasks, so callers get an OrderHandle back without waiting on broker I/O.
+        Per-broker settings: `order_queue_size` (default 100) and `order_workers` (default 1;
+        with more than one, orders of the same broker may reach it out of order).
+        `book` tracks the orders, positions and PnL of every broker session from its events.
+
+        :param broker_configs: Dictionary mapping broker names to their configurations.
+        :param connection_pools: Optional dictionary mapping broker names to shared connection pools.
+        """
         self.brokers = {}
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.worker_counts: Dict[str, int] = {}
+        self.workers: List[asyncio.Task] = []
+        self.book = OrderBook()
         self.logger = get_logger('ExecutionEngine')
+        connection_pools = connection_pools or {}
         for broker_name, config in broker_configs.items():
             if config.get('type') == 'IBKR':
-                self.brokers[broker_name] = IBKRBroker(config)
+                self.brokers[broker_name] = IBKRBroker(config, pool=connection_pools.get(broker_name))
             else:
                 self.logger.error(f"Unsupported broker type: {config.get('type')}")
+                continue
+            self.queues[broker_name] = asyncio.Queue(maxsize=config.get('order_queue_size', 100))
+            self.worker_counts[broker_name] = max(1, config.get('order_workers', 1))
         # Initialize other components as needed
 
     async def start(self):
         """
-        Start the execution engine by connecting to all brokers.
+        Start the execution engine by connecting to all brokers and starting their order workers.
         """
         tasks = []
         for broker in self.brokers.values():
             tasks.append(asyncio.create_task(broker.connect()))
         await asyncio.gather(*tasks)
+        for broker in self.brokers.values():
+            if broker.ib is not None:
+                self.book.attach(broker.ib)
+        for broker_name, count in self.worker_counts.items():
+            for _ in range(count):
+                self.workers.append(asyncio.create_task(self._work(broker_name)))
         self.logger.info("Execution Engine started.")
 
-    async def stop(self):
+    async def stop(self, drain_timeout: float = 5.0):
         """
-        Stop the execution engine by disconnecting from all brokers.
+        Stop the execution engine: submit the orders still queued (up to `drain_timeout` seconds),
+        stop the workers and disconnect from all brokers. Orders left in a queue are cancelled.
         """
+        if self.workers:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*[queue.join() for queue in self.queues.values()]),
+                    drain_timeout
+                )
+            except asyncio.TimeoutError:
+                self.logger.warning("Order queues not drained before shutdown.")
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers.clear()
+        for queue in self.queues.values():
+            while not queue.empty():
+                handle = queue.get_nowait()
+                handle._finish('cancelled', 'Execution engine stopped')
+                queue.task_done()
+
         tasks = []
         for broker in self.brokers.values():
             tasks.append(asyncio.create_task(broker.disconnect()))
         await asyncio.gather(*tasks)
         self.logger.info("Execution Engine stopped.")
 
-    async def send_order(self, signal: Dict[str, Any]):
+    async def send_order(self, order: Order) -> OrderHandle:
         """
-        Send an order based on the trading signal.
+        Queue an order for its broker and return its handle right away.
+
+        Only waits if the broker's queue is full (backpressure), never on the broker itself.
 
-        :param signal: Dictionary containing order details.
+        :param order: Sized order.
+        :return: Handle tracking submission and acknowledgement (already 'rejected' for an unknown broker)
+        """
+        handle = OrderHandle(order)
+        queue = self.queues.get(order.broker)
+        if queue is None:
+            self.logger.error(f"Broker {order.broker} not found.")
+            handle._finish('rejected', f"Broker {order.broker} not found")
+            return handle
+        await queue.put(handle)
+        return handle
+
+    async def cancel(self, handle: OrderHandle):
+        """
+        Cancel every working leg of a submitted order (a bracket's entry and exits) or, if it is
+        still queued, drop it.
         """
-        broker_name = signal.get('broker')
-        broker = self.brokers.get(broker_name)
-        if not broker:
-            self.logger.error(f"Broker {broker_name} not found.")
+        if handle.done:
             return
+        if not handle.legs:
+            handle._finish('cancelled', 'Cancelled before submission')
+            return
+        broker = self.brokers[handle.order.broker]
+        for trade in handle.legs:
+            await broker.cancel_order(trade)
 
-        try:
-            await broker.send_order(signal)  # Assuming send_order is async
-            self.logger.info(f"Order sent: {signal}")
-        except Exception as e:
-            self.logger.error(f"Failed to send order: {e}")
+    def queue_depths(self) -> Dict[str, int]:
+        """
+        Number of orders waiting to be submitted, per broker.
+        """
+        return {broker_name: queue.qsize() for broker_name, queue in self.queues.items()}
+
+    async def _work(self, broker_name: str):
+        broker = self.brokers[broker_name]
+        queue = self.queues[broker_name]
+        while True:
+            handle = await queue.get()
+            try:
+                if handle.done:
+                    continue  # Cancelled while queued
+                handle.sent_at = time.monotonic()
+                handle.status = 'sent'
+                handle.legs = await broker.send_order(handle.order, on_status=handle.on_status)
+                if not handle.legs:
+                    handle._finish('rejected', 'Broker did not accept the order')
+                else:
+                    handle.trade = handle.trade or handle.legs[0]
+                    self.logger.info(
+                        f"Order sent: {handle.order} "
+                        f"(queued {1000 * (handle.sent_at - handle.queued_at):.1f} ms)"
+                    )
+            except asyncio.CancelledError:
+                handle._finish('cancelled', 'Execution engine stopped')
+                raise
+            except Exception as e:
+                self.logger.error(f"Failed to send order: {e}")
+                handle._finish('rejected', str(e))
+            finally:
+                queue.task_done()
@@ -0,0 +1,263 @@
+# execution_engine/order_book.py
+
+import math
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Set
+from utils.logger import get_logger
+
+# Order statuses after which an order no longer works at the broker
+DONE_STATES = ('Filled', 'Cancelled', 'ApiCancelled', 'Inactive')
+
+
+def book_symbol(contract: Any) -> str:
+    """
+    Symbol of a contract as used in the configuration (e.g. 'EURUSD' for the EUR.USD Forex pair).
+    """
+    if contract.secType == 'CASH':
+        return contract.symbol + contract.currency
+    return contract.symbol
+
+
+class OrderState:
+    """
+    Latest known state of one broker order.
+    """
+
+    __slots__ = ('order_id', 'parent_id', 'symbol', 'action', 'order_type', 'quantity', 'filled',
+                 'remaining', 'avg_fill_price', 'status', 'commission', 'updated')
+
+    def __init__(self, order_id: int, parent_id: int, symbol: str, action: str, order_type: str, quantity: float):
+        self.order_id = order_id
+        self.parent_id = parent_id
+        self.symbol = symbol
+        self.action = action
+        self.order_type = order_type
+        self.quantity = quantity
+        self.filled = 0.0
+        self.remaining = quantity
+        self.avg_fill_price = math.nan
+        self.status = 'PendingSubmit'
+        self.commission = 0.0
+        self.updated = None
+
+    @property
+    def active(self) -> bool:
+        return self.status not in DONE_STATES
+
+    def __repr__(self) -> str:
+        return (
+            f"OrderState({self.order_id} {self.action} {self.filled}/{self.quantity} {self.symbol} "
+            f"{self.order_type} {self.status})"
+        )
+
+
+class Position:
+    """
+    Net position in one symbol with its average cost and PnL, in the contract's currency.
+    """
+
+    __slots__ = ('symbol', 'quantity', 'avg_cost', 'multiplier', 'realized_pnl', 'commissions',
+                 'last_price', 'unrealized_pnl')
+
+    def __init__(self, symbol: str, multiplier: float = 1.0):
+        self.symbol = symbol
+        self.quantity = 0.0   # Signed: positive long, negative short
+        self.avg_cost = 0.0   # Average entry price of the open quantity
+        self.multiplier = multiplier
+        self.realized_pnl = 0.0
+        self.commissions = 0.0
+        self.last_price = math.nan
+        self.unrealized_pnl = 0.0
+
+    def fill(self, quantity: float, price: float) -> float:
+        """
+        Apply a signed fill and return the PnL it realized.
+        """
+        realized = 0.0
+        if self.quantity and (self.quantity > 0) != (quantity > 0):
+            # Reducing (and possibly reversing) the position
+            closed = min(abs(quantity), abs(self.quantity))
+            direction = 1.0 if self.quantity > 0 else -1.0
+            realized = closed * (price - self.avg_cost) * direction * self.multiplier
+            self.quantity += quantity
+            if abs(quantity) > closed:
+                self.avg_cost = price  # Reversed: the remainder opens at the fill price
+            elif not self.quantity:
+                self.avg_cost = 0.0
+        else:
+            total = self.quantity + quantity
+            self.avg_cost = (self.avg_cost * self.quantity + price * quantity) / total
+            self.quantity = total
+        self.realized_pnl += realized
+        return realized
+
+    def mark(self) -> float:
+        """
+        Recompute unrealized PnL at the last price (0 while no price is known).
+        """
+        if not self.quantity or math.isnan(self.last_price):
+            self.unrealized_pnl = 0.0
+        else:
+            self.unrealized_pnl = self.quantity * (self.last_price - self.avg_cost) * self.multiplier
+        return self.unrealized_pnl
+
+    def __repr__(self) -> str:
+        return (
+            f"Position({self.symbol} {self.quantity} @ {self.avg_cost} "
+            f"realized={self.realized_pnl} unrealized={self.unrealized_pnl})"
+        )
+
+
+class OrderBook:
+    def __init__(self):
+        """
+        In-memory order and position book kept up to date by broker events.
+
+        Attached IB sessions push order status, execution and commission events into the book,
+        so orders (by order ID), positions and PnL (by symbol) are read from memory in O(1)
+        instead of being requested from the broker. Totals are maintained incrementally.
+        """
+        self.logger = get_logger('OrderBook')
+        self.orders: Dict[int, OrderState] = {}
+        self.open_orders: Dict[str, Set[int]] = {}  # symbol -> IDs of orders still working
+        self.positions: Dict[str, Position] = {}
+        self.realized_pnl = 0.0
+        self.commissions = 0.0
+        self.unrealized_pnl = 0.0
+        self.fill_count = 0
+        self.listeners: List[Callable[[Position], Any]] = []  # Called whenever a position or its mark changes
+        self._exec_ids: Set[str] = set()
+        self._sessions: Set[int] = set()
+
+    def attach(self, ib: Any):
+        """
+        Subscribe to an ib_insync session's order events and load its current positions.
+
+        Attaching the same session twice has no effect.
+        """
+        if id(ib) in self._sessions:
+            return
+        self._sessions.add(id(ib))
+        ib.newOrderEvent += self.on_order_status
+        ib.orderStatusEvent += self.on_order_status
+        ib.execDetailsEvent += self.on_execution
+        ib.commissionReportEvent += self.on_commission
+        for ib_position in ib.positions():
+            self.load_position(ib_position.contract, ib_position.position, ib_position.avgCost)
+
+    def load_position(self, contract: Any, quantity: float, avg_cost: float):
+        """
+        Set a position reported by the broker (e.g. at startup), replacing what the book holds.
+
+        :param avg_cost: Average cost as reported by IBKR (per contract, i.e. including the multiplier)
+        """
+        position = self._position(contract)
+        position.quantity = quantity
+        position.avg_cost = avg_cost / position.multiplier if quantity else 0.0
+        self._remark(position)
+
+    def _position(self, contract: Any) -> Position:
+        symbol = book_symbol(contract)
+        position = self.positions.get(symbol)
+        if position is None:
+            multiplier = float(getattr(contract, 'multiplier', '') or 1)
+            position = self.positions[symbol] = Position(symbol, multiplier)
+        return position
+
+    def _remark(self, position: Position):
+        previous = position.unrealized_pnl
+        self.unrealized_pnl += position.mark() - previous
+        for listener in self.listeners:
+            listener(position)
+
+    def on_order_status(self, trade: Any):
+        """
+        ib_insync newOrderEvent / orderStatusEvent handler.
+        """
+        order, status = trade.order, trade.orderStatus
+        state = self.orders.get(order.orderId)
+        if state is None:
+            state = OrderState(
+                order.orderId, order.parentId, book_symbol(trade.contract),
+                order.action, order.orderType, order.totalQuantity
+            )
+            self.orders[order.orderId] = state
+        state.status = status.status
+        state.filled = status.filled
+        state.remaining = status.remaining
+        if status.filled:
+            state.avg_fill_price = status.avgFillPrice
+        state.updated = datetime.now(timezone.utc)
+        working = self.open_orders.setdefault(state.symbol, set())
+        if state.active:
+            working.add(state.order_id)
+        else:
+            working.discard(state.order_id)
+
+    def on_execution(self, trade: Any, fill: Any):
+        """
+        ib_insync execDetailsEvent handler: apply a fill to the position and realized PnL.
+        """
+        execution = fill.execution
+        if execution.execId in self._exec_ids:
+            return  # IBKR may report an execution again (e.g. after a reconnect)
+        self._exec_ids.add(execution.execId)
+        quantity = execution.shares if execution.side == 'BOT' else -execution.shares
+        position = self._position(fill.contract)
+        realized = position.fill(quantity, execution.price)
+        position.last_price = execution.price
+        self._remark(position)
+        self.realized_pnl += realized
+        self.fill_count += 1
+        self.logger.info(f"Fill {execution.side} {execution.shares} {position.symbol} @ {execution.price}: {position}")
+
+    def on_commission(self, trade: Any, fill: Any, report: Any):
+        """
+        ib_insync commissionReportEvent handler.
+        """
+        commission = report.commission
+        if not commission or math.isnan(commission) or commission > 1e9:
+            return  # IBKR sends a huge placeholder when the commission is not known
+        position = self._position(fill.contract)
+        position.commissions += commission
+        self.commissions += commission
+        state = self.orders.get(trade.order.orderId)
+        if state is not None:
+            state.commission += commission
+
+    def update_price(self, symbol: str, price: float):
+        """
+        Mark a symbol's position to a new price (e.g. the close of each live bar).
+        """
+        position = self.positions.get(symbol)
+        if position is None:
+            return
+        position.last_price = price
+        if position.quantity:
+            self._remark(position)
+
+    def position(self, symbol: str) -> float:
+        """
+        Signed net quantity held in a symbol (0 if flat).
+        """
+        position = self.positions.get(symbol)
+        return position.quantity if position is not None else 0.0
+
+    def working_orders(self, symbol: str) -> List[OrderState]:
+        """
+        Orders of a symbol still working at the broker.
+        """
+        return [self.orders[order_id] for order_id in self.open_orders.get(symbol, ())]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Summary of positions and PnL (for logs and monitoring).
+        """
+        return {
+            'positions': {symbol: position.quantity for symbol, position in self.positions.items() if position.quantity},
+            'realized_pnl': self.realized_pnl,
+            'unrealized_pnl': self.unrealized_pnl,
+            'commissions': self.commissions,
+            'working_orders': sum(len(ids) for ids in self.open_orders.values()),
+            'fills': self.fill_count,
+        }
@@ -0,0 +1,10 @@
+# indicators/__init__.py
+
+from .moving_average import SMA, EMA
+from .volatility import BollingerBands
+from .momentum import RSI
+from .extremes import Highest, Lowest
+from .crossover import CrossOver
+from .sessions import SessionLevels, usdx_divergence
+
+__all__ = ['SMA', 'EMA', 'BollingerBands', 'RSI', 'Highest', 'Lowest', 'CrossOver', 'SessionLevels', 'usdx_divergence']
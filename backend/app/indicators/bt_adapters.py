@@ -0,0 +1,256 @@
+# indicators/bt_adapters.py
+
+from array import array
+from datetime import time
+import numpy as np
+import backtrader as bt
+from .moving_average import SMA, EMA
+from .volatility import BollingerBands
+from .momentum import RSI
+from .extremes import Highest, Lowest
+from .crossover import CrossOver
+from .sessions import SessionLevels, usdx_divergence
+from utils.helpers import num_to_datetime64
+
+# Backtrader wrappers around the streaming indicators, so backtests and live strategies share one
+# implementation. In runonce mode the whole series is computed by the vectorized seed(); in
+# next mode every bar goes through the O(1) update().
+
+
+def _write(line, values: np.ndarray, start: int, end: int):
+    line.array[start:end] = array('d', values[start:end])
+
+
+class _StreamingIndicator(bt.Indicator):
+    """
+    Base for the wrappers. With several feeds and without preloading, backtrader calls next() again
+    whenever any feed ticks; the stateful update() must only see each bar of the clock once.
+    """
+
+    _bars = 0
+
+    def _new_bar(self) -> bool:
+        bars = len(self._clock)
+        if bars == self._bars:
+            return False
+        self._bars = bars
+        return True
+
+
+class StreamingSMA(_StreamingIndicator):
+    lines = ('sma',)
+    params = (('period', 30),)
+
+    def __init__(self):
+        self.addminperiod(self.p.period)
+        self.impl = SMA(self.p.period)
+
+    def prenext(self):
+        if not self._new_bar():
+            return
+        self.impl.update(self.data[0])
+
+    def next(self):
+        if not self._new_bar():
+            return
+        self.lines.sma[0] = self.impl.update(self.data[0])
+
+    def once(self, start, end):
+        _write(self.lines.sma, self.impl.seed(self.data.array[:end]), start, end)
+
+
+class StreamingEMA(_StreamingIndicator):
+    lines = ('ema',)
+    params = (('period', 30),)
+
+    def __init__(self):
+        self.addminperiod(self.p.period)
+        self.impl = EMA(self.p.period)
+
+    def prenext(self):
+        if not self._new_bar():
+            return
+        self.impl.update(self.data[0])
+
+    def next(self):
+        if not self._new_bar():
+            return
+        self.lines.ema[0] = self.impl.update(self.data[0])
+
+    def once(self, start, end):
+        _write(self.lines.ema, self.impl.seed(self.data.array[:end]), start, end)
+
+
+class StreamingBollingerBands(_StreamingIndicator):
+    lines = ('mid', 'top', 'bot')
+    params = (('period', 20), ('devfactor', 2.0))
+
+    def __init__(self):
+        self.addminperiod(self.p.period)
+        self.impl = BollingerBands(self.p.period, self.p.devfactor)
+
+    def prenext(self):
+        if not self._new_bar():
+            return
+        self.impl.update(self.data[0])
+
+    def next(self):
+        if not self._new_bar():
+            return
+        self.lines.mid[0], self.lines.top[0], self.lines.bot[0] = self.impl.update(self.data[0])
+
+    def once(self, start, end):
+        mid, top, bot = self.impl.seed(self.data.array[:end])
+        _write(self.lines.mid, mid, start, end)
+        _write(self.lines.top, top, start, end)
+        _write(self.lines.bot, bot, start, end)
+
+
+class StreamingRSI(_StreamingIndicator):
+    lines = ('rsi',)
+    params = (('period', 14),)
+
+    def __init__(self):
+        self.addminperiod(self.p.period + 1)
+        self.impl = RSI(self.p.period)
+
+    def prenext(self):
+        if not self._new_bar():
+            return
+        self.impl.update(self.data[0])
+
+    def next(self):
+        if not self._new_bar():
+            return
+        self.lines.rsi[0] = self.impl.update(self.data[0])
+
+    def once(self, start, end):
+        _write(self.lines.rsi, self.impl.seed(self.data.array[:end]), start, end)
+
+
+class StreamingHighest(_StreamingIndicator):
+    lines = ('highest',)
+    params = (('period', 30),)
+
+    def __init__(self):
+        self.addminperiod(self.p.period)
+        self.impl = Highest(self.p.period)
+
+    def prenext(self):
+        if not self._new_bar():
+            return
+        self.impl.update(self.data[0])
+
+    def next(self):
+        if not self._new_bar():
+            return
+        self.lines.highest[0] = self.impl.update(self.data[0])
+
+    def once(self, start, end):
+        _write(self.lines.highest, self.impl.seed(self.data.array[:end]), start, end)
+
+
+class StreamingLowest(_StreamingIndicator):
+    lines = ('lowest',)
+    params = (('period', 30),)
+
+    def __init__(self):
+        self.addminperiod(self.p.period)
+        self.impl = Lowest(self.p.period)
+
+    def prenext(self):
+        if not self._new_bar():
+            return
+        self.impl.update(self.data[0])
+
+    def next(self):
+        if not self._new_bar():
+            return
+        self.lines.lowest[0] = self.impl.update(self.data[0])
+
+    def once(self, start, end):
+        _write(self.lines.lowest, self.impl.seed(self.data.array[:end]), start, end)
+
+
+class StreamingCrossOver(_StreamingIndicator):
+    lines = ('crossover',)
+
+    def __init__(self):
+        self.addminperiod(2)
+        self.impl = CrossOver()
+
+    def prenext(self):
+        if not self._new_bar():
+            return
+        self.impl.update(self.data0[0], self.data1[0])
+
+    def next(self):
+        if not self._new_bar():
+            return
+        self.lines.crossover[0] = self.impl.update(self.data0[0], self.data1[0])
+
+    def once(self, start, end):
+        _write(self.lines.crossover, self.impl.seed(self.data0.array[:end], self.data1.array[:end]), start, end)
+
+
+class StreamingSessionLevels(_StreamingIndicator):
+    """
+    Asian range, previous-day range, trading-window flag and local day of a feed (see SessionLevels).
+    """
+    lines = SessionLevels.LINES
+    params = (
+        ('asian_start', time(20, 0)),
+        ('asian_end', time(0, 0)),
+        ('trading_start', time(3, 0)),
+        ('trading_end', time(4, 0)),
+        ('tz', 'America/New_York'),
+    )
+
+    def __init__(self):
+        self.impl = SessionLevels(
+            self.p.asian_start, self.p.asian_end, self.p.trading_start, self.p.trading_end, self.p.tz
+        )
+
+    def next(self):
+        if not self._new_bar():
+            return
+        values = self.impl.update(self.data.datetime.datetime(0), self.data.high[0], self.data.low[0])
+        for line, value in zip(self.lines, values):
+            line[0] = value
+
+    def once(self, start, end):
+        levels = self.impl.seed(
+            num_to_datetime64(self.data.datetime.array[:end]), self.data.high.array[:end], self.data.low.array[:end]
+        )
+        for name in SessionLevels.LINES:
+            _write(getattr(self.lines, name), levels[name], start, end)
+
+
+class StreamingDivergence(_StreamingIndicator):
+    """
+    USDX divergence of data0 (a USD pair) against data1 (the dollar index); see usdx_divergence.
+    """
+    lines = ('divergence',)
+
+    def __init__(self):
+        self.addminperiod(2)
+
+    def next(self):
+        if not self._new_bar():
+            return
+        pair_change = self.data0.close[0] - self.data0.close[-1]
+        # The index may start later than the pair
+        usdx_change = self.data1.close[0] - self.data1.close[-1] if len(self.data1) >= 2 else 0.0
+        if usdx_change < 0 < pair_change:
+            self.lines.divergence[0] = 1.0
+        elif usdx_change > 0 > pair_change:
+            self.lines.divergence[0] = -1.0
+        else:
+            self.lines.divergence[0] = 0.0
+
+    def once(self, start, end):
+        divergence = usdx_divergence(
+            self.data0.datetime.array[:end], self.data0.close.array[:end],
+            self.data1.datetime.array, self.data1.close.array
+        )
+        _write(self.lines.divergence, divergence, start, end)
@@ -0,0 +1,53 @@
+# indicators/crossover.py
+
+import math
+import numpy as np
+import pandas as pd
+
+
+class CrossOver:
+    """
+    Crossover of two series: +1 when `a` crosses above `b`, -1 when it crosses below, else 0.
+
+    Like backtrader's CrossOver, the previous side is taken from the last non-zero difference,
+    so touching and then continuing counts as a single cross.
+    """
+
+    def __init__(self):
+        self.last_diff = math.nan
+        self.value = 0.0
+
+    def seed(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        Compute crossovers over two whole series and leave the state positioned after their last values.
+
+        :param a: First series (e.g. fast average), oldest first
+        :param b: Second series (e.g. slow average), oldest first
+        :return: Series of +1 / -1 / 0 aligned with the inputs
+        """
+        a = np.asarray(a, dtype=float)
+        b = np.asarray(b, dtype=float)
+        diff = a - b
+        nonzero = pd.Series(np.where(diff == 0.0, np.nan, diff)).ffill().to_numpy()
+        previous = np.concatenate(([self.last_diff], nonzero[:-1])) if len(nonzero) else nonzero
+        out = np.where((previous < 0.0) & (diff > 0.0), 1.0, np.where((previous > 0.0) & (diff < 0.0), -1.0, 0.0))
+        if len(nonzero) and not math.isnan(nonzero[-1]):
+            self.last_diff = nonzero[-1]
+        self.value = out[-1] if len(out) else 0.0
+        return out
+
+    def update(self, a: float, b: float) -> float:
+        """
+        Add one pair of values in O(1).
+
+        :return: +1 / -1 / 0
+        """
+        diff = a - b
+        self.value = 0.0
+        if diff > 0.0 and self.last_diff < 0.0:
+            self.value = 1.0
+        elif diff < 0.0 and self.last_diff > 0.0:
+            self.value = -1.0
+        if diff != 0.0 and not math.isnan(diff):
+            self.last_diff = diff
+        return self.value
@@ -0,0 +1,95 @@
+# indicators/extremes.py
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+import numpy as np
+import pandas as pd
+
+
+class _RollingExtreme(ABC):
+    """
+    Rolling max/min over a fixed window using a monotonic deque (amortized O(1) per update).
+    """
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError("Period must be positive")
+        self.period = period
+        self.count = 0
+        self.candidates = deque()  # (index, value), values monotonic from the front
+        self.value = math.nan
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    @abstractmethod
+    def _dominates(self, new: float, old: float) -> bool:
+        """
+        Whether a new value makes an older candidate irrelevant.
+        """
+
+    @abstractmethod
+    def _rolling(self, rolling) -> pd.Series:
+        """
+        Vectorized extreme of a pandas Rolling object (used by seed).
+        """
+
+    def seed(self, values: np.ndarray) -> np.ndarray:
+        """
+        Compute the rolling extreme over a whole series and leave the state positioned after its last value.
+
+        :param values: Input series, oldest first
+        :return: Series aligned with the input (NaN during warm-up)
+        """
+        values = np.asarray(values, dtype=float)
+        out = self._rolling(pd.Series(values).rolling(window=self.period)).to_numpy()
+        self.count = 0
+        self.candidates.clear()
+        start = max(len(values) - self.period, 0)
+        self.count = start
+        for value in values[start:]:
+            self.update(value)
+        return out
+
+    def update(self, value: float) -> float:
+        """
+        Add one value.
+
+        :param value: New input value
+        :return: Extreme over the last `period` values (NaN until the window is full)
+        """
+        candidates = self.candidates
+        while candidates and self._dominates(value, candidates[-1][1]):
+            candidates.pop()
+        candidates.append((self.count, value))
+        if candidates[0][0] <= self.count - self.period:
+            candidates.popleft()
+        self.count += 1
+        self.value = candidates[0][1] if self.count >= self.period else math.nan
+        return self.value
+
+
+class Highest(_RollingExtreme):
+    """
+    Highest value over the last `period` values.
+    """
+
+    def _dominates(self, new: float, old: float) -> bool:
+        return new >= old
+
+    def _rolling(self, rolling) -> pd.Series:
+        return rolling.max()
+
+
+class Lowest(_RollingExtreme):
+    """
+    Lowest value over the last `period` values.
+    """
+
+    def _dominates(self, new: float, old: float) -> bool:
+        return new <= old
+
+    def _rolling(self, rolling) -> pd.Series:
+        return rolling.min()
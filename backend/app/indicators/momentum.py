@@ -0,0 +1,68 @@
+# indicators/momentum.py
+
+import math
+import numpy as np
+from .moving_average import SMA
+
+
+def _rsi(up: float, down: float) -> float:
+    # Same safe division as backtrader (safehigh=100, safelow=50)
+    if down == 0.0:
+        return 50.0 if up == 0.0 else 100.0
+    return 100.0 - 100.0 / (1.0 + up / down)
+
+
+class RSI:
+    """
+    Relative Strength Index with SMA smoothing of up/down moves (backtrader's RSI_SMA).
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.up = SMA(period)
+        self.down = SMA(period)
+        self.last = math.nan
+        self.value = math.nan
+
+    @property
+    def ready(self) -> bool:
+        return not math.isnan(self.value)
+
+    def seed(self, values: np.ndarray) -> np.ndarray:
+        """
+        Compute the RSI over a whole series and leave the state positioned after its last value.
+
+        :param values: Input series, oldest first
+        :return: RSI series aligned with the input (NaN during warm-up)
+        """
+        values = np.asarray(values, dtype=float)
+        out = np.full(len(values), np.nan)
+        if len(values) == 0:
+            return out
+        change = np.diff(values)
+        up = self.up.seed(np.maximum(change, 0.0))
+        down = self.down.seed(np.maximum(-change, 0.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100.0 - 100.0 / (1.0 + up / down)
+        rsi = np.where(down == 0.0, np.where(up == 0.0, 50.0, 100.0), rsi)
+        rsi[np.isnan(up) | np.isnan(down)] = np.nan
+        out[1:] = rsi
+        self.last = values[-1]
+        self.value = out[-1]
+        return out
+
+    def update(self, value: float) -> float:
+        """
+        Add one value in O(1).
+
+        :param value: New input value
+        :return: Current RSI (NaN until `period` changes have been seen)
+        """
+        if not math.isnan(self.last):
+            change = value - self.last
+            up = self.up.update(max(change, 0.0))
+            down = self.down.update(max(-change, 0.0))
+            if not (math.isnan(up) or math.isnan(down)):
+                self.value = _rsi(up, down)
+        self.last = value
+        return self.value
@@ -0,0 +1,110 @@
+# indicators/moving_average.py
+
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+
+
+class SMA:
+    """
+    Simple moving average over a fixed window.
+    """
+
+    # Recompute the running sum from the window every N updates to bound floating-point drift
+    RESYNC_INTERVAL = 10000
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError("SMA period must be positive")
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.updates = 0
+        self.value = math.nan
+
+    @property
+    def ready(self) -> bool:
+        return len(self.window) == self.period
+
+    def seed(self, values: np.ndarray) -> np.ndarray:
+        """
+        Compute the SMA over a whole series and leave the state positioned after its last value.
+
+        :param values: Input series, oldest first
+        :return: SMA series aligned with the input (NaN during warm-up)
+        """
+        values = np.asarray(values, dtype=float)
+        out = np.full(len(values), np.nan)
+        if len(values) >= self.period:
+            cumsum = np.cumsum(np.insert(values, 0, 0.0))
+            out[self.period - 1:] = (cumsum[self.period:] - cumsum[:-self.period]) / self.period
+        self.window = deque(values[-self.period:].tolist(), maxlen=self.period)
+        self.total = float(sum(self.window))
+        self.value = out[-1] if len(out) else math.nan
+        return out
+
+    def update(self, value: float) -> float:
+        """
+        Add one value in O(1).
+
+        :param value: New input value
+        :return: Current SMA (NaN until the window is full)
+        """
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(value)
+        self.total += value
+        self.updates += 1
+        if self.updates % self.RESYNC_INTERVAL == 0:
+            self.total = float(sum(self.window))
+        self.value = self.total / self.period if len(self.window) == self.period else math.nan
+        return self.value
+
+
+class EMA:
+    """
+    Exponential moving average seeded with the SMA of the first `period` values (backtrader convention).
+    """
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError("EMA period must be positive")
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.warmup = SMA(period)
+        self.value = math.nan
+
+    @property
+    def ready(self) -> bool:
+        return not math.isnan(self.value)
+
+    def seed(self, values: np.ndarray) -> np.ndarray:
+        """
+        Compute the EMA over a whole series and leave the state positioned after its last value.
+
+        :param values: Input series, oldest first
+        :return: EMA series aligned with the input (NaN during warm-up)
+        """
+        values = np.asarray(values, dtype=float)
+        out = np.full(len(values), np.nan)
+        sma = self.warmup.seed(values[:self.period])
+        if len(values) >= self.period:
+            # Recursive smoothing starting from the SMA seed, vectorized through pandas
+            series = pd.Series(np.concatenate(([sma[-1]], values[self.period:])))
+            out[self.period - 1:] = series.ewm(alpha=self.alpha, adjust=False).mean().to_numpy()
+        self.value = out[-1] if len(out) else math.nan
+        return out
+
+    def update(self, value: float) -> float:
+        """
+        Add one value in O(1).
+
+        :param value: New input value
+        :return: Current EMA (NaN until `period` values have been seen)
+        """
+        if math.isnan(self.value):
+            self.value = self.warmup.update(value)
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
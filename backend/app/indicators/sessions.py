@@ -0,0 +1,184 @@
+# indicators/sessions.py
+
+import math
+from datetime import datetime, time, timezone
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+
+_NS_PER_DAY = 86400 * 10**9
+# Ordinal of 1970-01-01, so day numbers match date.toordinal()
+_EPOCH_ORDINAL = 719163
+
+
+def _time_ns(value: time) -> int:
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 10**9 + value.microsecond * 1000
+
+
+def _in_window(ns_of_day, start: int, end: int):
+    """
+    Whether times of day fall in [start, end), a window that wraps past midnight when start > end.
+    """
+    if start <= end:
+        return (ns_of_day >= start) & (ns_of_day < end)
+    return (ns_of_day >= start) | (ns_of_day < end)
+
+
+class SessionLevels:
+    """
+    Per-session reference levels for session-based strategies (e.g. ICT).
+
+    For every bar, in the session time zone:
+      - asian_high / asian_low: range of the current Asian session, or of the last one once it ended
+      - prev_day_high / prev_day_low: range of the previous calendar day with bars
+      - trading: 1.0 inside the trading window, else 0.0
+      - day: ordinal of the bar's local date (resets per-day state such as "already traded")
+    Levels are NaN until the first session / day has been seen.
+    """
+
+    LINES = ('asian_high', 'asian_low', 'prev_day_high', 'prev_day_low', 'trading', 'day')
+
+    def __init__(
+        self,
+        asian_start: time = time(20, 0),
+        asian_end: time = time(0, 0),
+        trading_start: time = time(3, 0),
+        trading_end: time = time(4, 0),
+        tz: str = 'America/New_York'
+    ):
+        self.asian_start = _time_ns(asian_start)
+        self.asian_end = _time_ns(asian_end)
+        self.trading_start = _time_ns(trading_start)
+        self.trading_end = _time_ns(trading_end)
+        self.tz = ZoneInfo(tz)
+        # Asian sessions that wrap past midnight belong to the day they started on
+        self.wraps = self.asian_start > self.asian_end
+        self.session = None
+        self.asian_high = math.nan
+        self.asian_low = math.nan
+        self.day = None
+        self.day_high = math.nan
+        self.day_low = math.nan
+        self.prev_day_high = math.nan
+        self.prev_day_low = math.nan
+
+    def _local_ns(self, timestamps) -> np.ndarray:
+        index = pd.DatetimeIndex(timestamps)
+        index = index.tz_localize('UTC') if index.tz is None else index
+        return index.tz_convert(self.tz).tz_localize(None).to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+    def seed(self, timestamps, high: np.ndarray, low: np.ndarray) -> dict:
+        """
+        Compute the levels over a whole series and leave the state positioned after its last bar.
+
+        :param timestamps: Bar timestamps, oldest first (naive values are taken as UTC)
+        :param high: Bar highs
+        :param low: Bar lows
+        :return: Line name -> array aligned with the input
+        """
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        rows = len(high)
+        days, ns_of_day = np.divmod(self._local_ns(timestamps), _NS_PER_DAY)
+        days = days + _EPOCH_ORDINAL
+
+        # Running range within each Asian session, carried forward after the session ends
+        asian = _in_window(ns_of_day, self.asian_start, self.asian_end)
+        sessions = days - (self.wraps & (ns_of_day < self.asian_end))
+        asian_high = np.full(rows, np.nan)
+        asian_low = np.full(rows, np.nan)
+        if asian.any():
+            keys = sessions[asian]
+            asian_high[asian] = pd.Series(high[asian]).groupby(keys).cummax().to_numpy()
+            asian_low[asian] = pd.Series(low[asian]).groupby(keys).cummin().to_numpy()
+            asian_high = pd.Series(asian_high).ffill().to_numpy()
+            asian_low = pd.Series(asian_low).ffill().to_numpy()
+
+        # Range of the previous local day that has bars
+        daily = pd.DataFrame({'high': high, 'low': low, 'day': days}).groupby('day', sort=True)
+        day_high, day_low = daily['high'].max(), daily['low'].min()
+        prev_day_high = day_high.shift(1).reindex(days).to_numpy()
+        prev_day_low = day_low.shift(1).reindex(days).to_numpy()
+
+        trading = _in_window(ns_of_day, self.trading_start, self.trading_end).astype(float)
+
+        if rows:
+            self.day = int(days[-1])
+            self.day_high, self.day_low = float(day_high.iloc[-1]), float(day_low.iloc[-1])
+            self.prev_day_high, self.prev_day_low = float(prev_day_high[-1]), float(prev_day_low[-1])
+            self.asian_high, self.asian_low = float(asian_high[-1]), float(asian_low[-1])
+            self.session = int(sessions[asian][-1]) if asian.any() else None
+
+        return {
+            'asian_high': asian_high,
+            'asian_low': asian_low,
+            'prev_day_high': prev_day_high,
+            'prev_day_low': prev_day_low,
+            'trading': trading,
+            'day': days.astype(float),
+        }
+
+    def update(self, timestamp: datetime, high: float, low: float) -> tuple:
+        """
+        Add one bar in O(1).
+
+        :param timestamp: Bar timestamp (naive values are taken as UTC)
+        :param high: Bar high
+        :param low: Bar low
+        :return: Values in LINES order
+        """
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        local = timestamp.astimezone(self.tz)
+        day = local.toordinal()
+        ns_of_day = _time_ns(local.time())
+
+        if day != self.day:
+            if self.day is not None:
+                self.prev_day_high, self.prev_day_low = self.day_high, self.day_low
+            self.day, self.day_high, self.day_low = day, high, low
+        else:
+            self.day_high = max(self.day_high, high)
+            self.day_low = min(self.day_low, low)
+
+        if _in_window(ns_of_day, self.asian_start, self.asian_end):
+            session = day - 1 if self.wraps and ns_of_day < self.asian_end else day
+            if session != self.session:
+                self.session, self.asian_high, self.asian_low = session, high, low
+            else:
+                self.asian_high = max(self.asian_high, high)
+                self.asian_low = min(self.asian_low, low)
+
+        trading = float(_in_window(ns_of_day, self.trading_start, self.trading_end))
+        return self.asian_high, self.asian_low, self.prev_day_high, self.prev_day_low, trading, float(day)
+
+
+def usdx_divergence(
+    timestamps: np.ndarray,
+    close: np.ndarray,
+    usdx_timestamps: np.ndarray,
+    usdx_close: np.ndarray
+) -> np.ndarray:
+    """
+    Divergence between a USD pair and the dollar index, bar by bar.
+
+    The index is aligned as-of each pair bar (its latest bar at or before it), and its change is
+    measured against the index bar before that one, as a bar-by-bar backtest would see it.
+
+    :return: +1.0 where the index fell while the pair rose (bullish), -1.0 for the opposite
+             (bearish), else 0.0
+    """
+    close = np.asarray(close, dtype=float)
+    usdx_close = np.asarray(usdx_close, dtype=float)
+    out = np.zeros(len(close))
+    if len(close) < 2 or len(usdx_close) < 2:
+        return out
+    position = np.searchsorted(np.asarray(usdx_timestamps), np.asarray(timestamps), side='right') - 1
+    valid = position >= 1
+    usdx_change = np.zeros(len(close))
+    usdx_change[valid] = usdx_close[position[valid]] - usdx_close[position[valid] - 1]
+    pair_change = np.zeros(len(close))
+    pair_change[1:] = np.diff(close)
+    out[(usdx_change < 0) & (pair_change > 0)] = 1.0
+    out[(usdx_change > 0) & (pair_change < 0)] = -1.0
+    return out
@@ -0,0 +1,87 @@
+# indicators/volatility.py
+
+import math
+from collections import deque
+from typing import Tuple
+import numpy as np
+import pandas as pd
+
+
+class BollingerBands:
+    """
+    Bollinger Bands: SMA middle band +/- devfactor population standard deviations.
+    """
+
+    # Recompute the running sums from the window every N updates to bound floating-point drift
+    RESYNC_INTERVAL = 10000
+
+    def __init__(self, period: int = 20, devfactor: float = 2.0):
+        if period <= 0:
+            raise ValueError("Bollinger Bands period must be positive")
+        self.period = period
+        self.devfactor = devfactor
+        self.window = deque(maxlen=period)
+        # Sums are taken over (value - shift) to avoid cancellation on prices with tiny variance
+        self.shift = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+        self.mid = self.top = self.bot = math.nan
+
+    @property
+    def ready(self) -> bool:
+        return len(self.window) == self.period
+
+    def _resync(self):
+        self.shift = self.window[0] if self.window else None
+        self.total = sum(v - self.shift for v in self.window) if self.window else 0.0
+        self.total_sq = sum((v - self.shift) ** 2 for v in self.window) if self.window else 0.0
+
+    def seed(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute the bands over a whole series and leave the state positioned after its last value.
+
+        :param values: Input series, oldest first
+        :return: (mid, top, bot) series aligned with the input (NaN during warm-up)
+        """
+        values = np.asarray(values, dtype=float)
+        rolling = pd.Series(values).rolling(window=self.period)
+        mid = rolling.mean().to_numpy()
+        std = rolling.std(ddof=0).to_numpy()
+        top = mid + self.devfactor * std
+        bot = mid - self.devfactor * std
+        self.window = deque(values[-self.period:].tolist(), maxlen=self.period)
+        self._resync()
+        if len(values):
+            self.mid, self.top, self.bot = mid[-1], top[-1], bot[-1]
+        return mid, top, bot
+
+    def update(self, value: float) -> Tuple[float, float, float]:
+        """
+        Add one value in O(1).
+
+        :param value: New input value
+        :return: (mid, top, bot), NaN until the window is full
+        """
+        if self.shift is None:
+            self.shift = value
+        if len(self.window) == self.period:
+            old = self.window[0] - self.shift
+            self.total -= old
+            self.total_sq -= old * old
+        self.window.append(value)
+        new = value - self.shift
+        self.total += new
+        self.total_sq += new * new
+        self.updates += 1
+        if self.updates % self.RESYNC_INTERVAL == 0:
+            self._resync()
+
+        if len(self.window) < self.period:
+            return self.mid, self.top, self.bot
+        mean = self.total / self.period
+        std = math.sqrt(max(self.total_sq / self.period - mean * mean, 0.0))
+        self.mid = mean + self.shift
+        self.top = self.mid + self.devfactor * std
+        self.bot = self.mid - self.devfactor * std
+        return self.mid, self.top, self.bot
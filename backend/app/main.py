@@ -2,82 +2,71 @@
 
 import asyncio
 from typing import Dict, Any, List
-import pandas as pd  # Ensure pandas is imported for DataFrame handling
 
-from data_feeds import IBKRDataFeed  # Ensure this matches your actual package name
-from strategies_implementor.sma_crossover_strategy import (
-    prepare_historical_data,
-    evaluate_trade_conditions
-)
+from data_feeds import IBKRDataFeed, HistoricalRequestScheduler, BarStore  # Ensure this matches your actual package name
+from data_feeds.bar_buffer import BarRingBuffer, BAR_FIELDS
+from data_feeds.resampler import BarResampler, resample_frame
+from models import Bar, Signal
+from strategies_implementor.routing import StrategyRouter, StrategyRoute
 from execution_engine.engine import ExecutionEngine
-from risk_management.risk_manager import risk_management, enforce_daily_limits
+from connections import IBConnectionPool
+from pipeline import EventPipeline
+from risk_management.risk_manager import risk_management
+from risk_management.risk_engine import RiskEngine
 from utils.logger import get_logger
 from utils.config import load_config
-from datetime import datetime, time
+from utils.helpers import bar_size_to_timedelta
+from datetime import datetime, time, timedelta
 
 # Global variables for risk management
 account_balance = 100000  # Example account balance; replace with actual account balance retrieval
-trades_today = []
-max_daily_loss = 500  # Maximum loss per day
-max_daily_trades = 10  # Maximum number of trades per day
 
 
 async def signal_handler(
-    signal: Dict[str, Any],
+    signal: Signal,
     execution_engine: ExecutionEngine,
+    risk_engine: RiskEngine,
     risk_config: Dict[str, Any],
     logger: Any
 ):
     """
-    Handle trading signals by applying risk management and sending orders to the Execution Engine.
+    Handle trading signals by applying risk management and queueing orders with the Execution Engine.
     """
-    global trades_today, account_balance
+    global account_balance
 
     # Apply risk management
-    adjusted_signal = risk_management(signal, account_balance, risk_config)
+    order = risk_management(signal, account_balance, risk_config)
 
-    # Enforce daily limits
-    if not enforce_daily_limits(trades_today, max_daily_loss, max_daily_trades):
-        logger.warning("Daily trading limits reached. No further trades will be executed today.")
+    # Pre-trade checks: daily loss and trade count, symbol notional, gross and net exposure
+    reason = risk_engine.check(order, signal.price)
+    if reason is not None:
+        logger.warning(f"Order for {order.symbol} blocked by risk limits: {reason}")
         return
 
-    # Send order to Execution Engine
-    await execution_engine.send_order(adjusted_signal)  # Assuming send_order is async
-
-    # Log the trade
-    trades_today.append({
-        'symbol': adjusted_signal['symbol'],
-        'action': adjusted_signal['action'],
-        'price': adjusted_signal['price'],
-        'loss': 0  # Update 'loss' as needed based on actual trade outcomes
-    })
+    # Queue the order with the Execution Engine; brokers are called by its order workers
+    handle = await execution_engine.send_order(order)
+    # The order counts as pending exposure until it is filled, cancelled or rejected
+    handle.add_done_callback(lambda handle: risk_engine.release(handle.order))
+    if handle.status == 'rejected':
+        logger.error(f"Order for {order.symbol} rejected: {handle.error}")
 
 
 async def on_bar_aggregated(
-    data: Dict[str, Any],
-    sma_data: Dict[str, pd.DataFrame],
-    previous_sma: Dict[str, Dict[str, float]],
-    strategy_config: Dict[str, Any],
-    execution_engine: ExecutionEngine,
-    risk_config: Dict[str, Any],
-    logger: Any
+    data: Bar,
+    route: StrategyRoute,
+    pipeline: EventPipeline
 ):
     """
     Callback function to handle incoming aggregated bar data.
+
+    Signals are queued on the execution stage, so order round trips never hold up bar processing.
     """
-    # Evaluate trade conditions
-    signals = evaluate_trade_conditions(
-        bar_data=data,
-        sma_data=sma_data,
-        previous_sma=previous_sma,
-        strategy_config=strategy_config
-    )
+    # Evaluate trade conditions with the route's strategy module
+    signals = route.module.evaluate_trade_conditions(data, route.state, route.config)
 
     for signal in signals:
-        # Handle the signal
-        await signal_handler(signal, execution_engine, risk_config, logger)
-
-        # Here, you can update `account_balance` based on trade outcomes if desired
+        # Hand the signal to the execution stage
+        await pipeline.submit('execution', signal.symbol, signal)
 
 
 async def main():
@@ -87,110 +76,188 @@ async def main():
     # Initialize Logger
     logger = get_logger('Main')
 
-    # Initialize Execution Engine
+    # Shared IBKR sessions for data feeds and brokers
     broker_configs = config.get('brokers', {})
-    execution_engine = ExecutionEngine(broker_configs)
+    ibkr_config = broker_configs.get('IBKR', {})
+    ib_pool = IBConnectionPool(ibkr_config)
+    await ib_pool.start()
+
+    # Initialize Execution Engine
+    execution_engine = ExecutionEngine(broker_configs, connection_pools={'IBKR': ib_pool})
     await execution_engine.start()  # Assuming start is async
 
     # Risk management configuration
     risk_config = config.get('risk_management', {})
+    risk_engine = RiskEngine(risk_config, execution_engine.book)
+
+    # Initialize strategies and the symbol -> strategy routing table
+    router = StrategyRouter(config.get('strategies', []))
+    strategies = router.strategies
 
-    # Initialize strategies
-    strategies = config.get('strategies', [])
+    # Bounded bar history per (symbol, bar size): OHLCV plus each route's indicator columns
+    bar_buffers = {}
+    seed_frames = {}
+    buffer_depths = {}
+    buffer_columns = {}
 
-    # Prepare SMA data for all strategies
-    sma_data_all = {}
-    previous_sma_all = {}
+    # Shared pacing-aware scheduler for every historical request
+    history_scheduler = HistoricalRequestScheduler(ibkr_config.get('pacing', {}))
 
-    # Fetch and prepare historical data
+    # Local bar cache: only the range missing since the last run is requested from IBKR
+    bar_store = BarStore(config.get('bar_store', {}).get('root', 'data/bars'))
+
+    # Fetch historical data for all strategies concurrently over a single connection
+    history_requests = []
     for strategy in strategies:
-        strategy_name = strategy.get('name')
-        symbols = strategy.get('symbols', [])
         historical_config = strategy.get('historical', {})
         duration = historical_config.get('duration', '1 D')
         bar_size = historical_config.get('bar_size', '1m')
+        for symbol_info in strategy.get('symbols', []):
+            request = (symbol_info.get('symbol'), symbol_info.get('sec_type', 'CASH'), duration, bar_size)
+            if request not in history_requests:
+                history_requests.append(request)
+
+    ibkr_data_feed_history = IBKRDataFeed(
+        ibkr_config,
+        callback=None,  # No callback needed for historical data
+        scheduler=history_scheduler,
+        pool=ib_pool
+    )
+    await ibkr_data_feed_history.connect()
+    try:
+        history_results = await asyncio.gather(*[
+            ibkr_data_feed_history.fetch_cached_history(bar_store, *request) for request in history_requests
+        ])
+    finally:
+        await ibkr_data_feed_history.disconnect()  # Release the pool lease even if a request failed
+    historical_frames = dict(zip(history_requests, history_results))
 
-        # Fetch historical data for the strategy
-        historical_data = {}
-        ibkr_data_feed_history = IBKRDataFeed(strategy, callback=None)  # No callback needed for historical data
-        await ibkr_data_feed_history.connect()
-
-        for symbol_info in symbols:
-            symbol = symbol_info.get('symbol')
-            sec_type = symbol_info.get('sec_type', 'CASH')
-            df = await ibkr_data_feed_history.fetch_historical_data(
-                symbol=symbol,
-                sec_type=sec_type,
-                duration=duration,
-                bar_size=bar_size
+    # Prepare historical data per strategy
+    for strategy in strategies:
+        historical_config = strategy.get('historical', {})
+        duration = historical_config.get('duration', '1 D')
+        bar_size = historical_config.get('bar_size', '1m')
+        historical_data = {
+            symbol_info.get('symbol'): historical_frames[
+                (symbol_info.get('symbol'), symbol_info.get('sec_type', 'CASH'), duration, bar_size)
+            ]
+            for symbol_info in strategy.get('symbols', [])
+        }
+
+        # Seed indicator state on each route
+        module = strategy['module']
+        for sym, state in module.prepare_historical_data(historical_data, strategy).items():
+            router.route(strategy.get('name'), sym).state = state
+
+        # Retain as many bars as the largest indicator lookback (or live.retention if deeper)
+        depth = max(strategy.get('live', {}).get('retention', 0), module.indicator_lookback(strategy))
+        for sym, df in historical_data.items():
+            columns = router.route(strategy.get('name'), sym).columns
+            buffer_depths[(sym, bar_size)] = max(buffer_depths.get((sym, bar_size), 0), depth)
+            buffer_columns.setdefault((sym, bar_size), []).extend(columns)
+            # Extra timeframes are resampled from the primary bars, history included
+            for timeframe in router.timeframes(strategy)[1:]:
+                buffer_depths[(sym, timeframe)] = max(buffer_depths.get((sym, timeframe), 0), depth)
+                buffer_columns.setdefault((sym, timeframe), [])
+                resample_length = bar_size_to_timedelta(timeframe)
+                if df is not None and not df.empty and resample_length % bar_size_to_timedelta(bar_size) == timedelta(0):
+                    seed_frames.setdefault((sym, timeframe), resample_frame(df, bar_size, timeframe))
+            if df is None or df.empty:
+                continue
+            seed = seed_frames.setdefault((sym, bar_size), df[[c for c in BAR_FIELDS if c in df.columns]].copy())
+            values = module.indicator_columns(df, strategy)
+            for column, name in zip(columns, module.BUFFER_COLUMNS):
+                seed[column] = values[name]
+
+    for key, depth in buffer_depths.items():
+        bar_buffers[key] = BarRingBuffer(depth, buffer_columns[key])
+        if key in seed_frames:
+            bar_buffers[key].extend(seed_frames[key])
+    seed_frames.clear()
+
+    # Let strategies read their higher timeframes' warm-up history
+    for (sym, timeframe), routes in router.timeframe_routes.items():
+        for route in routes:
+            route.module.update_timeframe(route.state, timeframe, bar_buffers[(sym, timeframe)])
+
+    # Longer timeframes are built from each symbol's single base subscription
+    resampler = BarResampler()
+    for sym, base, timeframes in router.resample_plan():
+        resampler.add(sym, base, timeframes)
+        history = next((
+            (request[1], df) for request, df in historical_frames.items()
+            if request[0] == sym and request[3] == base and df is not None and not df.empty
+        ), None)
+        if history is not None:
+            resampler.seed(sym, base, history[1], sec_type=history[0])
+
+    # Strategy stage: update indicator state and evaluate routes, one worker per symbol
+    async def process_bar(symbol: str, data: Bar):
+        bar_buffer = bar_buffers.get((symbol, data.bar_size))
+        if bar_buffer is not None:
+            bar_buffer.append(data)
+        execution_engine.book.update_price(symbol, data.close)  # Mark open positions to market
+
+        # Strategies using this bar size as a higher timeframe read it from the buffer
+        for route in router.timeframe_routes_for(symbol, data.bar_size):
+            route.module.update_timeframe(route.state, data.bar_size, bar_buffer)
+
+        routes = router.routes_for(symbol, data.bar_size)
+        if not routes:
+            return  # No strategy trades this symbol at this bar size
+
+        # Update the indicator state of every route subscribed to this symbol in O(1)
+        for route in routes:
+            values = route.module.update_state(route.state, data)
+            for column, value in zip(route.columns, values):
+                bar_buffer.set_latest(column, value)
+            await on_bar_aggregated(
+                data=data,
+                route=route,
+                pipeline=pipeline
             )
-            historical_data[symbol] = df
 
-        await ibkr_data_feed_history.disconnect()
+    # Execution stage: risk checks and order submission, one worker per symbol
+    async def execute_signal(symbol: str, signal: Signal):
+        await signal_handler(signal, execution_engine, risk_engine, risk_config, logger)
+
+    pipeline = EventPipeline(config.get('pipeline', {}))
+    pipeline.add_stage('strategy', process_bar, maxsize=1000, policy='block')
+    pipeline.add_stage('execution', execute_signal, maxsize=10, policy='block')
+    pipeline.start()
 
-        # Prepare SMA data
-        strategy_sma_data = prepare_historical_data(historical_data, strategy)
-        for sym, sma_df in strategy_sma_data.items():
-            sma_data_all[sym] = sma_df
+    # Resampled bars join the same per-symbol strategy queue, right before the base bar closing them,
+    # so strategies evaluate that base bar with the higher-timeframe bar it completed
+    async def submit_bar(data: Bar):
+        await pipeline.submit('strategy', data.symbol, data)
 
-            # Initialize previous SMA
-            if len(sma_df) >= 1:
-                previous_sma_all[sym] = {
-                    'short_sma': sma_df['short_sma'].iloc[-1],
-                    'long_sma': sma_df['long_sma'].iloc[-1]
-                }
+    for timeframe in {timeframe for _, _, timeframes in router.resample_plan() for timeframe in timeframes}:
+        resampler.on(timeframe, submit_bar)
 
-    # Define the asynchronous callback for data feeds
-    async def bar_callback(data: Dict[str, Any]):
+    # Define the asynchronous callback for data feeds: queue the bar and return immediately
+    async def bar_callback(data: Bar):
         logger.debug(f"Received new bar data: {data}")
-        symbol = data.get('symbol')
-        if symbol not in sma_data_all:
-            return  # No SMA data available for this symbol
-
-        # Update SMA data
-        sma_df = sma_data_all[symbol]
-        new_row = pd.DataFrame([data])
-        sma_df = pd.concat([sma_df, new_row], ignore_index=True)
-        sma_df['short_sma'] = sma_df['close'].rolling(window=strategy.get('params', {}).get('short_ma', 5)).mean()
-        sma_df['long_sma'] = sma_df['close'].rolling(window=strategy.get('params', {}).get('long_ma', 20)).mean()
-        sma_data_all[symbol] = sma_df
-
-        # Get the latest SMA values
-        if len(sma_df) >= 2:
-            previous_sma = {
-                'short_sma': sma_df['short_sma'].iloc[-2],
-                'long_sma': sma_df['long_sma'].iloc[-2]
-            }
-            current_sma = {
-                'short_sma': sma_df['short_sma'].iloc[-1],
-                'long_sma': sma_df['long_sma'].iloc[-1]
-            }
-
-            # Prepare data for strategy evaluation
-            evaluation_data = {
-                'symbol': symbol,
-                'close': data.get('close'),
-                'timestamp': data.get('timestamp')  # Ensure timestamp is present
-            }
-
-            # Find the strategy associated with this symbol
-            for strategy in strategies:
-                if any(s['symbol'] == symbol for s in strategy.get('symbols', [])):
-                    await on_bar_aggregated(
-                        data=evaluation_data,
-                        sma_data=sma_data_all,
-                        previous_sma=previous_sma_all,
-                        strategy_config=strategy,
-                        execution_engine=execution_engine,
-                        risk_config=risk_config,
-                        logger=logger
-                    )
-
-    # Initialize Data Feeds for all strategies
+        await resampler.process(data)
+        await submit_bar(data)
+
+    # Initialize one data feed per base bar size; each symbol is subscribed once
+    data_feeds = []
     data_feed_tasks = []
-    for strategy in strategies:
-        symbols = strategy.get('symbols', [])
-        data_feed = IBKRDataFeed(strategy, callback=bar_callback)
+    for feed_config in router.feed_configs():
+        # Resume after the warm-up history so its last bar is not handled a second time
+        feed_bar_size = feed_config['historical']['bar_size']
+        last_timestamps = {}
+        for (sym, _, _, request_bar_size), df in historical_frames.items():
+            if request_bar_size == feed_bar_size and df is not None and not df.empty:
+                last_timestamps[sym] = max(last_timestamps.get(sym, df.index[-1]), df.index[-1])
+        data_feed = IBKRDataFeed(
+            feed_config,
+            callback=bar_callback,
+            scheduler=history_scheduler,
+            pool=ib_pool,
+            last_timestamps=last_timestamps
+        )
+        data_feeds.append(data_feed)
         task = asyncio.create_task(data_feed.start())  # Assuming start is async and runs indefinitely
         data_feed_tasks.append(task)
 
@@ -205,8 +272,12 @@ async def main():
         for task in data_feed_tasks:
             task.cancel()
         await asyncio.gather(*data_feed_tasks, return_exceptions=True)
+        for data_feed in data_feeds:
+            await data_feed.stop()  # Release each feed's pool lease
+        await pipeline.stop()
         # Stop Execution Engine
         await execution_engine.stop()  # Assuming stop is async
+        await ib_pool.stop()
         logger.info("Trading system stopped.")
 
 
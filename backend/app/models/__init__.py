@@ -0,0 +1,5 @@
+# models/__init__.py
+
+from .records import Bar, Signal, Order, BAR_DTYPE, bars_to_array, array_to_bars
+
+__all__ = ['Bar', 'Signal', 'Order', 'BAR_DTYPE', 'bars_to_array', 'array_to_bars']
@@ -0,0 +1,209 @@
+# models/records.py
+
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+
+# One row per bar for batches (e.g. a symbol's recent bars); timestamps are naive UTC
+BAR_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[us]'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+])
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class Bar:
+    """
+    One OHLCV bar of a symbol, as passed from the feeds to the strategies.
+
+    `timestamp` is the bar's start; IBKR bars carry an aware UTC datetime, naive values are taken as UTC.
+    """
+
+    __slots__ = ('symbol', 'sec_type', 'bar_size', 'timestamp', 'open', 'high', 'low', 'close', 'volume', 'partial')
+
+    def __init__(
+        self,
+        symbol: str,
+        sec_type: str,
+        bar_size: str,
+        timestamp: datetime,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float = 0.0,
+        partial: bool = False
+    ):
+        self.symbol = symbol
+        self.sec_type = sec_type
+        self.bar_size = bar_size
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.partial = partial  # True for a bar flushed before its period ended
+
+    def epoch_us(self) -> int:
+        """
+        Start of the bar in microseconds since the Unix epoch.
+        """
+        timestamp = self.timestamp
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return (timestamp - _EPOCH) // _MICROSECOND
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (
+            f"Bar({self.symbol} {self.bar_size} {self.timestamp} "
+            f"O={self.open} H={self.high} L={self.low} C={self.close} V={self.volume})"
+        )
+
+
+class Signal:
+    """
+    Trade idea produced by a strategy, before risk management sizes it.
+    """
+
+    __slots__ = (
+        'broker', 'symbol', 'sec_type', 'currency', 'exchange', 'action',
+        'price', 'stop_loss', 'take_profit', 'quantity', 'timestamp'
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        action: str,
+        price: float,
+        stop_loss: float,
+        take_profit: float,
+        quantity: float,
+        sec_type: str = 'CASH',
+        currency: str = 'USD',
+        exchange: str = 'IDEALPRO',
+        broker: str = 'IBKR',
+        timestamp: Optional[datetime] = None
+    ):
+        self.broker = broker
+        self.symbol = symbol
+        self.sec_type = sec_type
+        self.currency = currency
+        self.exchange = exchange
+        self.action = action
+        self.price = price
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.quantity = quantity  # Strategy default, replaced by the risk-managed size
+        self.timestamp = timestamp if timestamp is not None else datetime.utcnow()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (
+            f"Signal({self.action} {self.quantity} {self.symbol} @ {self.price} "
+            f"SL={self.stop_loss} TP={self.take_profit} via {self.broker})"
+        )
+
+
+class Order:
+    """
+    Sized order handed to the execution engine and its brokers.
+    """
+
+    __slots__ = (
+        'broker', 'symbol', 'sec_type', 'currency', 'exchange', 'action', 'quantity',
+        'order_type', 'limit_price', 'stop_loss', 'take_profit', 'intent', 'timestamp'
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        action: str,
+        quantity: float,
+        sec_type: str = 'CASH',
+        currency: str = 'USD',
+        exchange: str = 'IDEALPRO',
+        broker: str = 'IBKR',
+        order_type: str = 'MKT',
+        limit_price: float = math.nan,
+        stop_loss: float = math.nan,
+        take_profit: float = math.nan,
+        intent: str = 'entry',
+        timestamp: Optional[datetime] = None
+    ):
+        self.broker = broker
+        self.symbol = symbol
+        self.sec_type = sec_type
+        self.currency = currency
+        self.exchange = exchange
+        self.action = action
+        self.quantity = quantity
+        self.order_type = order_type
+        self.limit_price = limit_price  # Entry price for 'LMT' orders; NaN for market orders
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        # 'entry' opens or adds to a position, 'exit' reduces or closes one; OCO orders only protect one
+        self.intent = 'exit' if order_type == 'OCO' else intent
+        self.timestamp = timestamp if timestamp is not None else datetime.utcnow()
+
+    @classmethod
+    def from_signal(cls, signal: Signal, quantity: float) -> 'Order':
+        """
+        Market order for a signal, sized by risk management.
+        """
+        return cls(
+            symbol=signal.symbol,
+            action=signal.action,
+            quantity=quantity,
+            sec_type=signal.sec_type,
+            currency=signal.currency,
+            exchange=signal.exchange,
+            broker=signal.broker,
+            stop_loss=signal.stop_loss,
+            take_profit=signal.take_profit
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"Order({self.order_type} {self.action} {self.quantity} {self.symbol} via {self.broker})"
+
+
+def bars_to_array(bars: Iterable[Bar]) -> np.ndarray:
+    """
+    Pack bars into one structured array (BAR_DTYPE), oldest first as given.
+
+    :param bars: Bars of one symbol and bar size
+    :return: Array with one row per bar
+    """
+    bars = list(bars)
+    out = np.empty(len(bars), dtype=BAR_DTYPE)
+    out['timestamp'] = np.fromiter((bar.epoch_us() for bar in bars), dtype=np.int64, count=len(bars)).view('datetime64[us]')
+    for field in ('open', 'high', 'low', 'close', 'volume'):
+        out[field] = np.fromiter((getattr(bar, field) for bar in bars), dtype=float, count=len(bars))
+    return out
+
+
+def array_to_bars(array: np.ndarray, symbol: str, sec_type: str, bar_size: str) -> List[Bar]:
+    """
+    Unpack a BAR_DTYPE array into bars with aware UTC timestamps.
+    """
+    starts = array['timestamp'].astype('datetime64[us]').astype(np.int64).tolist()
+    columns = [array[field].tolist() for field in ('open', 'high', 'low', 'close', 'volume')]
+    return [
+        Bar(symbol, sec_type, bar_size, _EPOCH + start * _MICROSECOND, *values)
+        for start, values in zip(starts, zip(*columns))
+    ]
@@ -0,0 +1,5 @@
+# pipeline/__init__.py
+
+from .event_pipeline import EventPipeline, PipelineStage
+
+__all__ = ['EventPipeline', 'PipelineStage']
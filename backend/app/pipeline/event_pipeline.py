@@ -0,0 +1,219 @@
+# pipeline/event_pipeline.py
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from utils.logger import get_logger
+
+# What to do when a key's queue is full
+POLICIES = ('block', 'drop_oldest', 'drop_newest', 'coalesce')
+
+
+class _KeyQueue:
+    """
+    Bounded FIFO for one key plus its counters.
+    """
+
+    __slots__ = ('items', 'not_empty', 'not_full', 'worker', 'max_depth', 'processed',
+                 'dropped', 'coalesced', 'total_wait', 'max_wait')
+
+    def __init__(self):
+        self.items = deque()  # (item, enqueue time)
+        self.not_empty = asyncio.Event()
+        self.not_full = asyncio.Event()
+        self.not_full.set()
+        self.worker = None
+        self.max_depth = 0
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class PipelineStage:
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Hashable, Any], Awaitable[Any]],
+        maxsize: int = 1000,
+        policy: str = 'block'
+    ):
+        """
+        Initialize a pipeline stage with one bounded queue and one worker task per key (e.g. symbol).
+
+        Items for the same key are handled in order; a slow key never delays the others.
+
+        :param name: Stage name used in logs and stats
+        :param handler: Async function called with (key, item) for each item
+        :param maxsize: Maximum number of pending items per key
+        :param policy: 'block' (backpressure on the producer), 'drop_oldest', 'drop_newest'
+                       or 'coalesce' (the newest item replaces the last pending one)
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unsupported queue policy: {policy}")
+        self.name = name
+        self.handler = handler
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.queues: Dict[Hashable, _KeyQueue] = {}
+        self.running = True
+        self.logger = get_logger(f'PipelineStage[{name}]')
+
+    def _queue(self, key: Hashable) -> _KeyQueue:
+        queue = self.queues.get(key)
+        if queue is None:
+            queue = _KeyQueue()
+            queue.worker = asyncio.create_task(self._work(key, queue))
+            self.queues[key] = queue
+        return queue
+
+    async def put(self, key: Hashable, item: Any) -> bool:
+        """
+        Queue an item for a key, applying the stage's overflow policy when the queue is full.
+
+        :return: False if the item was dropped
+        """
+        queue = self._queue(key)
+        if len(queue.items) >= self.maxsize:
+            if self.policy == 'block':
+                while len(queue.items) >= self.maxsize:
+                    queue.not_full.clear()
+                    await queue.not_full.wait()
+            elif self.policy == 'drop_newest':
+                queue.dropped += 1
+                return False
+            elif self.policy == 'drop_oldest':
+                queue.items.popleft()
+                queue.dropped += 1
+            elif self.policy == 'coalesce':
+                replaced, enqueued = queue.items[-1]
+                queue.items[-1] = (item, enqueued)
+                queue.coalesced += 1
+                self.logger.warning(f"Queue for {key} full: {replaced} replaced by {item}")
+                return True
+        queue.items.append((item, time.monotonic()))
+        queue.max_depth = max(queue.max_depth, len(queue.items))
+        queue.not_empty.set()
+        return True
+
+    async def _work(self, key: Hashable, queue: _KeyQueue):
+        while self.running:
+            if not queue.items:
+                queue.not_empty.clear()
+                await queue.not_empty.wait()
+                continue
+            item, enqueued = queue.items.popleft()
+            queue.not_full.set()
+            wait = time.monotonic() - enqueued
+            queue.total_wait += wait
+            queue.max_wait = max(queue.max_wait, wait)
+            try:
+                await self.handler(key, item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error handling {key}: {e}")
+            queue.processed += 1
+
+    def stats(self) -> Dict[Hashable, Dict[str, Any]]:
+        """
+        Queue depth and wait-time statistics per key.
+        """
+        return {
+            key: {
+                'depth': len(queue.items),
+                'max_depth': queue.max_depth,
+                'processed': queue.processed,
+                'dropped': queue.dropped,
+                'coalesced': queue.coalesced,
+                'avg_wait': queue.total_wait / queue.processed if queue.processed else 0.0,
+                'max_wait': queue.max_wait
+            }
+            for key, queue in self.queues.items()
+        }
+
+    async def stop(self):
+        """
+        Cancel every worker task of the stage.
+        """
+        self.running = False
+        workers = [queue.worker for queue in self.queues.values() if queue.worker]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+class EventPipeline:
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize the event pipeline linking data feeds, strategy evaluation and execution.
+
+        :param config: Pipeline configuration: per-stage {'maxsize', 'policy'} and 'stats_interval'
+        """
+        self.config = config or {}
+        self.stages: Dict[str, PipelineStage] = {}
+        self.monitor_task = None
+        self.logger = get_logger('EventPipeline')
+
+    def add_stage(
+        self,
+        name: str,
+        handler: Callable[[Hashable, Any], Awaitable[Any]],
+        maxsize: int = 1000,
+        policy: str = 'block'
+    ) -> PipelineStage:
+        """
+        Add a stage; maxsize/policy from the configuration take precedence over the defaults given here.
+        """
+        stage_config = self.config.get(name, {})
+        stage = PipelineStage(
+            name,
+            handler,
+            maxsize=stage_config.get('maxsize', maxsize),
+            policy=stage_config.get('policy', policy)
+        )
+        self.stages[name] = stage
+        return stage
+
+    async def submit(self, stage: str, key: Hashable, item: Any) -> bool:
+        """
+        Queue an item on a stage for a key.
+        """
+        return await self.stages[stage].put(key, item)
+
+    def stats(self) -> Dict[str, Dict[Hashable, Dict[str, Any]]]:
+        """
+        Statistics of every stage, keyed by stage name then key.
+        """
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+    async def _monitor(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            for name, stage_stats in self.stats().items():
+                for key, stats in stage_stats.items():
+                    self.logger.info(
+                        f"{name}[{key}] depth={stats['depth']} max_depth={stats['max_depth']} "
+                        f"processed={stats['processed']} dropped={stats['dropped']} coalesced={stats['coalesced']} "
+                        f"avg_wait={stats['avg_wait'] * 1000:.1f}ms max_wait={stats['max_wait'] * 1000:.1f}ms"
+                    )
+
+    def start(self):
+        """
+        Start periodic stats logging if 'stats_interval' is configured.
+        """
+        interval = self.config.get('stats_interval')
+        if interval:
+            self.monitor_task = asyncio.create_task(self._monitor(interval))
+
+    async def stop(self):
+        """
+        Stop the monitor and every stage.
+        """
+        if self.monitor_task:
+            self.monitor_task.cancel()
+            await asyncio.gather(self.monitor_task, return_exceptions=True)
+        for stage in self.stages.values():
+            await stage.stop()
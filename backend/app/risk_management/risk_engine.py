@@ -0,0 +1,184 @@
+# risk_management/risk_engine.py
+
+import math
+import time as clock
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+from models import Order
+from utils.logger import get_logger
+
+
+class RiskEngine:
+    def __init__(self, config: Dict[str, Any], book: Any):
+        """
+        Pre-trade risk checks over incrementally maintained counters.
+
+        Every counter is updated when something changes (an order is approved or finishes, a
+        position or its mark moves in the order book), so check() costs O(1) and can run
+        synchronously on every signal. Counters reset at the configured session start.
+
+        Approved entries count towards exposure as pending notional until release() is called for
+        them (once the order is filled, cancelled or rejected), so a burst of orders cannot pass a
+        limit while none of them has filled yet. Until then a fill is counted both in the position
+        and as pending, which errs on the safe side.
+
+        Limits (risk_management configuration; a missing or zero limit is not enforced):
+          - max_daily_loss: loss since the session start, realized net of commissions plus the
+            change in open PnL
+          - max_daily_trades: entry orders approved since the session start
+          - max_symbol_notional: |position value + pending notional| per symbol, a number or
+            {symbol: number}
+          - max_gross_exposure / max_net_exposure: sum of these values' magnitudes / of the signed values
+        Notionals are in each contract's own currency (quantity * price * multiplier).
+        Orders with intent 'exit' are always approved.
+
+        :param config: Risk management configuration (limits above, plus session_start 'HH:MM'
+                       and timezone, default '17:00' America/New_York)
+        :param book: OrderBook providing positions and PnL
+        """
+        self.logger = get_logger('RiskEngine')
+        self.book = book
+        self.max_daily_loss = config.get('max_daily_loss') or math.inf
+        self.max_daily_trades = config.get('max_daily_trades') or math.inf
+        symbol_limit = config.get('max_symbol_notional') or math.inf
+        self.symbol_limits = symbol_limit if isinstance(symbol_limit, dict) else {}
+        self.default_symbol_limit = math.inf if isinstance(symbol_limit, dict) else symbol_limit
+        self.max_gross_exposure = config.get('max_gross_exposure') or math.inf
+        self.max_net_exposure = config.get('max_net_exposure') or math.inf
+        self.session_start = time.fromisoformat(str(config.get('session_start', '17:00')))
+        self.tz = ZoneInfo(config.get('timezone', 'America/New_York'))
+
+        # Exposure, kept in step with the book's positions and the orders still working
+        self.notional: Dict[str, float] = {}
+        self.pending: Dict[str, float] = {}                   # Signed notional of approved, unfinished entries
+        self.pending_orders: Dict[int, Tuple[str, float]] = {}  # id(order) -> (symbol, signed notional)
+        self.gross_exposure = 0.0
+        self.net_exposure = 0.0
+        # Session counters
+        self.trades = 0
+        self.session_equity = 0.0  # Book PnL (realized net + open) at the session start
+        self.halted = False
+        self.next_rollover = 0.0
+        self._roll(clock.time())
+
+        book.listeners.append(self.on_position)
+        for position in book.positions.values():
+            self.on_position(position)
+
+    def _book_equity(self) -> float:
+        return self.book.realized_pnl - self.book.commissions + self.book.unrealized_pnl
+
+    def _roll(self, now: float):
+        """
+        Start a new session: reset the counters and schedule the next rollover.
+        """
+        local = datetime.fromtimestamp(now, self.tz)
+        start = datetime.combine(local.date(), self.session_start, self.tz)
+        if start > local:
+            start -= timedelta(days=1)
+        self.next_rollover = (start + timedelta(days=1)).timestamp()
+        self.trades = 0
+        self.session_equity = self._book_equity()
+        if self.halted:
+            self.logger.info("New trading session: daily limits reset.")
+        self.halted = False
+
+    def exposure(self, symbol: str) -> float:
+        """
+        Signed notional of a symbol: its position's value plus the orders approved but not finished.
+        """
+        return self.notional.get(symbol, 0.0) + self.pending.get(symbol, 0.0)
+
+    def _update(self, symbol: str, notional: float = 0.0, pending: float = 0.0):
+        """
+        Change a symbol's position value and/or pending notional, keeping the totals in step.
+        """
+        previous = self.exposure(symbol)
+        self.notional[symbol] = self.notional.get(symbol, 0.0) + notional
+        self.pending[symbol] = self.pending.get(symbol, 0.0) + pending
+        value = self.exposure(symbol)
+        self.gross_exposure += abs(value) - abs(previous)
+        self.net_exposure += value - previous
+
+    def on_position(self, position: Any):
+        """
+        OrderBook listener: update a symbol's notional and the exposure totals in O(1).
+        """
+        price = position.last_price if not math.isnan(position.last_price) else position.avg_cost
+        value = position.quantity * price * position.multiplier
+        self._update(position.symbol, notional=value - self.notional.get(position.symbol, 0.0))
+
+    def release(self, order: Order):
+        """
+        Stop counting an approved order as pending, once it is filled, cancelled or rejected
+        (e.g. from OrderHandle.add_done_callback). Unknown orders are ignored.
+        """
+        entry = self.pending_orders.pop(id(order), None)
+        if entry is not None:
+            symbol, delta = entry
+            self._update(symbol, pending=-delta)
+
+    def daily_pnl(self) -> float:
+        """
+        PnL since the session start: realized net of commissions plus the change in open PnL.
+        """
+        return self._book_equity() - self.session_equity
+
+    def check(self, order: Order, price: float, now: Optional[float] = None) -> Optional[str]:
+        """
+        Approve or reject an order before it is sent. Approved entries count as trades and as
+        pending notional until release(order).
+
+        :param order: Sized order
+        :param price: Expected fill price (e.g. the signal price)
+        :param now: Current Unix time (defaults to the wall clock)
+        :return: None if approved, otherwise the reason for the rejection
+        """
+        now = clock.time() if now is None else now
+        if now >= self.next_rollover:
+            self._roll(now)
+        if order.intent == 'exit':
+            return None
+
+        if self.halted:
+            return "daily loss limit reached"
+        if -self.daily_pnl() >= self.max_daily_loss:
+            self.halted = True  # Until the next session, even if open PnL recovers
+            self.logger.warning(f"Daily loss limit of {self.max_daily_loss} reached; entries halted.")
+            return "daily loss limit reached"
+        if self.trades >= self.max_daily_trades:
+            return "daily trade limit reached"
+
+        symbol = order.symbol
+        position = self.book.positions.get(symbol)
+        multiplier = position.multiplier if position is not None else 1.0
+        delta = (order.quantity if order.action == 'BUY' else -order.quantity) * price * multiplier
+        current = self.exposure(symbol)
+        projected = current + delta
+        if abs(projected) > self.symbol_limits.get(symbol, self.default_symbol_limit):
+            return f"{symbol} notional limit exceeded ({abs(projected):.2f})"
+        gross = self.gross_exposure + abs(projected) - abs(current)
+        if gross > self.max_gross_exposure:
+            return f"gross exposure limit exceeded ({gross:.2f})"
+        net = self.net_exposure + delta
+        if abs(net) > self.max_net_exposure:
+            return f"net exposure limit exceeded ({net:.2f})"
+
+        self.trades += 1
+        self.pending_orders[id(order)] = (symbol, delta)
+        self._update(symbol, pending=delta)
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current counters (for logs and monitoring).
+        """
+        return {
+            'daily_pnl': self.daily_pnl(),
+            'trades': self.trades,
+            'pending_orders': len(self.pending_orders),
+            'gross_exposure': self.gross_exposure,
+            'net_exposure': self.net_exposure,
+            'halted': self.halted,
+        }
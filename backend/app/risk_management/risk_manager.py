@@ -1,5 +1,6 @@
 # risk_management/risk_manager.py
 
+from models import Order, Signal
 from utils.logger import get_logger
 
 def calculate_position_size(account_balance, risk_per_trade, stop_loss_pips, pip_value=10):
@@ -16,37 +17,17 @@ def calculate_position_size(account_balance, risk_per_trade, stop_loss_pips, pip
     position_size = risk_amount / (stop_loss_pips * pip_value)
     return int(position_size)
 
-def enforce_daily_limits(trades_today, max_loss, max_trades):
-    """
-    Enforce daily trading limits.
-
-    :param trades_today: List of trade results for the day
-    :param max_loss: Maximum allowable loss for the day
-    :param max_trades: Maximum number of trades for the day
-    :return: Boolean indicating if trading should continue
-    """
-    total_loss = sum([trade['loss'] for trade in trades_today])
-    total_trades = len(trades_today)
-
-    if total_loss >= max_loss:
-        return False  # Stop trading
-    if total_trades >= max_trades:
-        return False  # Stop trading
-
-    return True
-
-def risk_management(trade_signal, account_balance, config):
+def risk_management(trade_signal: Signal, account_balance, config) -> Order:
     """
     Manage risk by calculating position size and enforcing limits.
 
-    :param trade_signal: Dictionary containing trade details
+    :param trade_signal: Signal to size
     :param account_balance: Current account balance
     :param config: Risk management configuration
-    :return: Modified trade_signal with position size
+    :return: Order for the signal with the risk-managed position size
     """
-    stop_loss = trade_signal.get('stop_loss')
     # Assuming price is in pips, adjust as needed
-    stop_loss_pips = abs(trade_signal['price'] - stop_loss) * 10000  # Example for Forex
+    stop_loss_pips = abs(trade_signal.price - trade_signal.stop_loss) * 10000  # Example for Forex
 
     position_size = calculate_position_size(
         account_balance,
@@ -55,9 +36,9 @@ def risk_management(trade_signal, account_balance, config):
         pip_value=config.get('pip_value', 10)
     )
 
-    trade_signal['quantity'] = position_size
+    order = Order.from_signal(trade_signal, position_size)
 
     logger = get_logger('RiskManager')
     logger.info(f"Calculated position size: {position_size} units for trade: {trade_signal}")
 
-    return trade_signal
+    return order
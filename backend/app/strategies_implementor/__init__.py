@@ -1,9 +1,24 @@
 # strategies_implementor/__init__.py
 
 from .sma_crossover_strategy import (
+    SMACrossoverState,
+    indicator_lookback,
     prepare_historical_data,
     evaluate_trade_conditions,
     generate_signal
 )
+from .ict_strategy import ICTState, DollarIndexState
+from .routing import StrategyRouter, StrategyRoute, STRATEGY_MODULES
 
-__all__ = ['prepare_historical_data', 'evaluate_trade_conditions', 'generate_signal']
+__all__ = [
+    'SMACrossoverState',
+    'indicator_lookback',
+    'prepare_historical_data',
+    'evaluate_trade_conditions',
+    'generate_signal',
+    'ICTState',
+    'DollarIndexState',
+    'StrategyRouter',
+    'StrategyRoute',
+    'STRATEGY_MODULES'
+]
@@ -0,0 +1,408 @@
+# strategies_implementor/ict_strategy.py
+
+import math
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import time
+import numpy as np
+import pandas as pd
+from indicators import SMA, SessionLevels
+from models import Bar, Signal
+from utils.logger import get_logger
+
+# Initialize logger for the strategy
+logger = get_logger('ICTStrategy')
+
+# Parameter defaults, resolved once per strategy when routes are built
+DEFAULT_PARAMS = {
+    'usdx': 'DX',                   # Dollar index symbol; subscribe it with sec_type 'IND'
+    'asian_start': '20:00',         # Session times in `timezone`
+    'asian_end': '00:00',
+    'trading_start': '03:00',
+    'trading_end': '04:00',
+    'timezone': 'America/New_York',
+    'ma_period': 20,                # SMA confirming the Market Structure Shift
+    'rr_ratio': 2.0,
+    'quantity': 100000,
+    'currency': 'USD',
+    'exchange': 'IDEALPRO'
+}
+
+# Indicator values kept in the bar buffer for each route
+BUFFER_COLUMNS = ('asian_high', 'asian_low', 'prev_day_high', 'prev_day_low')
+
+
+def _time(value: Any) -> time:
+    return value if isinstance(value, time) else time.fromisoformat(str(value))
+
+
+class Setup:
+    """
+    Breach of a pair confirmed by the Market Structure Shift, waiting for the USDX divergence check.
+    """
+
+    __slots__ = ('state', 'symbol', 'sec_type', 'timestamp', 'day', 'action', 'price', 'stop_loss', 'ma', 'pair_change')
+
+    def __init__(self, state: 'ICTState', bar: Bar, action: str, stop_loss: float, ma: float):
+        self.state = state
+        self.symbol = bar.symbol
+        self.sec_type = bar.sec_type
+        self.timestamp = bar.epoch_us()
+        self.day = state.day
+        self.action = action
+        self.price = bar.close
+        self.stop_loss = stop_loss
+        self.ma = ma
+        self.pair_change = state.close - state.prev_close
+
+
+class DollarIndexState:
+    """
+    Recent dollar index bars, shared by every pair of one strategy.
+
+    A pair bar is compared with the index as of its own timestamp: the latest index bar at or before
+    it, against the index bar before that (as usdx_divergence does in the backtest). Each symbol has
+    its own pipeline worker, so the index bar of the same minute may arrive after the pair bar;
+    setups found on a pair bar then wait in `pending` until the index has caught up with them.
+    """
+
+    def __init__(self, history: int = 100):
+        self.history = history
+        self.timestamps = deque(maxlen=history)  # Bar starts, microseconds since the epoch
+        self.closes = deque(maxlen=history)
+        self.pending = deque()                   # Setups newer than the last index bar, oldest first
+
+    @property
+    def last_timestamp(self) -> float:
+        return self.timestamps[-1] if self.timestamps else -math.inf
+
+    def seed(self, timestamps: np.ndarray, closes: np.ndarray):
+        """
+        Seed from historical bars, oldest first.
+
+        :param timestamps: Bar starts in microseconds since the epoch
+        :param closes: Closes aligned with the timestamps
+        """
+        self.timestamps.extend(int(t) for t in timestamps)
+        self.closes.extend(float(c) for c in closes)
+
+    def update(self, timestamp: int, close: float):
+        self.timestamps.append(timestamp)
+        self.closes.append(close)
+
+    def wait(self, setup: Setup):
+        """
+        Keep a setup until the index bar of its timestamp arrives.
+
+        At most `history` setups wait: if the index feed stalls, the oldest one is dropped with a
+        warning rather than confirmed against an index bar that may never come.
+        """
+        if len(self.pending) >= self.history:
+            dropped = self.pending.popleft()
+            logger.warning(
+                f"USDX has no bar since {self.last_timestamp}: dropped the {dropped.action} setup on "
+                f"{dropped.symbol} at {dropped.timestamp}"
+            )
+        self.pending.append(setup)
+
+    def change_at(self, timestamp: int) -> float:
+        """
+        Change of the index bar in effect at `timestamp` (NaN without two bars up to it).
+        """
+        position = bisect_right(self.timestamps, timestamp) - 1
+        if position < 1:
+            return math.nan
+        return self.closes[position] - self.closes[position - 1]
+
+
+class ICTState:
+    """
+    Streaming ICT state for one symbol of one strategy.
+
+    Session levels and the MSS moving average are seeded from history in one vectorized pass and
+    then rolled forward in O(1) per bar; USDX divergence is checked against the shared index state.
+    """
+
+    def __init__(self, params: Dict[str, Any], usdx: DollarIndexState, is_index: bool = False):
+        self.levels = SessionLevels(
+            _time(params['asian_start']),
+            _time(params['asian_end']),
+            _time(params['trading_start']),
+            _time(params['trading_end']),
+            params['timezone']
+        )
+        self.ma = SMA(params['ma_period'])
+        self.usdx = usdx
+        self.is_index = is_index
+        self.close = math.nan
+        self.prev_close = math.nan
+        self.trading = False
+        self.day = None
+        self.cleared_day = None  # Local day on which the levels were cleared (one signal per day)
+
+    def seed(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Seed the state from historical bars.
+
+        :param df: Historical bars indexed by timestamp, oldest first
+        :return: Session level arrays aligned with the bars (empty for the index)
+        """
+        closes = df['close'].to_numpy(dtype=float)
+        if self.is_index:
+            index = pd.DatetimeIndex(df.index)
+            index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+            self.usdx.seed(index.as_unit('us').asi8, closes)
+            return {}
+        levels = self.levels.seed(df.index, df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float))
+        self.ma.seed(closes)
+        if len(closes):
+            self.close = float(closes[-1])
+            self.prev_close = float(closes[-2]) if len(closes) >= 2 else math.nan
+            self.trading = bool(levels['trading'][-1])
+            self.day = levels['day'][-1]
+        return levels
+
+    def update(self, bar: Bar):
+        """
+        Add one bar in O(1).
+
+        :param bar: New bar
+        """
+        close = bar.close
+        if self.is_index:
+            self.usdx.update(bar.epoch_us(), close)
+            return
+        *_, trading, day = self.levels.update(bar.timestamp, bar.high, bar.low)
+        self.trading = bool(trading)
+        self.day = day
+        self.ma.update(close)
+        self.prev_close, self.close = self.close, close
+
+    def buffer_values(self) -> Tuple[float, ...]:
+        levels = self.levels
+        return levels.asian_high, levels.asian_low, levels.prev_day_high, levels.prev_day_low
+
+
+def indicator_lookback(strategy_config: Dict[str, Any]) -> int:
+    """
+    Number of bars the strategy's indicators look back over.
+
+    Session levels also need the previous day; the historical duration must cover it.
+
+    :param strategy_config: Dictionary containing strategy-specific configurations
+    :return: Largest indicator window
+    """
+    return strategy_config.get('params', {}).get('ma_period', DEFAULT_PARAMS['ma_period'])
+
+
+def prepare_historical_data(
+    historical_data: Dict[str, pd.DataFrame],
+    strategy_config: Dict[str, Any]
+) -> Dict[str, ICTState]:
+    """
+    Seed the ICT state of each symbol from its historical bars.
+
+    :param historical_data: Dictionary mapping symbols to their historical DataFrames
+    :param strategy_config: Dictionary containing strategy-specific configurations
+    :return: Dictionary mapping symbols to seeded states
+    """
+    params = strategy_config['params']
+    usdx_symbol = params['usdx']
+    usdx = DollarIndexState()
+    states = {}
+
+    symbols = [symbol['symbol'] for symbol in strategy_config['symbols']]
+    if usdx_symbol not in symbols:
+        logger.warning(f"{usdx_symbol} is not subscribed; USDX divergence will never confirm a setup.")
+
+    for sym in symbols:
+        df = historical_data.get(sym)
+        state = ICTState(params, usdx, is_index=(sym == usdx_symbol))
+
+        if df is None or df.empty:
+            logger.warning(f"No historical data for {sym} to prepare levels.")
+        else:
+            state.seed(df)
+            if not state.is_index:
+                logger.info(
+                    f"{sym} Asian High/Low: {state.levels.asian_high}/{state.levels.asian_low}, "
+                    f"Previous Day High/Low: {state.levels.prev_day_high}/{state.levels.prev_day_low}"
+                )
+
+        states[sym] = state
+
+    return states
+
+
+def indicator_columns(df: pd.DataFrame, strategy_config: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Session level columns over historical bars, to warm up the bar buffer.
+
+    :param df: Historical bars indexed by timestamp
+    :param strategy_config: Dictionary containing strategy-specific configurations
+    :return: Column name (see BUFFER_COLUMNS) -> values aligned with the bars
+    """
+    state = ICTState(strategy_config['params'], DollarIndexState())
+    levels = state.seed(df)
+    return {column: levels[column] for column in BUFFER_COLUMNS}
+
+
+def update_state(state: ICTState, bar: Bar) -> Tuple[float, ...]:
+    """
+    Roll a symbol's state forward with a new bar.
+
+    :param state: ICT state of the bar's symbol
+    :param bar: New bar
+    :return: Values of BUFFER_COLUMNS after the bar
+    """
+    state.update(bar)
+    return state.buffer_values()
+
+
+def evaluate_trade_conditions(
+    bar: Bar,
+    state: ICTState,
+    strategy_config: Dict[str, Any]
+) -> List[Signal]:
+    """
+    Evaluate whether trade conditions are met based on the current bar data.
+
+    A close beyond the Asian or previous-day range inside the trading window, confirmed by USDX
+    divergence and a Market Structure Shift (close beyond the SMA), gives one signal per symbol per day.
+
+    The divergence check needs the index bar of the pair bar's timestamp. A setup found before that
+    index bar has arrived waits for it, and its signal is returned when the index bar is evaluated,
+    so the outcome does not depend on which symbol's worker ran first.
+
+    :param bar: Current bar
+    :param state: ICT state of the bar's symbol, already updated with the bar
+    :param strategy_config: Dictionary containing strategy-specific configurations
+    :return: List of trading signals (for the index, signals of the pairs it confirmed)
+    """
+    usdx = state.usdx
+    signals = _resolve_pending(usdx, strategy_config)
+    if state.is_index or not state.trading or state.cleared_day == state.day:
+        return signals
+
+    symbol = bar.symbol
+    price = bar.close
+    levels = state.levels
+
+    if not state.ma.ready:
+        logger.debug(f"Insufficient SMA data for {symbol}.")
+        return signals
+
+    # Check if price breaches Asian or previous day levels (NaN levels never compare true)
+    if price > levels.asian_high:
+        action = 'BUY'
+    elif price < levels.asian_low:
+        action = 'SELL'
+    elif price > levels.prev_day_high:
+        action = 'BUY'
+    elif price < levels.prev_day_low:
+        action = 'SELL'
+    else:
+        return signals
+    stop_loss = levels.prev_day_low if action == 'BUY' else levels.prev_day_high
+
+    # Market Structure Shift must agree with the breach
+    ma = state.ma.value
+    if action == 'BUY' and not price > ma:
+        return signals
+    if action == 'SELL' and not price < ma:
+        return signals
+
+    setup = Setup(state, bar, action, stop_loss, ma)
+    if usdx.last_timestamp < setup.timestamp:
+        usdx.wait(setup)  # Resolved once the index bar of this timestamp is in
+        return signals
+    signal = _confirm(setup, usdx, strategy_config)
+    if signal:
+        signals.append(signal)
+    return signals
+
+
+def _resolve_pending(usdx: DollarIndexState, strategy_config: Dict[str, Any]) -> List[Signal]:
+    """
+    Confirm the waiting setups the index has caught up with, oldest first.
+    """
+    signals = []
+    pending = usdx.pending
+    while pending and pending[0].timestamp <= usdx.last_timestamp:
+        signal = _confirm(pending.popleft(), usdx, strategy_config)
+        if signal:
+            signals.append(signal)
+    return signals
+
+
+def _confirm(setup: Setup, usdx: DollarIndexState, strategy_config: Dict[str, Any]) -> Optional[Signal]:
+    """
+    Check a setup's USDX divergence as of its bar and generate its signal.
+    """
+    state = setup.state
+    if state.cleared_day == setup.day:
+        return None  # An earlier setup of the same day already gave a signal
+
+    # USDX falling while the pair rises confirms a BUY, the opposite a SELL
+    usdx_change = usdx.change_at(setup.timestamp)
+    if setup.action == 'BUY' and not usdx_change < 0 < setup.pair_change:
+        return None
+    if setup.action == 'SELL' and not usdx_change > 0 > setup.pair_change:
+        return None
+
+    state.cleared_day = setup.day
+    price, ma, stop_loss = setup.price, setup.ma, setup.stop_loss
+    if math.isnan(stop_loss):
+        stop_loss = price - (ma - price) if setup.action == 'BUY' else price + (price - ma)
+    return generate_signal(
+        symbol=setup.symbol,
+        action=setup.action,
+        price=price,
+        stop_loss=stop_loss,
+        strategy_params=strategy_config['params'],
+        sec_type=setup.sec_type
+    )
+
+
+def generate_signal(
+    symbol: str,
+    action: str,
+    price: float,
+    stop_loss: float,
+    strategy_params: Dict[str, Any],
+    sec_type: str
+) -> Optional[Signal]:
+    """
+    Generate a trading signal with the take profit placed `rr_ratio` times the risk away.
+
+    :param symbol: Symbol to trade
+    :param action: 'BUY' or 'SELL'
+    :param price: Entry price
+    :param stop_loss: Stop loss price
+    :param strategy_params: Dictionary containing strategy-specific parameters
+    :param sec_type: Security type
+    :return: Signal, or None if the stop is on the wrong side
+    """
+    risk = price - stop_loss if action == 'BUY' else stop_loss - price
+    if risk <= 0:
+        logger.warning(f"Invalid risk per unit for {symbol}. Skipping trade.")
+        return None
+    reward = risk * strategy_params.get('rr_ratio', 2.0)
+    tp = price + reward if action == 'BUY' else price - reward
+
+    signal = Signal(
+        symbol=symbol,
+        action=action,
+        price=price,
+        stop_loss=stop_loss,
+        take_profit=tp,
+        quantity=strategy_params.get('quantity', 100000),  # Adjusted by risk management
+        sec_type=sec_type,
+        currency=strategy_params.get('currency', 'USD'),
+        exchange=strategy_params.get('exchange', 'IDEALPRO'),
+        broker='IBKR'  # Specify the broker to use
+    )
+
+    logger.info(f"Generated {action} signal for {symbol} at {price} with SL={stop_loss} and TP={tp}")
+    return signal
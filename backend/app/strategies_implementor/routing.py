@@ -0,0 +1,158 @@
+# strategies_implementor/routing.py
+
+from types import ModuleType
+from typing import Dict, Any, List, Tuple
+from . import sma_crossover_strategy, ict_strategy
+from utils.helpers import bar_size_to_timedelta
+from utils.logger import get_logger
+
+
+_NO_ROUTES: List['StrategyRoute'] = []
+
+# Live strategy modules by configured strategy name. Each provides DEFAULT_PARAMS, BUFFER_COLUMNS,
+# indicator_lookback, prepare_historical_data, indicator_columns, update_state and
+# evaluate_trade_conditions. Modules using higher timeframes also provide
+# update_timeframe(state, timeframe, bar_buffer), called whenever the symbol's buffer of one of the
+# strategy's `timeframes` has been seeded or has received a bar; it may read that buffer's history.
+STRATEGY_MODULES: Dict[str, ModuleType] = {
+    'SMACrossoverStrategy': sma_crossover_strategy,
+    'ICTStrategy': ict_strategy,
+}
+
+
+class StrategyRoute:
+    """
+    One (strategy, symbol) subscription with everything needed to dispatch a bar to it.
+    """
+
+    __slots__ = ('name', 'module', 'config', 'params', 'symbol', 'sec_type', 'bar_size', 'timeframes', 'state', 'columns')
+
+    def __init__(self, name: str, module: ModuleType, config: Dict[str, Any], symbol: str, sec_type: str, bar_size: str):
+        self.name = name
+        self.module = module
+        self.config = config
+        self.params = config['params']
+        self.symbol = symbol
+        self.sec_type = sec_type
+        self.bar_size = bar_size
+        self.timeframes = tuple(StrategyRouter.timeframes(config)[1:])  # Higher timeframes passed to update_timeframe
+        self.state = None  # Indicator state, attached once history has been loaded
+        self.columns = tuple(f"{name}.{column}" for column in module.BUFFER_COLUMNS)  # Bar buffer columns owned by the route
+
+
+class StrategyRouter:
+    def __init__(self, strategies: List[Dict[str, Any]]):
+        """
+        Build the (symbol, bar_size) -> routes table once from the strategy configuration.
+
+        Routes are evaluated on bars of their strategy's primary bar size; bars of the strategy's
+        other timeframes only update the route's state (see timeframe_routes_for).
+
+        Strategies with `enabled: false` are skipped.
+
+        :param strategies: List of strategy configurations
+        """
+        self.logger = get_logger('StrategyRouter')
+        self.routes: Dict[Tuple[str, str], List[StrategyRoute]] = {}
+        self.timeframe_routes: Dict[Tuple[str, str], List[StrategyRoute]] = {}
+        self.by_key: Dict[Tuple[str, str], StrategyRoute] = {}
+        self.strategies = []
+        # symbol -> every bar size some strategy needs, shortest first
+        self.symbol_timeframes: Dict[str, List[str]] = {}
+
+        for strategy in strategies:
+            name = strategy.get('name')
+            if not strategy.get('enabled', True):
+                self.logger.info(f"Strategy {name} is disabled")
+                continue
+            module = STRATEGY_MODULES.get(name)
+            if module is None:
+                raise ValueError(f"Unknown strategy: {name}")
+            # Precompile parameters so the hot path never falls back to defaults
+            config = dict(strategy)
+            config['params'] = {**module.DEFAULT_PARAMS, **strategy.get('params', {})}
+            config['module'] = module
+            self.strategies.append(config)
+            bar_size = strategy.get('historical', {}).get('bar_size', '1m')
+            for symbol_info in strategy.get('symbols', []):
+                symbol = symbol_info.get('symbol')
+                route = StrategyRoute(name, module, config, symbol, symbol_info.get('sec_type', 'CASH'), bar_size)
+                self.routes.setdefault((symbol, bar_size), []).append(route)
+                if route.timeframes and not hasattr(module, 'update_timeframe'):
+                    raise ValueError(f"Strategy {name} does not support higher timeframes")
+                for timeframe in route.timeframes:
+                    self.timeframe_routes.setdefault((symbol, timeframe), []).append(route)
+                self.by_key[(name, symbol)] = route
+                timeframes = self.symbol_timeframes.setdefault(symbol, [])
+                timeframes.extend(tf for tf in self.timeframes(config) if tf not in timeframes)
+                timeframes.sort(key=bar_size_to_timedelta)
+
+        self.logger.info(f"Routing {len(self.routes)} symbols to {len(self.strategies)} strategies")
+
+    def routes_for(self, symbol: str, bar_size: str) -> List[StrategyRoute]:
+        """
+        Routes subscribed to a symbol's bars of a given size (empty list if none).
+        """
+        return self.routes.get((symbol, bar_size), _NO_ROUTES)
+
+    def timeframe_routes_for(self, symbol: str, bar_size: str) -> List[StrategyRoute]:
+        """
+        Routes using a symbol's bars of a given size as a higher timeframe (empty list if none).
+        """
+        return self.timeframe_routes.get((symbol, bar_size), _NO_ROUTES)
+
+    def route(self, strategy_name: str, symbol: str) -> StrategyRoute:
+        """
+        Route of a given strategy for a given symbol.
+        """
+        return self.by_key[(strategy_name, symbol)]
+
+    @staticmethod
+    def timeframes(strategy: Dict[str, Any]) -> List[str]:
+        """
+        Bar sizes a strategy uses: its primary bar size (historical.bar_size) plus its `timeframes`.
+        """
+        primary = strategy.get('historical', {}).get('bar_size', '1m')
+        return [primary] + [tf for tf in strategy.get('timeframes', []) if tf != primary]
+
+    def base_bar_size(self, symbol: str) -> str:
+        """
+        Bar size a symbol is subscribed at: the shortest one any strategy needs.
+        """
+        return self.symbol_timeframes[symbol][0]
+
+    def resample_plan(self) -> List[Tuple[str, str, List[str]]]:
+        """
+        Higher timeframes to build from each symbol's base subscription.
+
+        :return: List of (symbol, base bar size, [longer bar sizes])
+        """
+        return [
+            (symbol, timeframes[0], timeframes[1:])
+            for symbol, timeframes in self.symbol_timeframes.items() if len(timeframes) > 1
+        ]
+
+    def feed_configs(self) -> List[Dict[str, Any]]:
+        """
+        Build one data feed configuration per base bar size, subscribing each symbol only once
+        even if several strategies trade it or use it on several timeframes; longer bars are
+        resampled from the base stream (see resample_plan).
+
+        :return: List of feed configurations ('symbols', 'historical', 'live')
+        """
+        feeds: Dict[str, Dict[str, Any]] = {}
+        subscribed = set()
+        for strategy in self.strategies:
+            for symbol_info in strategy.get('symbols', []):
+                symbol = symbol_info.get('symbol')
+                if symbol in subscribed:
+                    continue
+                subscribed.add(symbol)
+                bar_size = self.base_bar_size(symbol)
+                feed = feeds.setdefault(bar_size, {
+                    'symbols': [],
+                    'historical': {**strategy.get('historical', {}), 'bar_size': bar_size},
+                    'live': dict(strategy.get('live', {}))
+                })
+                feed['symbols'].append(symbol_info)
+        return list(feeds.values())
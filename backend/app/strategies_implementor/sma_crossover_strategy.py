@@ -1,62 +1,191 @@
 # strategies_implementor/sma_crossover_strategy.py
 
-from typing import Dict, List, Any
-from datetime import datetime, time
+import math
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import time
+import numpy as np
 import pandas as pd
+from indicators import SMA, CrossOver
+from models import Bar, Signal
 from utils.logger import get_logger
 
 # Initialize logger for the strategy
 logger = get_logger('SMACrossoverStrategy')
 
+# Parameter defaults, resolved once per strategy when routes are built
+DEFAULT_PARAMS = {
+    'short_ma': 5,
+    'long_ma': 20,
+    'tp_percent': 14,
+    'sl_percent': 7,
+    'trend_timeframe': None,        # Higher timeframe (one of the strategy's `timeframes`) filtering entries
+    'trend_ma': 20,                 # SMA window on trend_timeframe bars
+    'quantity': 100000,
+    'currency': 'USD',
+    'exchange': 'IDEALPRO'
+}
 
-def prepare_historical_data(historical_data: Dict[str, pd.DataFrame], strategy_config: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+# Indicator values kept in the bar buffer for each route
+BUFFER_COLUMNS = ('short_sma', 'long_sma')
+
+
+class SMACrossoverState:
+    """
+    Streaming short/long SMA and crossover state for one symbol of one strategy.
+
+    Uses the shared indicators package, so every update costs O(1) regardless of how many
+    bars the process has seen, and signals match the backtest strategies bar for bar.
+    """
+
+    def __init__(self, short_window: int, long_window: int, trend_timeframe: Optional[str] = None, trend_ma: int = 20):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.trend_timeframe = trend_timeframe
+        self.trend_ma = trend_ma
+        self.short = SMA(short_window)
+        self.long = SMA(long_window)
+        self.cross = CrossOver()
+        self.short_sma = math.nan
+        self.long_sma = math.nan
+        self.crossover = 0.0
+        # Higher-timeframe trend: +1.0 close above its SMA, -1.0 below, NaN until known
+        self.trend = math.nan
+
+    def seed(self, closes: np.ndarray):
+        """
+        Seed the state from historical closes in one vectorized pass.
+
+        :param closes: Historical closing prices, oldest first
+        """
+        short = self.short.seed(closes)
+        long = self.long.seed(closes)
+        crossover = self.cross.seed(short, long)
+        if len(closes):
+            self.short_sma, self.long_sma, self.crossover = short[-1], long[-1], crossover[-1]
+
+    def update(self, close: float):
+        """
+        Add a closing price and roll the averages and crossover forward.
+
+        :param close: Closing price of the new bar
+        """
+        self.short_sma = self.short.update(close)
+        self.long_sma = self.long.update(close)
+        self.crossover = self.cross.update(self.short_sma, self.long_sma)
+
+    def ready(self) -> bool:
+        """
+        True once both averages are available.
+        """
+        return self.short.ready and self.long.ready
+
+
+def indicator_lookback(strategy_config: Dict[str, Any]) -> int:
     """
-    Calculate short-term and long-term SMAs for each symbol.
+    Number of bars the strategy's indicators look back over.
+
+    :param strategy_config: Dictionary containing strategy-specific configurations
+    :return: Largest indicator window
+    """
+    params = strategy_config.get('params', {})
+    lookback = max(params.get('short_ma', 5), params.get('long_ma', 20))
+    if params.get('trend_timeframe'):
+        lookback = max(lookback, params.get('trend_ma', 20))  # Same depth is kept on the trend timeframe
+    return lookback
+
+
+def prepare_historical_data(
+    historical_data: Dict[str, pd.DataFrame],
+    strategy_config: Dict[str, Any]
+) -> Dict[str, SMACrossoverState]:
+    """
+    Seed the running SMA state for each symbol from its historical bars.
 
     :param historical_data: Dictionary mapping symbols to their historical DataFrames
     :param strategy_config: Dictionary containing strategy-specific configurations
-    :return: Dictionary mapping symbols to DataFrames with SMA columns
+    :return: Dictionary mapping symbols to seeded SMA states
     """
     short_window = strategy_config['params']['short_ma']
     long_window = strategy_config['params']['long_ma']
+    trend_timeframe = strategy_config['params'].get('trend_timeframe')
+    if trend_timeframe and trend_timeframe not in strategy_config.get('timeframes', []):
+        raise ValueError(f"trend_timeframe {trend_timeframe} must be listed in the strategy's timeframes")
 
-    sma_data = {}
+    sma_states = {}
 
     for symbol in strategy_config['symbols']:
         sym = symbol['symbol']
         df = historical_data.get(sym)
+        state = SMACrossoverState(short_window, long_window, trend_timeframe, strategy_config['params'].get('trend_ma', 20))
 
         if df is None or df.empty:
             logger.warning(f"No historical data for {sym} to prepare SMA.")
-            continue
+        else:
+            state.seed(df['close'].to_numpy(dtype=float))
 
-        # Ensure datetime index
-        if not isinstance(df.index, pd.DatetimeIndex):
-            df.index = pd.to_datetime(df.index)
+        sma_states[sym] = state
 
-        # Calculate SMAs
-        df['short_sma'] = df['close'].rolling(window=short_window).mean()
-        df['long_sma'] = df['close'].rolling(window=long_window).mean()
+        logger.info(f"{sym} SMA calculated: short_window={short_window}, long_window={long_window}")
 
-        sma_data[sym] = df
+    return sma_states
 
-        logger.info(f"{sym} SMA calculated: short_window={short_window}, long_window={long_window}")
 
-    return sma_data
+def indicator_columns(df: pd.DataFrame, strategy_config: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    SMA columns over historical bars, to warm up the bar buffer.
+
+    :param df: Historical bars indexed by timestamp
+    :param strategy_config: Dictionary containing strategy-specific configurations
+    :return: Column name (see BUFFER_COLUMNS) -> values aligned with the bars
+    """
+    params = strategy_config['params']
+    closes = df['close'].to_numpy(dtype=float)
+    return {
+        'short_sma': SMA(params['short_ma']).seed(closes),
+        'long_sma': SMA(params['long_ma']).seed(closes)
+    }
+
+
+def update_state(sma_state: SMACrossoverState, bar: Bar) -> Tuple[float, float]:
+    """
+    Roll a symbol's SMA state forward with a new bar.
+
+    :param sma_state: SMA state of the bar's symbol
+    :param bar: New bar
+    :return: Values of BUFFER_COLUMNS after the bar
+    """
+    sma_state.update(bar.close)
+    return sma_state.short_sma, sma_state.long_sma
+
+
+def update_timeframe(sma_state: SMACrossoverState, timeframe: str, bar_buffer: Any):
+    """
+    Recompute the higher-timeframe trend after a trend_timeframe bar (or the buffer's warm-up).
+
+    :param sma_state: SMA state of the symbol
+    :param timeframe: Bar size of the buffer
+    :param bar_buffer: BarRingBuffer of the symbol's bars of that size
+    """
+    if timeframe != sma_state.trend_timeframe:
+        return
+    period = sma_state.trend_ma
+    closes = bar_buffer.view('close', period)
+    if len(closes) < period or np.isnan(closes).any():
+        sma_state.trend = math.nan
+        return
+    sma_state.trend = 1.0 if closes[-1] > closes.mean() else -1.0
 
 
 def evaluate_trade_conditions(
-    bar_data: Dict[str, Any],
-    sma_data: Dict[str, pd.DataFrame],
-    previous_sma: Dict[str, Dict[str, float]],
+    bar: Bar,
+    sma_state: SMACrossoverState,
     strategy_config: Dict[str, Any]
-) -> List[Dict[str, Any]]:
+) -> List[Signal]:
     """
     Evaluate whether trade conditions are met based on the current bar data.
 
-    :param bar_data: Dictionary containing current bar data
-    :param sma_data: Dictionary mapping symbols to DataFrames with SMA columns
-    :param previous_sma: Dictionary storing previous SMA values for trend detection
+    :param bar: Current bar
+    :param sma_state: SMA state of the bar's symbol, already updated with the bar
     :param strategy_config: Dictionary containing strategy-specific configurations
     :return: List of trading signals
     """
@@ -64,71 +193,49 @@ def evaluate_trade_conditions(
     trade_time_start = time(0, 0)
     trade_time_end = time(23, 59)
 
-    current_time = bar_data['timestamp'].time()
+    current_time = bar.timestamp.time()
 
     # Ensure trading is within operational hours
     if not (trade_time_start <= current_time <= trade_time_end):
         return signals  # Outside trading hours
 
-    symbol = bar_data['symbol']
-    price = bar_data['close']
-    sec_type = bar_data['sec_type']
-
-    # Retrieve SMA data
-    symbol_sma = sma_data.get(symbol)
-
-    if symbol_sma is None or symbol_sma.empty:
-        logger.warning(f"No SMA data available for {symbol}.")
-        return signals
-
-    # Get the latest two SMA values
-    latest = symbol_sma.iloc[-1]
-    previous = symbol_sma.iloc[-2] if len(symbol_sma) >= 2 else None
+    symbol = bar.symbol
+    price = bar.close
+    sec_type = bar.sec_type
 
-    if previous is None or pd.isna(previous['short_sma']) or pd.isna(previous['long_sma']):
+    if not sma_state.ready():
         logger.debug(f"Insufficient SMA data for {symbol}.")
         return signals  # Not enough data to evaluate
 
-    # Store previous SMA for trend detection
-    prev_short_sma = previous_sma.get(symbol, {}).get('short_sma')
-    prev_long_sma = previous_sma.get(symbol, {}).get('long_sma')
-
-    current_short_sma = latest['short_sma']
-    current_long_sma = latest['long_sma']
-
-    # Update previous SMA
-    previous_sma[symbol] = {
-        'short_sma': current_short_sma,
-        'long_sma': current_long_sma
-    }
+    # With a trend timeframe, only trade crossovers in the direction of the higher-timeframe trend
+    trend = sma_state.trend if sma_state.trend_timeframe else None
 
     # Determine if a crossover occurred
     # Bullish Crossover
-    if prev_short_sma and prev_long_sma:
-        if (prev_short_sma <= prev_long_sma) and (current_short_sma > current_long_sma):
-            # Generate BUY signal
-            signal = generate_signal(
-                symbol=symbol,
-                action='BUY',
-                price=price,
-                strategy_params=strategy_config['params'],
-                sec_type=sec_type
-            )
-            if signal:
-                signals.append(signal)
-
-        # Bearish Crossover
-        elif (prev_short_sma >= prev_long_sma) and (current_short_sma < current_long_sma):
-            # Generate SELL signal
-            signal = generate_signal(
-                symbol=symbol,
-                action='SELL',
-                price=price,
-                strategy_params=strategy_config['params'],
-                sec_type=sec_type
-            )
-            if signal:
-                signals.append(signal)
+    if sma_state.crossover > 0 and (trend is None or trend > 0):
+        # Generate BUY signal
+        signal = generate_signal(
+            symbol=symbol,
+            action='BUY',
+            price=price,
+            strategy_params=strategy_config['params'],
+            sec_type=sec_type
+        )
+        if signal:
+            signals.append(signal)
+
+    # Bearish Crossover
+    elif sma_state.crossover < 0 and (trend is None or trend < 0):
+        # Generate SELL signal
+        signal = generate_signal(
+            symbol=symbol,
+            action='SELL',
+            price=price,
+            strategy_params=strategy_config['params'],
+            sec_type=sec_type
+        )
+        if signal:
+            signals.append(signal)
 
     return signals
 
@@ -139,7 +246,7 @@ def generate_signal(
     price: float,
     strategy_params: Dict[str, Any],
     sec_type: str
-) -> Dict[str, Any]:
+) -> Optional[Signal]:
     """
     Generate a trading signal based on the action and price.
 
@@ -148,9 +255,8 @@ def generate_signal(
     :param price: Entry price
     :param strategy_params: Dictionary containing strategy-specific parameters
     :param sec_type: Security type
-    :return: Dictionary containing signal details
+    :return: Signal, or None for an invalid action
     """
-    signal = {}
     tp_percent = strategy_params.get('tp_percent', 14)
     sl_percent = strategy_params.get('sl_percent', 7)
 
@@ -164,19 +270,18 @@ def generate_signal(
         logger.error(f"Invalid action: {action}")
         return None
 
-    signal = {
-        'broker': 'IBKR',  # Specify the broker to use
-        'symbol': symbol,
-        'action': action.upper(),
-        'price': price,
-        'stop_loss': sl,
-        'take_profit': tp,
-        'quantity': strategy_params.get('quantity', 100000),  # Adjust based on risk management
-        'timestamp': datetime.utcnow(),
-        'sec_type': sec_type,
-        'currency': strategy_params.get('currency', 'USD'),       # Default currency; adjust as needed
-        'exchange': strategy_params.get('exchange', 'IDEALPRO')   # Default exchange; adjust as needed
-    }
+    signal = Signal(
+        symbol=symbol,
+        action=action.upper(),
+        price=price,
+        stop_loss=sl,
+        take_profit=tp,
+        quantity=strategy_params.get('quantity', 100000),  # Adjusted by risk management
+        sec_type=sec_type,
+        currency=strategy_params.get('currency', 'USD'),
+        exchange=strategy_params.get('exchange', 'IDEALPRO'),
+        broker='IBKR'  # Specify the broker to use
+    )
 
     logger.info(f"Generated {action.upper()} signal for {symbol} at {price} with SL={sl} and TP={tp}")
     return signal
@@ -0,0 +1,28 @@
+# backend/app/strategies_tester/analyzers.py
+
+from array import array
+import backtrader as bt
+import pandas as pd
+from utils.helpers import num_to_datetime64
+
+
+class EquityCurve(bt.Analyzer):
+    """
+    Record the portfolio value at the end of every bar.
+
+    Values and date numbers are kept in compact float arrays (16 bytes per bar), so the curve stays
+    cheap on long reduced-memory runs. get_analysis() returns a pandas Series indexed by bar
+    datetime, in the same shape as the 'equity' Series of the vectorized engine.
+    """
+
+    def start(self):
+        self.dates = array('d')
+        self.values = array('d')
+
+    def next(self):
+        self.dates.append(self.data.datetime[0])
+        self.values.append(self.strategy.broker.getvalue())
+
+    def get_analysis(self):
+        index = pd.DatetimeIndex(num_to_datetime64(self.dates))
+        return pd.Series(self.values, index=index, name='equity', dtype=float)
@@ -1,6 +1,7 @@
 # backend/app/strategies/bollinger_bands_strategy.py
 
 import backtrader as bt
+from indicators.bt_adapters import StreamingBollingerBands
 
 class BollingerBandsStrategy(bt.Strategy):
     params = (
@@ -11,7 +12,7 @@ class BollingerBandsStrategy(bt.Strategy):
     )
 
     def __init__(self):
-        self.boll = bt.indicators.BollingerBands(
+        self.boll = StreamingBollingerBands(
             self.data.close,
             period=self.params.period,
             devfactor=self.params.devfactor
@@ -1,6 +1,7 @@
 # backend/app/strategies/breakout_strategy.py
 
 import backtrader as bt
+from indicators.bt_adapters import StreamingHighest, StreamingLowest
 
 class BreakoutStrategy(bt.Strategy):
     params = (
@@ -10,8 +11,8 @@ class BreakoutStrategy(bt.Strategy):
     )
 
     def __init__(self):
-        self.highest = bt.indicators.Highest(self.data.close, period=self.params.lookback)
-        self.lowest = bt.indicators.Lowest(self.data.close, period=self.params.lookback)
+        self.highest = StreamingHighest(self.data.close, period=self.params.lookback)
+        self.lowest = StreamingLowest(self.data.close, period=self.params.lookback)
 
     def next(self):
         if self.data.close[0] > self.highest[-1] and self.position.size == 0:
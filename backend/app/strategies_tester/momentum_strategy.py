@@ -1,6 +1,7 @@
 # backend/app/strategies/momentum_strategy.py
 
 import backtrader as bt
+from indicators.bt_adapters import StreamingRSI
 
 class MomentumStrategy(bt.Strategy):
     params = (
@@ -12,7 +13,7 @@ class MomentumStrategy(bt.Strategy):
     )
 
     def __init__(self):
-        self.rsi = bt.indicators.RSI_SMA(
+        self.rsi = StreamingRSI(
             self.data.close, period=self.params.momentum_period
         )
 
@@ -1,6 +1,7 @@
 # backend/app/strategies/moving_average_crossover.py
 
 import backtrader as bt
+from indicators.bt_adapters import StreamingSMA, StreamingCrossOver
 
 class MovingAverageCrossover(bt.Strategy):
     params = (
@@ -9,13 +10,13 @@ class MovingAverageCrossover(bt.Strategy):
     )
 
     def __init__(self):
-        self.fast_ma = bt.indicators.SimpleMovingAverage(
+        self.fast_ma = StreamingSMA(
             self.data.close, period=self.params.fast_length
         )
-        self.slow_ma = bt.indicators.SimpleMovingAverage(
+        self.slow_ma = StreamingSMA(
             self.data.close, period=self.params.slow_length
         )
-        self.crossover = bt.indicators.CrossOver(self.fast_ma, self.slow_ma)
+        self.crossover = StreamingCrossOver(self.fast_ma, self.slow_ma)
 
     def next(self):
         if not self.position:
@@ -0,0 +1,229 @@
+# backend/app/strategies_tester/optimizer.py
+
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from .moving_average_crossover import MovingAverageCrossover
+from .momentum_strategy import MomentumStrategy
+from .breakout_strategy import BreakoutStrategy
+from .bollinger_bands_strategy import BollingerBandsStrategy
+from .vectorized import SIGNAL_FUNCTIONS, run_vectorized_backtest
+from .result_cache import ResultCache
+
+# Parameter sweeps over the strategies_tester strategies. Market data is copied once into shared
+# memory; every worker process maps it on start-up, so tasks only carry a parameter dictionary.
+# Strategies with a vectorized implementation are run through it, the others through backtrader.
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+# Default search spaces used when no grid is given
+DEFAULT_GRIDS: Dict[type, Dict[str, List[Any]]] = {
+    MovingAverageCrossover: {'fast_length': [5, 10, 15, 20], 'slow_length': [30, 50, 100, 200]},
+    MomentumStrategy: {'momentum_period': [7, 14, 21], 'overbought': [65, 70, 75, 80], 'oversold': [20, 25, 30, 35]},
+    BreakoutStrategy: {'lookback': [10, 20, 30, 50, 100]},
+    BollingerBandsStrategy: {'period': [10, 20, 30, 50], 'devfactor': [1.5, 2.0, 2.5, 3.0]},
+}
+
+# Metrics returned per combination (equity curves and trade lists stay in the workers)
+RESULT_METRICS = ('final_value', 'sharpe', 'max_drawdown', 'total_trades', 'wins', 'losses', 'win_rate', 'pnl')
+
+
+def parameter_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Expand a grid ({param: [values]}) into every parameter combination.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_parameters(space: Dict[str, Any], samples: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Draw random parameter combinations.
+
+    :param space: {param: (low, high)} for a uniform range (integers if both bounds are ints)
+                  or {param: [values]} to choose from
+    :param samples: Number of combinations to draw
+    :param seed: Random seed for reproducible searches
+    :return: List of distinct parameter dictionaries
+    """
+    rng = random.Random(seed)
+    combinations = []
+    seen = set()
+    for _ in range(samples * 10):
+        if len(combinations) == samples:
+            break
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, tuple) and len(values) == 2:
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    params[name] = rng.randint(low, high)
+                else:
+                    params[name] = rng.uniform(low, high)
+            else:
+                params[name] = rng.choice(list(values))
+        key = tuple(sorted(params.items()))
+        if key not in seen:
+            seen.add(key)
+            combinations.append(params)
+    return combinations
+
+
+class SharedFrames:
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        """
+        Copy OHLCV frames into shared memory blocks, one per frame.
+
+        Each block holds the int64 timestamps followed by the float64 OHLCV columns.
+        Use as a context manager so the blocks are released when the sweep ends.
+
+        :param frames: Name -> OHLCV DataFrame indexed by timestamp
+        """
+        self.blocks: List[shared_memory.SharedMemory] = []
+        self.handles: Dict[str, Tuple[str, int]] = {}
+        for name, df in frames.items():
+            rows = len(df)
+            block = shared_memory.SharedMemory(create=True, size=max(rows * 8 * (1 + len(OHLCV)), 1))
+            index, values = self._views(block, rows)
+            index[:] = pd.DatetimeIndex(df.index).to_numpy(dtype='datetime64[ns]').view(np.int64)
+            values[:] = df[list(OHLCV)].to_numpy(dtype=float)
+            self.blocks.append(block)
+            self.handles[name] = (block.name, rows)
+
+    @staticmethod
+    def _views(block: shared_memory.SharedMemory, rows: int) -> Tuple[np.ndarray, np.ndarray]:
+        index = np.ndarray((rows,), dtype=np.int64, buffer=block.buf)
+        values = np.ndarray((rows, len(OHLCV)), dtype=np.float64, buffer=block.buf, offset=rows * 8)
+        return index, values
+
+    @classmethod
+    def attach(cls, handles: Dict[str, Tuple[str, int]]) -> Tuple[Dict[str, pd.DataFrame], List[shared_memory.SharedMemory]]:
+        """
+        Map shared frames in a worker process without copying them.
+
+        :param handles: SharedFrames.handles from the parent process
+        :return: (name -> DataFrame, blocks that must stay referenced while the frames are used)
+        """
+        frames, blocks = {}, []
+        for name, (block_name, rows) in handles.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            index, values = cls._views(block, rows)
+            frames[name] = pd.DataFrame(values, index=pd.DatetimeIndex(index.view('datetime64[ns]')), columns=list(OHLCV), copy=False)
+            blocks.append(block)
+        return frames, blocks
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks.clear()
+
+    def __enter__(self) -> 'SharedFrames':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Per-process state set by the pool initializer
+_worker_frames: Dict[str, pd.DataFrame] = {}
+_worker_blocks: List[shared_memory.SharedMemory] = []
+_worker_cache: Optional[ResultCache] = None
+
+
+def _init_worker(handles: Dict[str, Tuple[str, int]], cache_root: Optional[str] = None):
+    global _worker_frames, _worker_blocks, _worker_cache
+    _worker_frames, _worker_blocks = SharedFrames.attach(handles)
+    _worker_cache = ResultCache(cache_root) if cache_root else None
+
+
+def evaluate(
+    strategy: type,
+    frames: Dict[str, pd.DataFrame],
+    params: Dict[str, Any],
+    initial_cash: float = 100000,
+    commission: float = 0.001,
+    cache: Optional[ResultCache] = None
+) -> Dict[str, Any]:
+    """
+    Backtest one parameter combination headlessly and return its metrics.
+
+    The strategies only trade the first frame; the others are passed to backtrader as extra feeds.
+    """
+    if strategy in SIGNAL_FUNCTIONS:
+        results = run_vectorized_backtest(
+            strategy, next(iter(frames.values())), params, initial_cash, commission, cache=cache
+        )
+    else:
+        import backtrader as bt
+        from backtest import run_backtest
+        data_feeds = [bt.feeds.PandasData(dataname=df, name=name) for name, df in frames.items()]
+        results = run_backtest(
+            strategy, data_feeds, initial_cash=initial_cash, commission=commission,
+            params=params, verbose=False, plot=False, cache=cache
+        )
+    metrics = {metric: results.get(metric) for metric in RESULT_METRICS}
+    metrics.update(params)
+    return metrics
+
+
+def _evaluate_shared(task: Tuple[type, Dict[str, Any], float, float]) -> Dict[str, Any]:
+    strategy, params, initial_cash, commission = task
+    return evaluate(strategy, _worker_frames, params, initial_cash, commission, cache=_worker_cache)
+
+
+def rank_results(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rank parameter combinations by Sharpe (higher), max drawdown (lower) and PnL (higher).
+
+    Each metric is ranked separately and the combinations are ordered by their mean rank, with PnL
+    breaking ties. A missing Sharpe (too short a history) ranks last on that metric.
+    """
+    if results.empty:
+        return results
+    ranks = pd.concat([
+        results['sharpe'].astype(float).rank(ascending=False, na_option='bottom'),
+        results['max_drawdown'].astype(float).rank(ascending=True),
+        results['pnl'].astype(float).rank(ascending=False),
+    ], axis=1)
+    ranked = results.assign(score=ranks.mean(axis=1))
+    ranked = ranked.sort_values(['score', 'pnl'], ascending=[True, False]).reset_index(drop=True)
+    ranked.index += 1
+    ranked.index.name = 'rank'
+    return ranked
+
+
+def optimize(
+    strategy: type,
+    frames: Dict[str, pd.DataFrame],
+    combinations: List[Dict[str, Any]],
+    initial_cash: float = 100000,
+    commission: float = 0.001,
+    workers: Optional[int] = None,
+    cache_root: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Run every parameter combination in parallel and rank the results.
+
+    :param strategy: strategies_tester strategy class
+    :param frames: Name -> OHLCV DataFrame (the first one is traded)
+    :param combinations: Parameter dictionaries, e.g. from parameter_grid() or random_parameters()
+    :param initial_cash: Starting cash
+    :param commission: Commission as a fraction of traded value
+    :param workers: Number of worker processes (all cores if None)
+    :param cache_root: ResultCache directory; combinations already run are read from it
+    :return: One row per combination, best first
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [(strategy, params, initial_cash, commission) for params in combinations]
+    with SharedFrames(frames) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared.handles, cache_root)) as pool:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            results = list(pool.map(_evaluate_shared, tasks, chunksize=chunksize))
+    return rank_results(pd.DataFrame(results))
@@ -0,0 +1,197 @@
+# backend/app/strategies_tester/result_cache.py
+
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+from utils.logger import get_logger
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Hash the timestamps, column names and values of a bar DataFrame.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.DatetimeIndex(df.index).to_numpy(dtype='datetime64[ns]').view(np.int64).tobytes())
+    for column in sorted(df.columns):
+        digest.update(str(column).encode())
+        digest.update(np.ascontiguousarray(df[column].to_numpy(dtype=float)).tobytes())
+    return digest.hexdigest()
+
+
+def _module_source(obj: Any) -> str:
+    try:
+        return inspect.getsource(sys.modules[obj.__module__])
+    except (OSError, TypeError, KeyError):
+        return obj.__qualname__
+
+
+def source_digest(obj: Any) -> str:
+    """
+    Short hash of the source of the module defining `obj`, used to tie cache keys to engine code.
+    """
+    return hashlib.sha256(_module_source(obj).encode()).hexdigest()[:16]
+
+
+# Modules and packages whose code every strategy and engine result depends on
+SHARED_SOURCES = ('indicators', 'utils.helpers', 'strategies_tester.analyzers')
+
+
+@lru_cache(maxsize=None)
+def shared_source_digest() -> str:
+    """
+    Hash of the source of SHARED_SOURCES (every .py file of a package), computed once per process.
+    """
+    digest = hashlib.sha256()
+    for name in SHARED_SOURCES:
+        module = importlib.import_module(name)
+        if hasattr(module, '__path__'):
+            directory = os.path.dirname(module.__file__)
+            paths = sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith('.py'))
+        else:
+            paths = [module.__file__]
+        for path in paths:
+            digest.update(os.path.basename(path).encode())
+            with open(path, 'rb') as file:
+                digest.update(file.read())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root: str = 'data/results', max_entries: int = 1000, max_bytes: Optional[int] = None):
+        """
+        Initialize the on-disk backtest result cache.
+
+        Entries are addressed by a hash of everything that determines a result, so a stale entry is
+        never returned; it simply stops being looked up and ages out. Reads refresh an entry's
+        modification time and eviction removes the least recently used entries first.
+
+        :param root: Directory holding one pickle file per entry
+        :param max_entries: Maximum number of entries kept
+        :param max_bytes: Maximum total size of the entries (unbounded if None)
+        """
+        self.root = root
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.logger = get_logger('ResultCache')
+        # id(frame) -> (weak reference, fingerprint); frames are treated as immutable once passed in
+        self._fingerprints: Dict[int, Any] = {}
+
+    def fingerprint(self, df: pd.DataFrame) -> str:
+        """
+        Fingerprint of a frame, computed once per frame object.
+        """
+        entry = self._fingerprints.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        fingerprint = frame_fingerprint(df)
+        self._fingerprints[id(df)] = (weakref.ref(df, lambda _, key=id(df): self._fingerprints.pop(key, None)), fingerprint)
+        return fingerprint
+
+    def key(
+        self,
+        strategy: type,
+        params: Dict[str, Any],
+        frames: Iterable[pd.DataFrame],
+        engine: str,
+        **broker_settings: Any
+    ) -> str:
+        """
+        Compute the cache key of a backtest.
+
+        :param strategy: Strategy class (its module source and SHARED_SOURCES, such as the indicator
+                         package, are hashed, so code edits invalidate entries)
+        :param params: Resolved strategy parameters
+        :param frames: Input bar DataFrames, in feed order
+        :param engine: Engine identifier, including anything whose code affects the results
+        :param broker_settings: Cash, commission and other broker settings
+        :return: Hex digest
+        """
+        digest = hashlib.sha256()
+        digest.update(strategy.__qualname__.encode())
+        digest.update(_module_source(strategy).encode())
+        digest.update(shared_source_digest().encode())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        for df in frames:
+            digest.update(self.fingerprint(df).encode())
+        digest.update(engine.encode())
+        digest.update(json.dumps(broker_settings, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached results for a key, or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                results = pickle.load(file)
+            os.utime(path)  # Mark as recently used
+            return results
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            self._remove(path)
+            return None
+
+    def put(self, key: str, results: Dict[str, Any]):
+        """
+        Store results under a key and evict old entries if the cache is over its limits.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            pickle.dump(results, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache is within max_entries and max_bytes.
+        """
+        entries = []
+        with os.scandir(self.root) as scan:
+            for entry in scan:
+                if entry.name.endswith('.pkl'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue  # Evicted concurrently by another process
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            if count <= self.max_entries and (self.max_bytes is None or total <= self.max_bytes):
+                break
+            self._remove(path)
+            count -= 1
+            total -= size
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """
+        Remove every entry.
+        """
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if name.endswith('.pkl'):
+                    self._remove(os.path.join(self.root, name))
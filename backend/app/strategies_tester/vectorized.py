@@ -0,0 +1,308 @@
+# backend/app/strategies_tester/vectorized.py
+
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from indicators import SMA, RSI, Highest, Lowest, BollingerBands, CrossOver
+from .result_cache import ResultCache, source_digest
+from .moving_average_crossover import MovingAverageCrossover
+from .momentum_strategy import MomentumStrategy
+from .breakout_strategy import BreakoutStrategy
+from .bollinger_bands_strategy import BollingerBandsStrategy
+
+# Vectorized counterpart of run_backtest for the long-only rule-based strategies. Signals are
+# computed over the whole series with the indicators' seed(), and the simulation replays
+# backtrader's default broker: market orders are sized on the signal bar's close, checked against
+# cash, and filled at the next bar's open with a percentage commission. The Python loop only
+# visits trades, never individual bars.
+
+Signals = Tuple[np.ndarray, np.ndarray]
+
+
+def _previous(values: np.ndarray) -> np.ndarray:
+    return np.concatenate(([np.nan], values[:-1]))
+
+
+def _ma_crossover_signals(df: pd.DataFrame, params: Dict[str, Any]) -> Signals:
+    close = df['close'].to_numpy(dtype=float)
+    fast = SMA(params['fast_length']).seed(close)
+    slow = SMA(params['slow_length']).seed(close)
+    crossover = CrossOver().seed(fast, slow)
+    return crossover > 0, crossover < 0
+
+
+def _momentum_signals(df: pd.DataFrame, params: Dict[str, Any]) -> Signals:
+    rsi = RSI(params['momentum_period']).seed(df['close'].to_numpy(dtype=float))
+    return rsi < params['oversold'], rsi > params['overbought']
+
+
+def _breakout_signals(df: pd.DataFrame, params: Dict[str, Any]) -> Signals:
+    close = df['close'].to_numpy(dtype=float)
+    highest = _previous(Highest(params['lookback']).seed(close))
+    lowest = _previous(Lowest(params['lookback']).seed(close))
+    return close > highest, close < lowest
+
+
+def _bollinger_signals(df: pd.DataFrame, params: Dict[str, Any]) -> Signals:
+    close = df['close'].to_numpy(dtype=float)
+    _, top, bot = BollingerBands(params['period'], params['devfactor']).seed(close)
+    return close < bot, close > top
+
+
+# Strategy class -> function computing (entry, exit) signal arrays
+SIGNAL_FUNCTIONS: Dict[type, Callable[[pd.DataFrame, Dict[str, Any]], Signals]] = {
+    MovingAverageCrossover: _ma_crossover_signals,
+    MomentumStrategy: _momentum_signals,
+    BreakoutStrategy: _breakout_signals,
+    BollingerBandsStrategy: _bollinger_signals,
+}
+
+
+def strategy_params(strategy: type, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Resolve a backtrader strategy's parameters: class defaults overridden by `params`.
+    """
+    resolved = dict(strategy.params._getitems())
+    resolved.update(params or {})
+    return resolved
+
+
+def generate_signals(strategy: type, df: pd.DataFrame, params: Optional[Dict[str, Any]] = None) -> Signals:
+    """
+    Compute entry and exit signals of a strategy over a whole bar series.
+
+    :param strategy: Backtrader strategy class with a vectorized implementation
+    :param df: Bars with at least a 'close' column, oldest first
+    :param params: Parameter overrides
+    :return: (entries, exits) boolean arrays aligned with df
+    """
+    if strategy not in SIGNAL_FUNCTIONS:
+        raise ValueError(f"No vectorized implementation for {strategy.__name__}")
+    return SIGNAL_FUNCTIONS[strategy](df, strategy_params(strategy, params))
+
+
+def simulate(
+    df: pd.DataFrame,
+    entries: np.ndarray,
+    exits: np.ndarray,
+    initial_cash: float = 100000,
+    commission: float = 0.001,
+    order_percentage: Optional[float] = None,
+    stake: int = 1
+) -> Dict[str, Any]:
+    """
+    Simulate a long-only strategy from its signals.
+
+    An entry signal is only acted on while flat and an exit signal only while long. Orders are
+    filled at the open of the bar after the signal; an order placed on the last bar never fills.
+
+    :param df: Bars with 'open' and 'close' columns, oldest first
+    :param entries: Entry signal per bar
+    :param exits: Exit signal per bar
+    :param initial_cash: Starting cash
+    :param commission: Commission as a fraction of traded value
+    :param order_percentage: Fraction of cash to invest per entry (fixed `stake` if None)
+    :param stake: Order size when order_percentage is None
+    :return: Dictionary with 'equity' and 'position' arrays and a 'trades' DataFrame
+    """
+    opens = df['open'].to_numpy(dtype=float)
+    closes = df['close'].to_numpy(dtype=float)
+    n = len(closes)
+    entry_bars = np.flatnonzero(entries)
+    exit_bars = np.flatnonzero(exits)
+
+    position_delta = np.zeros(n + 1)
+    cash_delta = np.zeros(n + 1)
+    trades = []
+    cash = initial_cash
+    t = 0
+    while True:
+        k = np.searchsorted(entry_bars, t)
+        if k == len(entry_bars) or entry_bars[k] + 1 >= n:
+            break
+        signal = entry_bars[k]
+        t = signal + 1
+        size = stake if order_percentage is None else int(cash * order_percentage / closes[signal])
+        if size <= 0:
+            continue
+        # Backtrader rejects the order (margin) if it cannot be paid for at the signal close,
+        # and opens nothing if the fill at the next open cannot be paid for
+        if size * closes[signal] * (1 + commission) > cash:
+            continue
+        entry_bar, entry_price = signal + 1, opens[signal + 1]
+        entry_commission = size * entry_price * commission
+        if size * entry_price + entry_commission > cash:
+            continue
+        cash -= size * entry_price + entry_commission
+        position_delta[entry_bar] += size
+        cash_delta[entry_bar] -= size * entry_price + entry_commission
+        trade = {
+            'entry_time': df.index[entry_bar],
+            'entry_price': entry_price,
+            'size': size,
+            'exit_time': pd.NaT,
+            'exit_price': np.nan,
+            'pnl': np.nan,
+            'pnlcomm': np.nan,
+        }
+        trades.append(trade)
+
+        k = np.searchsorted(exit_bars, entry_bar)
+        if k == len(exit_bars) or exit_bars[k] + 1 >= n:
+            break  # Still open at the end of the data
+        exit_bar, exit_price = exit_bars[k] + 1, opens[exit_bars[k] + 1]
+        exit_commission = size * exit_price * commission
+        cash += size * exit_price - exit_commission
+        position_delta[exit_bar] -= size
+        cash_delta[exit_bar] += size * exit_price - exit_commission
+        pnl = size * (exit_price - entry_price)
+        trade.update(
+            exit_time=df.index[exit_bar],
+            exit_price=exit_price,
+            pnl=pnl,
+            pnlcomm=pnl - entry_commission - exit_commission
+        )
+        t = exit_bar
+
+    position = np.cumsum(position_delta[:n])
+    equity = initial_cash + np.cumsum(cash_delta[:n]) + position * closes
+    return {
+        'equity': equity,
+        'position': position,
+        'trades': pd.DataFrame(trades, columns=[
+            'entry_time', 'entry_price', 'size', 'exit_time', 'exit_price', 'pnl', 'pnlcomm'
+        ]),
+    }
+
+
+def performance_metrics(
+    equity: pd.Series,
+    trades: pd.DataFrame,
+    initial_cash: float,
+    riskfreerate: float = 0.01
+) -> Dict[str, Any]:
+    """
+    Compute the report figures with the same conventions as backtrader's analyzers.
+
+    Sharpe is taken over yearly returns with a 1% risk-free rate (None with fewer than two
+    distinct yearly returns), drawdown is in percent of the running peak, and a closed trade
+    with zero net PnL counts as a win.
+
+    :param equity: Portfolio value per bar, indexed by timestamp
+    :param trades: Trades as returned by simulate()
+    :param initial_cash: Starting cash
+    :param riskfreerate: Yearly risk-free rate
+    :return: Dictionary of metrics
+    """
+    values = equity.to_numpy(dtype=float)
+    yearly = equity.groupby(equity.index.year).last().to_numpy(dtype=float)
+    returns = yearly / np.concatenate(([initial_cash], yearly[:-1])) - 1.0 - riskfreerate
+    deviation = returns.std() if len(returns) else 0.0
+    sharpe = float(returns.mean() / deviation) if deviation > 0 else None
+
+    peak = np.maximum.accumulate(np.concatenate(([initial_cash], values)))[1:]
+    max_drawdown = float(np.max(100.0 * (peak - values) / peak)) if len(values) else 0.0
+
+    closed = trades.dropna(subset=['pnlcomm'])
+    wins = int((closed['pnlcomm'] >= 0).sum())
+    losses = len(closed) - wins
+    return {
+        'final_value': float(values[-1]) if len(values) else initial_cash,
+        'sharpe': sharpe,
+        'max_drawdown': max_drawdown,
+        'total_trades': len(trades),
+        'closed_trades': len(closed),
+        'wins': wins,
+        'losses': losses,
+        'win_rate': 100.0 * wins / len(closed) if len(closed) else None,
+        'pnl': float(closed['pnlcomm'].sum()),
+    }
+
+
+def run_vectorized_backtest(
+    strategy: type,
+    df: pd.DataFrame,
+    params: Optional[Dict[str, Any]] = None,
+    initial_cash: float = 100000,
+    commission: float = 0.001,
+    cache: Optional[ResultCache] = None
+) -> Dict[str, Any]:
+    """
+    Vectorized equivalent of backtest.run_backtest for a single data feed.
+
+    :param strategy: Backtrader strategy class with a vectorized implementation
+    :param df: OHLCV bars indexed by timestamp, oldest first
+    :param params: Parameter overrides
+    :param initial_cash: Starting cash
+    :param commission: Commission as a fraction of traded value
+    :param cache: Result cache to look the run up in and store it to
+    :return: Metrics dictionary plus the 'equity' Series and 'trades' DataFrame
+    """
+    resolved = strategy_params(strategy, params)
+    key = None
+    if cache is not None:
+        key = cache.key(
+            strategy, resolved, [df], f"vectorized {source_digest(simulate)}",
+            initial_cash=initial_cash, commission=commission
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    entries, exits = generate_signals(strategy, df, resolved)
+    simulation = simulate(
+        df,
+        entries,
+        exits,
+        initial_cash=initial_cash,
+        commission=commission,
+        order_percentage=resolved.get('order_percentage')
+    )
+    equity = pd.Series(simulation['equity'], index=df.index, name='equity')
+    results = performance_metrics(equity, simulation['trades'], initial_cash)
+    results.update(equity=equity, trades=simulation['trades'])
+    if key is not None:
+        cache.put(key, results)
+    return results
+
+
+PARITY_METRICS = ('final_value', 'pnl', 'max_drawdown', 'sharpe', 'total_trades', 'wins', 'losses')
+
+
+def parity_report(
+    strategy: type,
+    df: pd.DataFrame,
+    params: Optional[Dict[str, Any]] = None,
+    initial_cash: float = 100000,
+    commission: float = 0.001,
+    tolerance: float = 1e-6
+) -> Dict[str, Any]:
+    """
+    Run a strategy through both backtrader and the vectorized engine and compare the results.
+
+    :param strategy: Backtrader strategy class with a vectorized implementation
+    :param df: OHLCV bars indexed by timestamp, oldest first
+    :param params: Parameter overrides
+    :param initial_cash: Starting cash
+    :param commission: Commission as a fraction of traded value
+    :param tolerance: Relative tolerance for floating point metrics
+    :return: Dictionary mapping each metric to (backtrader, vectorized, match)
+    """
+    import backtrader as bt
+    from backtest import run_backtest
+
+    data = bt.feeds.PandasData(dataname=df)
+    reference = run_backtest(
+        strategy, [data], initial_cash=initial_cash, commission=commission,
+        params=params, verbose=False, plot=False
+    )
+    vectorized = run_vectorized_backtest(strategy, df, params, initial_cash, commission)
+    report = {}
+    for metric in PARITY_METRICS:
+        expected, actual = reference[metric], vectorized[metric]
+        if expected is None or actual is None:
+            match = expected is None and actual is None
+        else:
+            match = bool(np.isclose(expected, actual, rtol=tolerance, atol=tolerance))
+        report[metric] = (expected, actual, match)
+    return report
@@ -0,0 +1,205 @@
+# backend/app/strategies_tester/walk_forward.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from . import optimizer
+from .optimizer import SharedFrames, RESULT_METRICS, rank_results
+from .vectorized import SIGNAL_FUNCTIONS, generate_signals, strategy_params, simulate, performance_metrics
+
+# Walk-forward optimization: parameters are optimized on each in-sample window and evaluated on the
+# out-of-sample window that follows it. Indicators are causal, so every parameter combination's
+# signals are computed once over the whole series (cached per worker process) and only sliced per
+# window; overlapping windows never recompute them.
+
+Window = Tuple[int, int, int, int]   # (in-sample start, in-sample end, out-of-sample start, out-of-sample end)
+Length = Union[int, str, pd.Timedelta]
+
+
+def _position(index: pd.DatetimeIndex, start: int, length: Length) -> int:
+    """
+    Position `length` after `start`: a number of bars or a time span (e.g. '30D').
+    """
+    if isinstance(length, (int, np.integer)):
+        return start + int(length)
+    return int(index.searchsorted(index[start] + pd.Timedelta(length)))
+
+
+def walk_forward_windows(
+    index: pd.DatetimeIndex,
+    in_sample: Length,
+    out_of_sample: Length,
+    step: Optional[Length] = None
+) -> List[Window]:
+    """
+    Split a bar index into rolling in-sample / out-of-sample windows.
+
+    Windows advance by `step` (the out-of-sample length by default), so the out-of-sample windows
+    tile the data after the first in-sample window. The last one may be shorter.
+
+    :param index: Bar timestamps
+    :param in_sample: In-sample length, in bars or as a time span
+    :param out_of_sample: Out-of-sample length, in bars or as a time span
+    :param step: Distance between window starts, in bars or as a time span
+    :return: List of (is_start, is_end, oos_start, oos_end) positions, ends exclusive
+    """
+    step = out_of_sample if step is None else step
+    windows = []
+    start = 0
+    while start < len(index):
+        is_end = _position(index, start, in_sample)
+        if is_end >= len(index):
+            break
+        oos_end = min(_position(index, is_end, out_of_sample), len(index))
+        if windows and is_end < windows[-1][3]:
+            raise ValueError("Walk-forward step must not be shorter than the out-of-sample window")
+        windows.append((start, is_end, is_end, oos_end))
+        next_start = _position(index, start, step)
+        if next_start <= start or oos_end >= len(index):
+            break
+        start = next_start
+    return windows
+
+
+def _python_scalar(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+@lru_cache(maxsize=512)
+def _cached_signals(strategy: type, params_key: Tuple[Tuple[str, Any], ...]) -> Tuple[np.ndarray, np.ndarray]:
+    df = next(iter(optimizer._worker_frames.values()))
+    return generate_signals(strategy, df, dict(params_key))
+
+
+def _simulate_window(
+    strategy: type,
+    params: Dict[str, Any],
+    start: int,
+    end: int,
+    initial_cash: float,
+    commission: float
+) -> Dict[str, Any]:
+    df = next(iter(optimizer._worker_frames.values()))
+    resolved = strategy_params(strategy, params)
+    entries, exits = _cached_signals(strategy, tuple(sorted(resolved.items())))
+    window = df.iloc[start:end]
+    simulation = simulate(
+        window,
+        entries[start:end],
+        exits[start:end],
+        initial_cash=initial_cash,
+        commission=commission,
+        order_percentage=resolved.get('order_percentage')
+    )
+    equity = pd.Series(simulation['equity'], index=window.index, name='equity')
+    results = performance_metrics(equity, simulation['trades'], initial_cash)
+    results.update(equity=equity, trades=simulation['trades'])
+    return results
+
+
+def _evaluate_in_sample(task: Tuple[type, Dict[str, Any], List[Window], float, float]) -> List[Dict[str, Any]]:
+    strategy, params, windows, initial_cash, commission = task
+    rows = []
+    for is_start, is_end, _, _ in windows:
+        results = _simulate_window(strategy, params, is_start, is_end, initial_cash, commission)
+        row = {metric: results[metric] for metric in RESULT_METRICS}
+        row.update(params)
+        rows.append(row)
+    return rows
+
+
+def _evaluate_out_of_sample(task: Tuple[type, Dict[str, Any], Window, float, float]) -> Dict[str, Any]:
+    strategy, params, (_, _, oos_start, oos_end), initial_cash, commission = task
+    return _simulate_window(strategy, params, oos_start, oos_end, initial_cash, commission)
+
+
+def walk_forward(
+    strategy: type,
+    frames: Dict[str, pd.DataFrame],
+    combinations: List[Dict[str, Any]],
+    in_sample: Length,
+    out_of_sample: Length,
+    step: Optional[Length] = None,
+    initial_cash: float = 100000,
+    commission: float = 0.001,
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run a walk-forward optimization.
+
+    In-sample work is split by parameter combination, so each worker computes a combination's
+    signals once and scores it on every in-sample window. The out-of-sample windows are then
+    evaluated in parallel with the best in-sample parameters of the window before them, each
+    starting flat with `initial_cash`. Each window's equity and trades (size and PnL) are then
+    rebased on the equity the previous window ended with, so they chain into one equity curve and
+    the stitched metrics reconcile with it.
+
+    :param strategy: strategies_tester strategy class with a vectorized implementation
+    :param frames: Name -> OHLCV DataFrame (the first one is traded)
+    :param combinations: Parameter dictionaries to search in each in-sample window
+    :param in_sample: In-sample length, in bars or as a time span
+    :param out_of_sample: Out-of-sample length, in bars or as a time span
+    :param step: Distance between window starts (out_of_sample by default)
+    :param initial_cash: Starting cash
+    :param commission: Commission as a fraction of traded value
+    :param workers: Number of worker processes (all cores if None)
+    :return: {'windows': per-window DataFrame, 'equity': stitched out-of-sample equity,
+              'trades': rebased out-of-sample trades, 'metrics': metrics of the stitched curve}
+    """
+    if strategy not in SIGNAL_FUNCTIONS:
+        raise ValueError(f"Walk-forward needs a vectorized implementation of {strategy.__name__}")
+    index = pd.DatetimeIndex(next(iter(frames.values())).index)
+    windows = walk_forward_windows(index, in_sample, out_of_sample, step)
+    if not windows:
+        raise ValueError("Not enough data for one in-sample and out-of-sample window")
+
+    workers = workers or os.cpu_count() or 1
+    with SharedFrames(frames) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=optimizer._init_worker, initargs=(shared.handles,)) as pool:
+            in_sample_tasks = [(strategy, params, windows, initial_cash, commission) for params in combinations]
+            chunksize = max(1, len(in_sample_tasks) // (workers * 4))
+            scores = list(pool.map(_evaluate_in_sample, in_sample_tasks, chunksize=chunksize))
+
+            names = list(combinations[0])
+            best = []
+            for w in range(len(windows)):
+                ranked = rank_results(pd.DataFrame([rows[w] for rows in scores]))
+                best.append({name: _python_scalar(ranked[name].iloc[0]) for name in names})
+            out_of_sample_tasks = [
+                (strategy, params, window, initial_cash, commission) for params, window in zip(best, windows)
+            ]
+            oos_results = list(pool.map(_evaluate_out_of_sample, out_of_sample_tasks))
+
+    rows, equities, trades = [], [], []
+    start_equity = initial_cash
+    for (is_start, is_end, oos_start, oos_end), params, results in zip(windows, best, oos_results):
+        row = {
+            'in_sample_start': index[is_start],
+            'in_sample_end': index[is_end - 1],
+            'out_of_sample_start': index[oos_start],
+            'out_of_sample_end': index[oos_end - 1],
+        }
+        row.update(params)
+        row.update({f"oos_{metric}": results[metric] for metric in RESULT_METRICS})
+        rows.append(row)
+        # Each window was simulated from initial_cash; rebase it on the equity the previous one ended with
+        scale = start_equity / initial_cash
+        equity = results['equity'] * scale
+        window_trades = results['trades'].astype({'size': float})
+        window_trades[['size', 'pnl', 'pnlcomm']] *= scale
+        equities.append(equity)
+        trades.append(window_trades)
+        start_equity = equity.iloc[-1]
+
+    stitched = pd.concat(equities).rename('equity')
+    trades = pd.concat(trades, ignore_index=True)
+    return {
+        'windows': pd.DataFrame(rows),
+        'equity': stitched,
+        'trades': trades,
+        'metrics': performance_metrics(stitched, trades, initial_cash),
+    }
@@ -0,0 +1,137 @@
+# utils/helpers.py
+
+import re
+from datetime import timedelta
+import numpy as np
+
+# Shorthand unit -> (IBKR singular, IBKR plural)
+_IB_BAR_UNITS = {
+    's': ('secs', 'secs'),
+    'm': ('min', 'mins'),
+    'h': ('hour', 'hours'),
+    'd': ('day', 'day'),
+    'w': ('week', 'week'),
+}
+
+_UNIT_SECONDS = {
+    's': 1,
+    'sec': 1, 'secs': 1,
+    'm': 60,
+    'min': 60, 'mins': 60,
+    'h': 3600,
+    'hour': 3600, 'hours': 3600,
+    'd': 86400,
+    'day': 86400, 'days': 86400,
+    'w': 604800,
+    'week': 604800, 'weeks': 604800,
+}
+
+_BAR_SIZE_RE = re.compile(r'^\s*(\d+)\s*([A-Za-z]+)\s*$')
+
+
+def _parse_bar_size(bar_size: str):
+    match = _BAR_SIZE_RE.match(bar_size or '')
+    if not match:
+        raise ValueError(f"Unsupported bar size: {bar_size}")
+    return int(match.group(1)), match.group(2).lower()
+
+
+def to_ib_bar_size(bar_size: str) -> str:
+    """
+    Translate a shorthand bar size (e.g. '1m', '5m', '1h') into an IBKR barSizeSetting.
+
+    Strings that are already in IBKR format (e.g. '1 min', '5 mins') are returned unchanged.
+
+    :param bar_size: Bar size from the configuration
+    :return: IBKR barSizeSetting string
+    """
+    count, unit = _parse_bar_size(bar_size)
+    if unit not in _IB_BAR_UNITS:
+        return bar_size
+    singular, plural = _IB_BAR_UNITS[unit]
+    return f"{count} {singular if count == 1 else plural}"
+
+
+def bar_size_to_timedelta(bar_size: str) -> timedelta:
+    """
+    Convert a bar size in shorthand or IBKR format into a timedelta.
+
+    :param bar_size: Bar size (e.g. '1m', '5 mins', '1 hour')
+    :return: Length of one bar
+    """
+    count, unit = _parse_bar_size(bar_size)
+    if unit not in _UNIT_SECONDS:
+        raise ValueError(f"Unsupported bar size: {bar_size}")
+    return timedelta(seconds=count * _UNIT_SECONDS[unit])
+
+
+_DURATION_SECONDS = {
+    'S': 1,
+    'D': 86400,
+    'W': 604800,
+    'M': 2592000,    # IBKR months are treated as 30 days
+    'Y': 31536000,
+}
+
+
+def ib_duration_to_timedelta(duration: str) -> timedelta:
+    """
+    Convert an IBKR duration string (e.g. '1 D', '3600 S', '2 W') into a timedelta.
+
+    :param duration: IBKR durationStr
+    :return: Equivalent calendar length
+    """
+    parts = (duration or '').split()
+    if len(parts) != 2 or not parts[0].isdigit() or parts[1].upper() not in _DURATION_SECONDS:
+        raise ValueError(f"Unsupported duration: {duration}")
+    return timedelta(seconds=int(parts[0]) * _DURATION_SECONDS[parts[1].upper()])
+
+
+def timedelta_to_ib_duration(delta: timedelta) -> str:
+    """
+    Convert a timedelta into the smallest IBKR duration string that covers it.
+
+    :param delta: Length of history to request
+    :return: IBKR durationStr (seconds up to one day, whole days beyond)
+    """
+    seconds = max(int(delta.total_seconds()), 60)
+    if seconds <= 86400:
+        return f"{seconds} S"
+    return f"{-(-seconds // 86400)} D"
+
+
+# Ordinal of 1970-01-01, the epoch of int64 nanosecond timestamps
+_EPOCH_ORDINAL = 719163
+_NS_PER_DAY = 86400 * 10**9
+
+
+def ns_to_num(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Convert int64 UTC nanosecond timestamps into backtrader date numbers.
+
+    Follows bt.date2num (ordinal + hour/24 + minute/1440 + ...), but sums in plain floating point
+    rather than math.fsum, so values can differ from a PandasData feed's in the last bit. Feeds of
+    one run should therefore all be built the same way for their timestamps to line up exactly.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    days, ns = np.divmod(timestamps, _NS_PER_DAY)
+    seconds, nanoseconds = np.divmod(ns, 10**9)
+    hours, seconds = np.divmod(seconds, 3600)
+    minutes, seconds = np.divmod(seconds, 60)
+    return (
+        (days + _EPOCH_ORDINAL).astype(float)
+        + hours / 24.0
+        + minutes / 1440.0
+        + seconds / 86400.0
+        + (nanoseconds // 1000) / 86400000000.0
+    )
+
+
+def num_to_datetime64(nums: np.ndarray) -> np.ndarray:
+    """
+    Convert backtrader date numbers back into naive UTC datetime64 values.
+
+    Date numbers only carry about 10 microseconds of precision, so results are rounded to the millisecond.
+    """
+    milliseconds = np.round((np.asarray(nums, dtype=float) - _EPOCH_ORDINAL) * 86400000.0).astype(np.int64)
+    return milliseconds.astype('datetime64[ms]').astype('datetime64[ns]')
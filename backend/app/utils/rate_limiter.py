@@ -0,0 +1,183 @@
+# utils/rate_limiter.py
+
+import asyncio
+import heapq
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a token bucket.
+
+        :param rate: Tokens added per second
+        :param capacity: Maximum number of tokens the bucket can hold (burst size)
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("Token bucket rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Take tokens without waiting.
+
+        :param tokens: Number of tokens to take
+        :return: True if the tokens were available
+        """
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1) -> float:
+        """
+        Wait until tokens are available and take them. Waiters are served in arrival order.
+
+        :param tokens: Number of tokens to take
+        :return: Seconds spent waiting
+        """
+        start = time.monotonic()
+        async with self._lock:
+            self._refill()
+            if self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+        return time.monotonic() - start
+
+
+# Priority lanes of a MessageThrottle, most urgent first
+LANES = ('cancel', 'exit', 'entry', 'data')
+
+
+class _LaneStats:
+    __slots__ = ('messages', 'delayed', 'total_wait', 'max_wait')
+
+    def __init__(self):
+        self.messages = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class MessageThrottle:
+    def __init__(self, max_per_second: float = 50, burst: float = 10):
+        """
+        Initialize a message throttle for one API session, with priority lanes.
+
+        IBKR disconnects clients sending more than 50 messages per second. A bucket of capacity B
+        refilled at r tokens/s admits at most B + r messages in any one-second window, so r is
+        derived from the limit to keep that sum at the limit.
+
+        While messages are waiting, tokens go to the most urgent lane first (see LANES: cancels,
+        then exits, then new entries, then data requests), and in arrival order within a lane.
+
+        :param max_per_second: Messages allowed in any one-second window (at least 2)
+        :param burst: Messages that may be sent back to back before the steady rate applies
+                      (at least 1 and below max_per_second)
+        """
+        if max_per_second < 2:
+            raise ValueError(f"Message rate must be at least 2 per second, got {max_per_second}")
+        if not 1 <= burst < max_per_second:
+            raise ValueError(f"Message burst must be at least 1 and below the message rate ({max_per_second}), got {burst}")
+        self.bucket = TokenBucket(rate=max_per_second - burst, capacity=burst)
+        self.waiters = []  # Heap of (lane rank, arrival, tokens, future)
+        self.arrivals = 0
+        self.pump = None
+        self.queued_tokens = 0  # Messages of every waiting request, including batches not queued yet
+        self.lane_stats = {lane: _LaneStats() for lane in LANES}
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'MessageThrottle':
+        """
+        Build a throttle from a broker configuration (message_rate, message_burst).
+        """
+        return cls(config.get('message_rate', 50), config.get('message_burst', 10))
+
+    async def acquire(self, lane: str = 'entry', tokens: float = 1) -> float:
+        """
+        Wait until `tokens` messages may be sent in the given lane and take them.
+
+        More tokens than the burst are taken in batches of at most the burst, each waiting its turn
+        in the lane, since the bucket never holds more.
+
+        :param lane: One of LANES
+        :param tokens: Number of API messages about to be sent
+        :return: Seconds of queueing delay added by the throttle
+        """
+        rank = LANES.index(lane)
+        start = time.monotonic()
+        remaining = tokens
+        queued = False
+        try:
+            while remaining > 0:
+                batch = min(remaining, self.bucket.capacity)
+                if self.waiters or not self.bucket.try_acquire(batch):
+                    if not queued:
+                        queued = True
+                        self.queued_tokens += remaining
+                    future = asyncio.get_running_loop().create_future()
+                    heapq.heappush(self.waiters, (rank, self.arrivals, batch, future))
+                    self.arrivals += 1
+                    if self.pump is None or self.pump.done():
+                        self.pump = asyncio.create_task(self._pump())
+                    await future
+                remaining -= batch
+                if queued:
+                    self.queued_tokens -= batch
+        finally:
+            if queued:
+                self.queued_tokens -= remaining  # Left over if the wait was cancelled
+        wait = time.monotonic() - start if queued else 0.0
+        stats = self.lane_stats[lane]
+        stats.messages += tokens
+        if wait > 0:
+            stats.delayed += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+        return wait
+
+    async def _pump(self):
+        """
+        Grant tokens to queued waiters, most urgent first, as the bucket refills.
+        """
+        while self.waiters:
+            rank, arrival, tokens, future = self.waiters[0]
+            if future.cancelled():
+                heapq.heappop(self.waiters)
+                continue
+            if self.bucket.try_acquire(tokens):
+                heapq.heappop(self.waiters)
+                future.set_result(None)
+                continue
+            await asyncio.sleep((tokens - self.bucket.tokens) / self.bucket.rate)
+
+    def backlog(self) -> float:
+        """
+        Number of messages currently waiting for a token (a bracket's legs count one each).
+        """
+        return self.queued_tokens
+
+    def stats(self) -> dict:
+        """
+        Per-lane counters: messages sent, how many waited, and the total / maximum delay in seconds.
+        """
+        return {
+            lane: {
+                'messages': stats.messages,
+                'delayed': stats.delayed,
+                'total_wait': stats.total_wait,
+                'max_wait': stats.max_wait,
+            }
+            for lane, stats in self.lane_stats.items()
+        }
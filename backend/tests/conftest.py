@@ -0,0 +1,35 @@
+# tests/conftest.py
+
+import logging
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Modules are imported top-level from the application directory (as when running main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from utils import logger  # noqa: E402
+
+# Loggers created under pytest must not write logs/trading_system.log into the source tree
+logger.get_logger.__defaults__ = (os.devnull, logging.INFO)
+
+
+def synthetic_bars(n=800, seed=7):
+    """
+    Daily random-walk bars over two calendar years, noisy enough to trigger every strategy.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.015, n)))
+    open_ = np.concatenate(([100.0], close[:-1])) * np.exp(rng.normal(0.0, 0.003, n))
+    high = np.maximum(open_, close) * (1.0 + rng.uniform(0.0, 0.01, n))
+    low = np.minimum(open_, close) * (1.0 - rng.uniform(0.0, 0.01, n))
+    index = pd.date_range('2023-01-02', periods=n, freq='D', name='date')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': 1000.0}, index=index)
+
+
+@pytest.fixture(scope='session')
+def daily_bars():
+    return synthetic_bars()
@@ -0,0 +1,70 @@
+# tests/test_arrow_feed.py
+
+import backtrader as bt
+import numpy as np
+import pytest
+
+from backtest import run_backtest
+from data_feeds import BarStore
+from data_feeds.arrow_feed import ArrowBarFeed
+from strategies_tester import MovingAverageCrossover
+
+
+class Recorder(bt.Strategy):
+    """
+    Record each bar's time and the closes every feed shows on it, behind a moving average.
+    """
+
+    def __init__(self):
+        self.sma = bt.indicators.SMA(self.datas[0].close, period=5)
+        self.rows = []
+
+    def next(self):
+        self.rows.append((
+            self.datas[0].datetime.datetime(0).replace(microsecond=0),
+            *(data.close[0] for data in self.datas),
+            self.sma[0],
+        ))
+
+
+def store_frames(tmp_path, daily_bars):
+    store = BarStore(str(tmp_path))
+    # The second feed misses bars, so cerebro has to hold back (rewind) the feed that runs ahead
+    frames = {'EURUSD': daily_bars, 'GBPUSD': daily_bars.drop(daily_bars.index[50:800:7]) * 1.2}
+    paths = {}
+    for name, df in frames.items():
+        key = ('test', name, 'CASH', '1d')
+        store.append(key, df.tz_localize('UTC'))
+        paths[name] = store.export_arrow(key, batch_size=64)  # Several record batches per file
+    return frames, paths
+
+
+def run(feeds, exactbars):
+    cerebro = bt.Cerebro(exactbars=exactbars, stdstats=False)
+    cerebro.addstrategy(Recorder)
+    for feed in feeds:
+        cerebro.adddata(feed)
+    return cerebro.run()[0].rows
+
+
+@pytest.mark.parametrize('exactbars', [False, 1])
+def test_arrow_feed_matches_pandas_feed(tmp_path, daily_bars, exactbars):
+    frames, paths = store_frames(tmp_path, daily_bars)
+    expected = run([bt.feeds.PandasData(dataname=df, name=name) for name, df in frames.items()], False)
+    actual = run([ArrowBarFeed(path=path, name=name) for name, path in paths.items()], exactbars)
+    assert [row[0] for row in actual] == [row[0] for row in expected]
+    np.testing.assert_allclose(np.array([row[1:] for row in actual]), np.array([row[1:] for row in expected]))
+
+
+def test_streamed_backtest_matches_in_memory_backtest(tmp_path, daily_bars):
+    frames, paths = store_frames(tmp_path, daily_bars)
+    expected = run_backtest(
+        MovingAverageCrossover, [bt.feeds.PandasData(dataname=df, name=name) for name, df in frames.items()],
+        verbose=False, plot=False
+    )
+    actual = run_backtest(
+        MovingAverageCrossover, [ArrowBarFeed(path=path, name=name) for name, path in paths.items()],
+        verbose=False, plot=False, exactbars=1
+    )
+    for metric in ('final_value', 'total_trades', 'pnl'):
+        assert actual[metric] == pytest.approx(expected[metric])
@@ -0,0 +1,52 @@
+# tests/test_bar_store.py
+
+import asyncio
+
+import pandas as pd
+
+from data_feeds import BarStore, IBKRDataFeed
+
+KEY = ('IBKR', 'EURUSD', 'CASH', '1m')
+
+
+def bars(start, periods):
+    index = pd.date_range(start, periods=periods, freq='1min', tz='UTC', name='date')
+    return pd.DataFrame({'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'volume': 0.0}, index=index)
+
+
+class RecordingScheduler:
+    def __init__(self):
+        self.requests = []
+
+    async def fetch(self, feed, symbol, sec_type, duration, bar_size, end=None):
+        self.requests.append((duration, end))
+        return pd.DataFrame()
+
+
+def test_stale_cache_requests_only_the_configured_span(tmp_path):
+    store = BarStore(str(tmp_path))
+    now = pd.Timestamp.now(tz='UTC').floor('1min')
+    store.append(KEY, bars(now - pd.Timedelta('5D'), 60))  # Last run was five days ago
+    start = now - pd.Timedelta('1D')
+    assert store.missing_ranges(KEY, start, now) == [(start, now)]
+
+    scheduler = RecordingScheduler()
+    feed = IBKRDataFeed({}, scheduler=scheduler, pool=object())
+    asyncio.run(feed.fetch_cached_history(store, 'EURUSD', 'CASH', '1 D', '1m'))
+    assert len(scheduler.requests) == 1
+    duration, end = scheduler.requests[0]
+    assert duration in ('86400 S', '1 D')
+    assert end is None  # Up to now
+
+
+def test_head_range_ends_at_the_cached_bars(tmp_path):
+    store = BarStore(str(tmp_path))
+    now = pd.Timestamp.now(tz='UTC').floor('1min')
+    first = now - pd.Timedelta('1h')
+    store.append(KEY, bars(first, 60))
+    scheduler = RecordingScheduler()
+    feed = IBKRDataFeed({}, scheduler=scheduler, pool=object())
+    asyncio.run(feed.fetch_cached_history(store, 'EURUSD', 'CASH', '2 D', '1m'))
+    # The span before the cached bars is requested up to just past the first one, not up to now
+    _, end = scheduler.requests[0]
+    assert end == first + pd.Timedelta('1min')
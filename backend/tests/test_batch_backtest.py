@@ -0,0 +1,65 @@
+# tests/test_batch_backtest.py
+
+import pandas as pd
+import pytest
+
+import batch_backtest
+from batch_backtest import expand_jobs, job_span, run_batch
+from data_feeds import BarStore
+from strategies_tester import MovingAverageCrossover
+from strategies_tester.vectorized import run_vectorized_backtest
+
+
+def test_jobs_cover_every_combination():
+    jobs = expand_jobs({
+        'strategies': ['MovingAverageCrossover', {'name': 'BreakoutStrategy', 'params': {'lookback': 20}}],
+        'symbols': ['EURUSD', ['GBPUSD', 'USDX']],
+        'date_ranges': [{'start': '2024-01-01', 'end': '2024-01-31'}],
+        'defaults': {'interval': '1h'},
+    })
+    assert [job['id'] for job in jobs] == [0, 1, 2, 3]
+    assert [(job['strategy'], job['symbols']) for job in jobs] == [
+        ('MovingAverageCrossover', ['EURUSD']),
+        ('MovingAverageCrossover', ['GBPUSD', 'USDX']),
+        ('BreakoutStrategy', ['EURUSD']),
+        ('BreakoutStrategy', ['GBPUSD', 'USDX']),
+    ]
+    assert jobs[2]['params'] == {'lookback': 20}
+    assert all(job['interval'] == '1h' and job['engine'] == 'backtrader' for job in jobs)
+
+
+def test_date_only_end_includes_the_whole_day():
+    assert job_span({'start': '2024-01-01', 'end': '2024-01-31'}) == (
+        pd.Timestamp('2024-01-01'), pd.Timestamp('2024-02-01')
+    )
+    assert job_span({'start': '2024-01-01', 'end': '2024-01-31 12:00'})[1] == pd.Timestamp('2024-01-31 12:00')
+
+
+def test_empty_spec_writes_empty_results(tmp_path):
+    output = tmp_path / 'results.json'
+    results = run_batch({'strategies': ['MovingAverageCrossover'], 'symbols': []}, output=str(output))
+    assert results.empty
+    assert output.read_text() == '[]'
+
+
+def test_batch_matches_a_direct_run(tmp_path, daily_bars):
+    bars = daily_bars.shift(12, freq='h')  # Bars time-stamped during the day, not at midnight
+    store = BarStore(str(tmp_path / 'bars'))
+    store.append(('yfinance', 'EURUSD=X', 'CASH', '1d'), bars.tz_localize('UTC'))
+    last_day = bars.index[-1].strftime('%Y-%m-%d')
+    spec = {
+        'strategies': ['MovingAverageCrossover', 'NoSuchStrategy'],
+        'symbols': ['EURUSD'],
+        'date_ranges': [{'start': '2023-01-02', 'end': last_day}],
+        'defaults': {'interval': '1d', 'engine': 'vectorized'},
+        'bar_store': str(tmp_path / 'bars'),
+    }
+    results = run_batch(spec, workers=1, output=str(tmp_path / 'results.parquet'))
+    ok, failed = results.iloc[0], results.iloc[1]
+    assert ok['status'] == 'ok'
+    # The last day's bar is part of the run
+    expected = run_vectorized_backtest(MovingAverageCrossover, bars)
+    for metric in batch_backtest.RESULT_METRICS:
+        assert ok[metric] == pytest.approx(expected[metric], nan_ok=True)
+    assert failed['status'] == 'error' and 'NoSuchStrategy' in failed['error']
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / 'results.parquet'), results.sort_values('id'))
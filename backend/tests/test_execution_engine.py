@@ -0,0 +1,125 @@
+# tests/test_execution_engine.py
+
+import asyncio
+
+from execution_engine import ExecutionEngine
+from models import Order
+
+
+class FakeBroker:
+    """
+    Broker recording the orders it is sent. Each send waits for `release` when one is given.
+    """
+
+    def __init__(self, legs=('trade',), release=None):
+        self.ib = None
+        self.legs = list(legs)
+        self.release = release
+        self.sent = []
+        self.on_status = {}
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def send_order(self, order, on_status=None):
+        self.sent.append(order)
+        self.on_status[order.symbol] = on_status
+        if self.release is not None:
+            await self.release.wait()
+        return list(self.legs)
+
+
+def engine_with(broker, queue_size=100):
+    engine = ExecutionEngine({'IBKR': {'type': 'IBKR', 'order_queue_size': queue_size}})
+    engine.brokers['IBKR'] = broker
+    return engine
+
+
+def finished(handle):
+    seen = []
+    handle.add_done_callback(lambda handle: seen.append(handle.status))
+    return seen
+
+
+def test_order_moves_from_queued_to_filled():
+    async def run():
+        broker = FakeBroker()
+        engine = engine_with(broker)
+        await engine.start()
+        handle = await engine.send_order(Order('EURUSD', 'BUY', 1000))
+        assert handle.status == 'queued'
+        seen = finished(handle)
+        await engine.queues['IBKR'].join()
+        assert handle.status == 'sent' and handle.trade == 'trade'
+        broker.on_status['EURUSD']('Submitted')
+        assert await handle.wait_acknowledged(timeout=1) and handle.status == 'acknowledged'
+        assert seen == []
+        broker.on_status['EURUSD']('Filled')
+        broker.on_status['EURUSD']('Cancelled')  # Ignored once final
+        assert await handle.wait_done(timeout=1)
+        await engine.stop()
+        return handle, seen
+
+    handle, seen = asyncio.run(run())
+    assert handle.status == 'filled' and handle.broker_status == 'Cancelled'
+    assert seen == ['filled']
+
+
+def test_unknown_broker_and_refused_orders_are_rejected():
+    async def run():
+        engine = engine_with(FakeBroker(legs=[]))
+        await engine.start()
+        unknown = await engine.send_order(Order('EURUSD', 'BUY', 1000, broker='Nowhere'))
+        unknown_seen = finished(unknown)  # Already final: called right away
+        refused = await engine.send_order(Order('EURUSD', 'BUY', 1000))
+        refused_seen = finished(refused)
+        await engine.queues['IBKR'].join()
+        await engine.stop()
+        return unknown, unknown_seen, refused, refused_seen
+
+    unknown, unknown_seen, refused, refused_seen = asyncio.run(run())
+    assert unknown.status == 'rejected' and 'Nowhere' in unknown.error
+    assert unknown_seen == ['rejected']
+    assert refused.status == 'rejected' and refused_seen == ['rejected']
+
+
+def test_cancelling_a_queued_order_skips_its_submission():
+    async def run():
+        release = asyncio.Event()
+        broker = FakeBroker(release=release)
+        engine = engine_with(broker)
+        await engine.start()
+        first = await engine.send_order(Order('EURUSD', 'BUY', 1000))
+        second = await engine.send_order(Order('GBPUSD', 'BUY', 1000))
+        await asyncio.sleep(0)  # The worker takes the first order and waits on the broker
+        seen = finished(second)
+        await engine.cancel(second)
+        release.set()
+        await engine.queues['IBKR'].join()
+        await engine.stop()
+        return broker, first, second, seen
+
+    broker, first, second, seen = asyncio.run(run())
+    assert [order.symbol for order in broker.sent] == ['EURUSD']
+    assert first.status == 'sent'
+    assert second.status == 'cancelled' and seen == ['cancelled']
+
+
+def test_stop_cancels_orders_not_drained():
+    async def run():
+        broker = FakeBroker(release=asyncio.Event())  # Never answers
+        engine = engine_with(broker)
+        await engine.start()
+        handles = [await engine.send_order(Order(symbol, 'BUY', 1000)) for symbol in ('EURUSD', 'GBPUSD', 'USDJPY')]
+        seen = [finished(handle) for handle in handles]
+        await engine.stop(drain_timeout=0.05)
+        return broker, handles, seen, engine
+
+    broker, handles, seen, engine = asyncio.run(run())
+    assert [order.symbol for order in broker.sent] == ['EURUSD']
+    assert [handle.status for handle in handles] == ['cancelled'] * 3
+    assert seen == [['cancelled']] * 3
+    assert engine.queue_depths() == {'IBKR': 0} and engine.workers == []
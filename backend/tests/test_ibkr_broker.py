@@ -0,0 +1,113 @@
+# tests/test_ibkr_broker.py
+
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import pytest
+from ib_insync import IB, LimitOrder, MarketOrder, OrderStatus, StopOrder, Trade
+
+from execution_engine.brokers import IBKRBroker
+from models import Order
+from utils.rate_limiter import MessageThrottle
+
+
+class StubClient:
+    def __init__(self):
+        self.ids = itertools.count(100)
+
+    def getReqId(self):
+        return next(self.ids)
+
+
+class StubIB:
+    """
+    Offline stand-in for an ib_insync session: orders are recorded instead of sent.
+    """
+
+    oneCancelsAll = staticmethod(IB.oneCancelsAll)
+
+    def __init__(self, min_tick=0.00005):
+        self.client = StubClient()
+        self.min_tick = min_tick
+        self.placed = []
+
+    async def reqContractDetailsAsync(self, contract):
+        return [SimpleNamespace(minTick=self.min_tick)]
+
+    def placeOrder(self, contract, order):
+        trade = Trade(contract, order, OrderStatus(orderId=order.orderId, status='PendingSubmit'))
+        self.placed.append(trade)
+        return trade
+
+
+@pytest.fixture
+def broker():
+    broker = IBKRBroker({}, pool=object())
+    broker.ib = StubIB()
+    broker.throttle = MessageThrottle()
+    return broker
+
+
+def send(broker, order, on_status=None):
+    return asyncio.run(broker.send_order(order, on_status=on_status))
+
+
+def test_bracket_transmits_the_last_child_only(broker):
+    trades = send(broker, Order('EURUSD', 'BUY', 1000, stop_loss=1.08012, take_profit=1.10037))
+    parent, target, stop = (trade.order for trade in trades)
+    assert isinstance(parent, MarketOrder) and isinstance(target, LimitOrder) and isinstance(stop, StopOrder)
+    assert target.parentId == stop.parentId == parent.orderId
+    assert [leg.transmit for leg in (parent, target, stop)] == [False, False, True]
+    assert target.action == stop.action == 'SELL'
+    assert target.lmtPrice == pytest.approx(1.10035) and stop.auxPrice == pytest.approx(1.0801)  # Tick 0.00005
+
+
+def test_entry_without_exits_or_brackets_is_sent_alone(broker):
+    trades = send(broker, Order('EURUSD', 'SELL', 1000, stop_loss=1.2, intent='exit'))
+    assert len(trades) == 1 and trades[0].order.transmit
+    broker.bracket_orders = False
+    assert len(send(broker, Order('EURUSD', 'BUY', 1000, stop_loss=1.0))) == 1
+
+
+def test_oco_legs_are_transmitted_in_one_group(broker):
+    trades = send(broker, Order('EURUSD', 'SELL', 1000, order_type='OCO', stop_loss=1.08012, take_profit=1.10037))
+    target, stop = (trade.order for trade in trades)
+    assert target.transmit and stop.transmit
+    assert target.parentId == stop.parentId == 0
+    assert target.ocaGroup == stop.ocaGroup and target.ocaGroup.startswith('OCO-')
+    assert target.ocaType == stop.ocaType == 1
+    assert target.lmtPrice == pytest.approx(1.10035) and stop.auxPrice == pytest.approx(1.0801)
+    assert broker.throttle.stats()['exit']['messages'] == 2
+
+
+def test_oco_without_both_exits_is_refused(broker):
+    assert send(broker, Order('EURUSD', 'SELL', 1000, order_type='OCO', stop_loss=1.08)) == []
+    assert broker.ib.placed == []
+
+
+def set_status(trade, status):
+    trade.orderStatus.status = status
+    trade.statusEvent.emit(trade)
+
+
+@pytest.mark.parametrize('filled_leg', [0, 1])
+def test_oco_reports_filled_once_either_leg_fills(broker, filled_leg):
+    reported = []
+    trades = send(broker, Order('EURUSD', 'SELL', 1000, order_type='OCO', stop_loss=1.08, take_profit=1.1),
+                  on_status=lambda status, trade: reported.append(status))
+    for trade in trades:
+        set_status(trade, 'Submitted')
+    set_status(trades[filled_leg], 'Filled')
+    set_status(trades[1 - filled_leg], 'Cancelled')  # IBKR cancels the other leg
+    assert reported == ['Submitted', 'Submitted', 'Filled']
+
+
+def test_oco_reports_cancelled_after_both_legs_close(broker):
+    reported = []
+    trades = send(broker, Order('EURUSD', 'SELL', 1000, order_type='OCO', stop_loss=1.08, take_profit=1.1),
+                  on_status=lambda status, trade: reported.append(status))
+    set_status(trades[0], 'Cancelled')
+    assert reported == []
+    set_status(trades[1], 'Cancelled')
+    assert reported == ['Cancelled']
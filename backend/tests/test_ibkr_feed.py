@@ -0,0 +1,36 @@
+# tests/test_ibkr_feed.py
+
+import asyncio
+from datetime import timedelta
+
+import pandas as pd
+
+from data_feeds import BarStore, IBKRDataFeed
+
+
+class StubScheduler:
+    def __init__(self, df):
+        self.df = df
+
+    async def fetch(self, feed, symbol, sec_type, duration, bar_size, end=None):
+        return self.df
+
+
+def test_warm_up_history_is_not_forwarded_again(tmp_path):
+    now = pd.Timestamp.now(tz='UTC').floor('1min')
+    # IBKR's answer ends with the bar still in progress
+    dates = pd.date_range(end=now, periods=5, freq='1min')
+    polled = pd.DataFrame({'date': dates, 'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'volume': 0.0})
+
+    history_feed = IBKRDataFeed({}, scheduler=StubScheduler(polled), pool=object())
+    history = asyncio.run(history_feed.fetch_cached_history(BarStore(str(tmp_path)), 'EURUSD', 'CASH', '300 S', '1m'))
+    assert history.index[-1] == dates[-2]  # In-progress bar left out
+
+    live_feed = IBKRDataFeed({}, pool=object(), last_timestamps={'EURUSD': history.index[-1]})
+    # First poll cycle, before the in-progress bar completes: nothing new
+    assert live_feed._new_completed_bars(polled, live_feed.last_timestamps.get('EURUSD'), timedelta(minutes=1), now) == []
+    # Once it completes it is forwarded exactly once
+    forwarded = live_feed._new_completed_bars(
+        polled, live_feed.last_timestamps.get('EURUSD'), timedelta(minutes=1), now + pd.Timedelta('1min')
+    )
+    assert [pd.Timestamp(bar.date) for bar in forwarded] == [dates[-1]]
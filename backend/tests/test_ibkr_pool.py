@@ -0,0 +1,57 @@
+# tests/test_ibkr_pool.py
+
+import asyncio
+
+import pytest
+
+from connections import IBConnectionPool
+
+
+class StubSession:
+    """
+    Stand-in for an ib_insync IB session that connects only if `reachable`.
+    """
+
+    def __init__(self, reachable):
+        self.reachable = reachable
+        self.connected = False
+        self.attempts = 0
+
+    def isConnected(self):
+        return self.connected
+
+    async def connectAsync(self, host, port, clientId):
+        self.attempts += 1
+        if not self.reachable:
+            raise ConnectionRefusedError(f"clientId {clientId} refused")
+        self.connected = True
+
+
+def pool_of(*reachable):
+    pool = IBConnectionPool({'pool_size': len(reachable)})
+    pool.sessions = [StubSession(ok) for ok in reachable]
+    pool.leases = {id(ib): 0 for ib in pool.sessions}
+    return pool
+
+
+def test_lease_skips_sessions_that_cannot_connect():
+    pool = pool_of(False, True)
+    leased = [asyncio.run(pool.lease()) for _ in range(3)]
+    assert all(ib is pool.sessions[1] for ib in leased)
+    assert pool.leases == {id(pool.sessions[0]): 0, id(pool.sessions[1]): 3}
+    assert pool.sessions[0].attempts == 3  # Retried on every lease in case it came back
+
+
+def test_lease_raises_when_no_session_connects():
+    pool = pool_of(False, False)
+    with pytest.raises(ConnectionError):
+        asyncio.run(pool.lease())
+    assert set(pool.leases.values()) == {0}
+
+
+def test_leases_spread_over_connected_sessions():
+    pool = pool_of(True, True)
+    first, second = asyncio.run(pool.lease()), asyncio.run(pool.lease())
+    assert first is not second
+    pool.release(first)
+    assert asyncio.run(pool.lease()) is first
@@ -0,0 +1,64 @@
+# tests/test_ict_live.py
+
+import itertools
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models import Bar
+from strategies_implementor import ict_strategy as ict
+
+SYMBOLS = ('EURUSD', 'GBPUSD', 'DX')
+
+
+def history():
+    """
+    Two and a half days of random-walk minute bars, ending just before the 03:00 NY trading window.
+    """
+    rng = np.random.default_rng(1)
+    index = pd.date_range('2024-03-04 00:00', '2024-03-06 07:59', freq='1min', tz='UTC')
+    frames = {}
+    for symbol, base, scale in (('EURUSD', 1.08, 0.0002), ('GBPUSD', 1.27, 0.0002), ('DX', 104.0, 0.02)):
+        close = base + np.cumsum(rng.normal(0.0, scale, len(index)))
+        frames[symbol] = pd.DataFrame(
+            {'open': close, 'high': close + scale, 'low': close - scale, 'close': close, 'volume': 0.0}, index=index
+        )
+    return frames
+
+
+def run(order, dx_close):
+    """
+    Feed one bar per symbol at 03:00 NY in the given order and collect the signals.
+    """
+    frames = history()
+    config = {'params': dict(ict.DEFAULT_PARAMS), 'symbols': [{'symbol': symbol} for symbol in SYMBOLS]}
+    states = ict.prepare_historical_data(frames, config)
+    timestamp = pd.Timestamp('2024-03-06 08:00', tz='UTC').to_pydatetime()
+    closes = {'EURUSD': 1.2, 'GBPUSD': 1.4, 'DX': dx_close}  # Both pairs break above their Asian highs
+    signals = []
+    for symbol in order:
+        price = closes[symbol]
+        bar = Bar(symbol, 'IND' if symbol == 'DX' else 'CASH', '1m', timestamp, price, price, price, price)
+        ict.update_state(states[symbol], bar)
+        signals += [(signal.symbol, signal.action) for signal in ict.evaluate_trade_conditions(bar, states[symbol], config)]
+    return sorted(signals)
+
+
+@pytest.mark.parametrize('order', list(itertools.permutations(SYMBOLS)), ids='-'.join)
+def test_divergence_does_not_depend_on_arrival_order(order):
+    # The index falls on the same bar the pairs rise: both pairs are confirmed, whoever arrives first
+    assert run(order, dx_close=90.0) == [('EURUSD', 'BUY'), ('GBPUSD', 'BUY')]
+    # The index rises with the pairs: no divergence
+    assert run(order, dx_close=120.0) == []
+
+
+def test_stalled_index_drops_oldest_setup(caplog):
+    usdx = ict.DollarIndexState(history=2)
+    usdx.update(0, 104.0)
+    setups = [SimpleNamespace(symbol='EURUSD', action='BUY', timestamp=minute * 60_000_000) for minute in (1, 2, 3)]
+    for setup in setups:
+        usdx.wait(setup)
+    assert list(usdx.pending) == setups[1:]
+    assert 'dropped the BUY setup on EURUSD' in caplog.text
@@ -0,0 +1,49 @@
+# tests/test_optimizer.py
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies_tester import MovingAverageCrossover
+from strategies_tester.optimizer import SharedFrames, evaluate, optimize, parameter_grid, rank_results
+
+
+def test_shared_frames_round_trip_and_unlink(daily_bars):
+    frames = {'EURUSD': daily_bars, 'GBPUSD': daily_bars.iloc[:100] * 2.0}
+    with SharedFrames(frames) as shared:
+        attached, blocks = SharedFrames.attach(shared.handles)
+        for name, df in frames.items():
+            assert attached[name].index.equals(df.index)
+            np.testing.assert_array_equal(attached[name].to_numpy(), df[['open', 'high', 'low', 'close', 'volume']].to_numpy())
+        names = [block.name for block in blocks]
+        del attached
+        for block in blocks:
+            block.close()
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_rank_results_orders_by_mean_rank():
+    results = pd.DataFrame({
+        'sharpe': [1.0, 2.0, np.nan, 2.0],
+        'max_drawdown': [5.0, 4.0, 1.0, 4.0],
+        'pnl': [100.0, 300.0, 50.0, 200.0],
+        'fast_length': [5, 10, 15, 20],
+    })
+    ranked = rank_results(results)
+    assert list(ranked['fast_length']) == [10, 20, 15, 5]  # Ties on score broken by PnL
+    assert list(ranked.index) == [1, 2, 3, 4]
+    assert ranked.index.name == 'rank'
+    assert rank_results(results.iloc[:0]).empty
+
+
+def test_parallel_sweep_matches_sequential_runs(daily_bars):
+    frames = {'EURUSD': daily_bars}
+    combinations = parameter_grid({'fast_length': [5, 10], 'slow_length': [30, 50]})
+    assert len(combinations) == 4
+    ranked = optimize(MovingAverageCrossover, frames, combinations, workers=2)
+    expected = rank_results(pd.DataFrame([evaluate(MovingAverageCrossover, frames, params) for params in combinations]))
+    pd.testing.assert_frame_equal(ranked, expected)
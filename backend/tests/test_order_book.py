@@ -0,0 +1,59 @@
+# tests/test_order_book.py
+
+from types import SimpleNamespace
+
+import pytest
+from ib_insync import Forex
+
+from execution_engine import OrderBook, Position
+
+
+def test_partial_close_keeps_average_cost():
+    position = Position('EURUSD')
+    position.fill(100, 1.10)
+    position.fill(100, 1.20)
+    assert position.avg_cost == pytest.approx(1.15)
+    assert position.fill(-50, 1.25) == pytest.approx(50 * 0.10)
+    assert position.quantity == 150
+    assert position.avg_cost == pytest.approx(1.15)
+
+
+def test_reversal_opens_remainder_at_fill_price():
+    position = Position('ES', multiplier=50)
+    position.fill(2, 4000)
+    assert position.fill(-5, 3990) == pytest.approx(2 * -10 * 50)
+    assert position.quantity == -3
+    assert position.avg_cost == 3990
+    assert position.realized_pnl == pytest.approx(-1000)
+
+
+def test_short_cover_realizes_and_flattens():
+    position = Position('EURUSD')
+    position.fill(-100, 1.20)
+    assert position.fill(60, 1.10) == pytest.approx(60 * 0.10)
+    assert position.fill(40, 1.25) == pytest.approx(40 * -0.05)
+    assert position.quantity == 0
+    assert position.avg_cost == 0.0
+    assert position.realized_pnl == pytest.approx(4.0)
+
+
+def execution(exec_id, side, shares, price):
+    return SimpleNamespace(
+        contract=Forex('EURUSD'),
+        execution=SimpleNamespace(execId=exec_id, side=side, shares=shares, price=price),
+        time=None
+    )
+
+
+def test_repeated_execution_is_applied_once():
+    book = OrderBook()
+    seen = []
+    book.listeners.append(lambda position: seen.append(position.quantity))
+    book.on_execution(None, execution('0001', 'BOT', 1000, 1.10))
+    book.on_execution(None, execution('0002', 'SLD', 400, 1.12))
+    book.on_execution(None, execution('0001', 'BOT', 1000, 1.10))  # Reported again after a reconnect
+    assert book.position('EURUSD') == 600
+    assert book.fill_count == 2
+    assert book.realized_pnl == pytest.approx(400 * 0.02)
+    assert book.unrealized_pnl == pytest.approx(600 * 0.02)
+    assert seen == [1000, 600]
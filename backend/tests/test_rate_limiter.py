@@ -0,0 +1,59 @@
+# tests/test_rate_limiter.py
+
+import asyncio
+import time
+
+import pytest
+
+from utils.rate_limiter import MessageThrottle
+
+
+@pytest.mark.parametrize('rate, burst', [(1, 1), (50, 0), (10, 10), (10, 20)])
+def test_invalid_configuration_is_rejected(rate, burst):
+    with pytest.raises(ValueError):
+        MessageThrottle(rate, burst)
+
+
+def test_request_larger_than_burst_is_split():
+    async def run():
+        throttle = MessageThrottle(max_per_second=4, burst=2)  # Refills at 2 tokens/s
+        start = time.monotonic()
+        wait = await asyncio.wait_for(throttle.acquire('entry', tokens=5), timeout=5)
+        return throttle, time.monotonic() - start, wait
+
+    throttle, elapsed, wait = asyncio.run(run())
+    # 2 tokens at once, then 2 and 1 more at 2 tokens/s
+    assert 1.2 < elapsed < 2.5
+    assert wait == pytest.approx(elapsed, abs=0.05)
+    assert throttle.stats()['entry']['messages'] == 5
+    assert throttle.backlog() == 0
+
+
+def test_urgent_lane_is_served_first():
+    async def run():
+        throttle = MessageThrottle(max_per_second=20, burst=1)
+        await throttle.acquire('data')  # Empty the bucket
+        order = []
+
+        async def send(lane):
+            await throttle.acquire(lane)
+            order.append(lane)
+
+        await asyncio.gather(send('data'), send('entry'), send('cancel'))
+        return order
+
+    assert asyncio.run(run()) == ['cancel', 'entry', 'data']
+
+
+def test_backlog_counts_messages_not_requests():
+    async def run():
+        throttle = MessageThrottle(max_per_second=4, burst=2)
+        await throttle.acquire('entry', tokens=2)  # Empty the bucket
+        bracket = asyncio.create_task(throttle.acquire('entry', tokens=3))
+        cancel = asyncio.create_task(throttle.acquire('cancel'))
+        await asyncio.sleep(0)
+        queued = throttle.backlog()
+        await asyncio.gather(bracket, cancel)
+        return queued, throttle.backlog()
+
+    assert asyncio.run(run()) == (4, 0)
@@ -0,0 +1,96 @@
+# tests/test_resampler.py
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_feeds.bar_buffer import BarRingBuffer
+from data_feeds.resampler import BarResampler, resample_frame
+from models import Bar
+from strategies_implementor import sma_crossover_strategy
+from strategies_implementor.routing import StrategyRouter
+
+FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def minute_bars(n=600, seed=3, start='2024-03-04 09:03'):
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 0.1, n))
+    open_ = close + rng.normal(0.0, 0.05, n)
+    index = pd.date_range(start, periods=n, freq='1min', tz='UTC', name='date')
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.uniform(0.0, 0.05, n),
+        'low': np.minimum(open_, close) - rng.uniform(0.0, 0.05, n),
+        'close': close,
+        'volume': rng.integers(1, 100, n).astype(float),
+    }, index=index)
+
+
+def to_bars(df, symbol='EURUSD'):
+    return [Bar(symbol, 'CASH', '1m', ts.to_pydatetime(), *row) for ts, row in zip(df.index, df[FIELDS].itertuples(index=False))]
+
+
+def frame(bars):
+    return pd.DataFrame(
+        [[bar.open, bar.high, bar.low, bar.close, bar.volume] for bar in bars],
+        index=pd.DatetimeIndex([pd.Timestamp(bar.timestamp) for bar in bars], name='date'), columns=FIELDS
+    )
+
+
+@pytest.mark.parametrize('timeframe', ['5m', '15m'])
+def test_streaming_matches_resample_frame(timeframe):
+    df = minute_bars()
+    resampler = BarResampler()
+    resampler.add('EURUSD', '1m', ['5m', '15m'])
+    emitted = [bar for base in to_bars(df) for bar in resampler.update(base) if bar.bar_size == timeframe]
+    pd.testing.assert_frame_equal(frame(emitted), resample_frame(df, '1m', timeframe), check_freq=False)
+
+
+def test_missing_closing_bar_and_seed():
+    # One period's closing bar is missing: the period is emitted when the next one starts
+    df = minute_bars().drop(pd.Timestamp('2024-03-04 13:14', tz='UTC'))
+    expected = resample_frame(df, '1m', '15m')
+    # Seed from the first 200 bars (mid-period) and stream the rest
+    resampler = BarResampler()
+    resampler.add('EURUSD', '1m', ['15m'])
+    resampler.seed('EURUSD', '1m', df.iloc[:200], sec_type='CASH')
+    live = df.iloc[200:]
+    emitted = [bar for base in to_bars(live) for bar in resampler.update(base)]
+    result = frame(emitted)
+    pd.testing.assert_frame_equal(result, expected[expected.index >= result.index[0]], check_freq=False, check_exact=False)
+    assert result.index[0] == resample_frame(df.iloc[:200], '1m', '15m').index[-1] + pd.Timedelta('15min')
+
+
+def test_higher_timeframe_routes_update_state():
+    router = StrategyRouter([{
+        'name': 'SMACrossoverStrategy',
+        'symbols': [{'symbol': 'EURUSD', 'sec_type': 'CASH'}],
+        'timeframes': ['1m', '5m'],
+        'historical': {'bar_size': '1m'},
+        'params': {'trend_timeframe': '5m', 'trend_ma': 3},
+    }])
+    assert router.resample_plan() == [('EURUSD', '1m', ['5m'])]
+    route, = router.timeframe_routes_for('EURUSD', '5m')
+    assert router.routes_for('EURUSD', '5m') == []
+    route.state = sma_crossover_strategy.prepare_historical_data({}, route.config)['EURUSD']
+
+    buffer = BarRingBuffer(10)
+    resampler = BarResampler()
+    resampler.add('EURUSD', '1m', ['5m'])
+
+    def on_bar(bar):
+        buffer.append(bar)
+        route.module.update_timeframe(route.state, bar.bar_size, buffer)
+
+    resampler.on('5m', on_bar)
+    closes = [1.0] * 10 + [2.0] * 5  # Three 5m bars: flat, flat, then above the 5m SMA
+    start = pd.Timestamp('2024-03-04 09:00', tz='UTC')
+    for i, close in enumerate(closes):
+        asyncio.run(resampler.process(Bar('EURUSD', 'CASH', '1m', (start + pd.Timedelta(minutes=i)).to_pydatetime(),
+                                          close, close, close, close)))
+        if i == 9:
+            assert np.isnan(route.state.trend)  # Only two 5m bars so far
+    assert route.state.trend == 1.0
@@ -0,0 +1,58 @@
+# tests/test_result_cache.py
+
+import os
+import sys
+
+from strategies_tester import MovingAverageCrossover, result_cache
+from strategies_tester.result_cache import ResultCache, shared_source_digest
+
+
+def test_key_depends_on_every_input(daily_bars):
+    cache = ResultCache()
+    key = cache.key(MovingAverageCrossover, {'fast_length': 5}, [daily_bars], 'vectorized', cash=100000)
+    assert key == cache.key(MovingAverageCrossover, {'fast_length': 5}, [daily_bars.copy()], 'vectorized', cash=100000)
+    assert key != cache.key(MovingAverageCrossover, {'fast_length': 6}, [daily_bars], 'vectorized', cash=100000)
+    assert key != cache.key(MovingAverageCrossover, {'fast_length': 5}, [daily_bars * 1.01], 'vectorized', cash=100000)
+    assert key != cache.key(MovingAverageCrossover, {'fast_length': 5}, [daily_bars], 'backtrader', cash=100000)
+    assert key != cache.key(MovingAverageCrossover, {'fast_length': 5}, [daily_bars], 'vectorized', cash=50000)
+
+
+def test_shared_source_edits_change_the_key(tmp_path, monkeypatch, daily_bars):
+    package = tmp_path / 'shared_indicators'
+    package.mkdir()
+    (package / '__init__.py').write_text('')
+    (package / 'sma.py').write_text('PERIOD = 20\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(result_cache, 'SHARED_SOURCES', ('shared_indicators',))
+    cache = ResultCache()
+    try:
+        shared_source_digest.cache_clear()
+        before = cache.key(MovingAverageCrossover, {}, [daily_bars], 'vectorized')
+        (package / 'sma.py').write_text('PERIOD = 21\n')
+        shared_source_digest.cache_clear()
+        assert cache.key(MovingAverageCrossover, {}, [daily_bars], 'vectorized') != before
+    finally:
+        shared_source_digest.cache_clear()
+        sys.modules.pop('shared_indicators', None)
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_entries=2)
+    cache.put('a', {'pnl': 1.0})
+    cache.put('b', {'pnl': 2.0})
+    # Make 'a' older than 'b', then read it so that 'b' becomes the least recently used
+    os.utime(tmp_path / 'a.pkl', (1, 1))
+    os.utime(tmp_path / 'b.pkl', (2, 2))
+    assert cache.get('a') == {'pnl': 1.0}
+    cache.put('c', {'pnl': 3.0})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'pnl': 1.0} and cache.get('c') == {'pnl': 3.0}
+
+
+def test_size_limit_and_unreadable_entries(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1)
+    cache.put('big', {'values': list(range(100))})
+    assert cache.get('big') is None  # Over max_bytes on its own
+    (tmp_path / 'broken.pkl').write_bytes(b'not a pickle')
+    assert ResultCache(str(tmp_path)).get('broken') is None
+    assert not (tmp_path / 'broken.pkl').exists()
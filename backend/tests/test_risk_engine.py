@@ -0,0 +1,102 @@
+# tests/test_risk_engine.py
+
+from datetime import datetime, time
+from types import SimpleNamespace
+
+import pytest
+from ib_insync import Forex
+
+from execution_engine import OrderBook, OrderHandle
+from models import Order
+from risk_management.risk_engine import RiskEngine
+
+
+def buy(quantity=400000, symbol='EURUSD'):
+    return Order(symbol, 'BUY', quantity)
+
+
+def fill(book, exec_id, side, shares, price):
+    book.on_execution(None, SimpleNamespace(
+        contract=Forex('EURUSD'),
+        execution=SimpleNamespace(execId=exec_id, side=side, shares=shares, price=price),
+        time=None
+    ))
+
+
+@pytest.fixture
+def engine():
+    return RiskEngine({'max_symbol_notional': 500000, 'max_gross_exposure': 1000000}, OrderBook())
+
+
+def test_burst_of_unfilled_orders_respects_symbol_limit(engine):
+    # Five orders approved back to back, before any of them fills
+    reasons = [engine.check(buy(), 1.1) for _ in range(5)]
+    assert reasons[0] is None
+    assert all(reason is not None and 'notional limit' in reason for reason in reasons[1:])
+    assert engine.trades == 1
+    assert engine.exposure('EURUSD') == pytest.approx(440000)
+
+
+def test_finished_orders_release_pending_exposure(engine):
+    cancelled = buy()
+    handle = OrderHandle(cancelled)
+    assert engine.check(cancelled, 1.1) is None
+    handle.add_done_callback(lambda handle: engine.release(handle.order))
+    assert engine.check(buy(), 1.1) is not None
+    handle.on_status('Cancelled')
+    assert engine.exposure('EURUSD') == 0.0
+    assert engine.gross_exposure == pytest.approx(0.0)
+
+    # A filled order moves from pending into the position
+    filled = buy()
+    handle = OrderHandle(filled)
+    assert engine.check(filled, 1.1) is None
+    handle.add_done_callback(lambda handle: engine.release(handle.order))
+    fill(engine.book, '0001', 'BOT', 400000, 1.1)
+    handle.on_status('Filled')
+    assert engine.pending_orders == {}
+    assert engine.exposure('EURUSD') == pytest.approx(440000)
+    assert engine.check(buy(), 1.1) is not None
+
+
+def test_exits_are_not_pending(engine):
+    assert engine.check(Order('EURUSD', 'SELL', 400000, intent='exit'), 1.1) is None
+    assert Order('EURUSD', 'SELL', 400000, order_type='OCO').intent == 'exit'
+    assert engine.pending_orders == {}
+
+
+def test_trade_count_resets_at_the_session_start():
+    engine = RiskEngine({'max_daily_trades': 2, 'session_start': '17:00'}, OrderBook())
+    now = engine.next_rollover - 3600  # 16:00 New York
+    assert engine.check(buy(1000), 1.1, now=now) is None
+    assert engine.check(buy(1000), 1.1, now=now + 60) is None
+    assert engine.check(buy(1000), 1.1, now=now + 120) == "daily trade limit reached"
+    assert engine.check(Order('EURUSD', 'SELL', 1000, intent='exit'), 1.1, now=now + 180) is None
+
+    rollover = engine.next_rollover
+    assert engine.check(buy(1000), 1.1, now=rollover) is None  # 17:00: a new session
+    assert engine.trades == 1
+    assert engine.next_rollover > rollover
+    assert datetime.fromtimestamp(engine.next_rollover, engine.tz).time() == time(17, 0)
+
+
+def test_daily_loss_halts_entries_until_the_next_session():
+    book = OrderBook()
+    engine = RiskEngine({'max_daily_loss': 100}, book)
+    now = engine.next_rollover - 3600
+    fill(book, '0001', 'BOT', 100000, 1.1)
+    book.update_price('EURUSD', 1.0985)  # -150 open PnL
+    assert engine.daily_pnl() == pytest.approx(-150)
+    assert engine.check(buy(1000), 1.1, now=now) == "daily loss limit reached"
+    assert engine.halted
+
+    book.update_price('EURUSD', 1.11)  # Recovered, but still halted for the session
+    assert engine.check(buy(1000), 1.1, now=now + 60) == "daily loss limit reached"
+    assert engine.check(Order('EURUSD', 'SELL', 100000, intent='exit'), 1.11, now=now + 60) is None
+
+    book.update_price('EURUSD', 1.0985)
+    # The next session measures its loss from its own start, so the earlier loss no longer counts
+    assert engine.check(buy(1000), 1.1, now=engine.next_rollover + 1) is None
+    assert not engine.halted and engine.daily_pnl() == pytest.approx(0.0)
+    book.update_price('EURUSD', 1.0975)  # Another 100 lost in this session
+    assert engine.check(buy(1000), 1.1, now=engine.next_rollover - 1) == "daily loss limit reached"
@@ -0,0 +1,56 @@
+# tests/test_sessions.py
+
+from datetime import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import SessionLevels, usdx_divergence
+
+
+def bars(seed=5):
+    """
+    15-minute bars over the March 2024 US DST change, with the weekend missing.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-03-04', '2024-03-15', freq='15min', tz='UTC')
+    index = index[index.tz_convert('America/New_York').dayofweek < 5]
+    close = 1.08 + np.cumsum(rng.normal(0.0, 0.0005, len(index)))
+    return index, close + rng.uniform(0.0, 0.0005, len(index)), close - rng.uniform(0.0, 0.0005, len(index))
+
+
+def stream(levels, index, high, low):
+    rows = [levels.update(ts.to_pydatetime(), h, l) for ts, h, l in zip(index, high, low)]
+    return {name: np.array([row[i] for row in rows]) for i, name in enumerate(SessionLevels.LINES)}
+
+
+@pytest.mark.parametrize('asian', [(time(20, 0), time(0, 0)), (time(19, 0), time(2, 0)), (time(1, 0), time(5, 0))])
+def test_seed_matches_streaming_updates(asian):
+    index, high, low = bars()
+    seeded = SessionLevels(*asian).seed(index, high, low)
+    streamed = stream(SessionLevels(*asian), index, high, low)
+    for name in SessionLevels.LINES:
+        np.testing.assert_array_equal(seeded[name], streamed[name], err_msg=name)
+
+
+def test_updates_continue_a_seeded_state():
+    index, high, low = bars()
+    full = SessionLevels().seed(index, high, low)
+    levels = SessionLevels()
+    split = 400  # Mid-session
+    levels.seed(index[:split], high[:split], low[:split])
+    resumed = stream(levels, index[split:], high[split:], low[split:])
+    for name in SessionLevels.LINES:
+        np.testing.assert_array_equal(resumed[name], full[name][split:], err_msg=name)
+
+
+def test_usdx_divergence_uses_the_index_bar_as_of_each_pair_bar():
+    timestamps = np.array([0, 60, 120, 180, 240])
+    close = np.array([1.0, 1.1, 1.0, 0.9, 1.0])
+    usdx_timestamps = np.array([0, 60, 180])  # No index bar at 120
+    usdx_close = np.array([100.0, 99.0, 101.0])
+    # At 120 the latest index bar is still the one at 60 (a fall), while the pair fell: no divergence
+    np.testing.assert_array_equal(
+        usdx_divergence(timestamps, close, usdx_timestamps, usdx_close), [0.0, 1.0, 0.0, -1.0, 0.0]
+    )
@@ -0,0 +1,58 @@
+# tests/test_vectorized_parity.py
+
+import backtrader as bt
+import numpy as np
+import pytest
+
+from strategies_tester.vectorized import PARITY_METRICS, SIGNAL_FUNCTIONS, parity_report, run_vectorized_backtest
+
+
+class TradeLog(bt.Analyzer):
+    """
+    Record every closed trade as (entry price, size, pnl, net pnl).
+    """
+
+    def start(self):
+        self.trades = []
+        self.sizes = {}
+
+    def notify_trade(self, trade):
+        if trade.justopened:
+            self.sizes[trade.ref] = trade.size
+        elif trade.isclosed:
+            self.trades.append((trade.price, self.sizes.pop(trade.ref), trade.pnl, trade.pnlcomm))
+
+    def get_analysis(self):
+        return self.trades
+
+
+def backtrader_trades(strategy, df):
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(strategy)
+    cerebro.adddata(bt.feeds.PandasData(dataname=df))
+    cerebro.broker.set_cash(100000)
+    cerebro.broker.setcommission(commission=0.001)
+    cerebro.addanalyzer(TradeLog, _name='trades')
+    return cerebro.run()[0].analyzers.trades.get_analysis()
+
+
+@pytest.fixture(scope='module')
+def bars(daily_bars):
+    return daily_bars
+
+
+@pytest.mark.parametrize('strategy', list(SIGNAL_FUNCTIONS), ids=lambda strategy: strategy.__name__)
+def test_metrics_match_backtrader(strategy, bars):
+    report = parity_report(strategy, bars)
+    mismatches = {metric: report[metric] for metric in PARITY_METRICS if not report[metric][2]}
+    assert not mismatches
+    assert report['total_trades'][0] > 0
+
+
+@pytest.mark.parametrize('strategy', list(SIGNAL_FUNCTIONS), ids=lambda strategy: strategy.__name__)
+def test_trades_match_backtrader(strategy, bars):
+    expected = backtrader_trades(strategy, bars)
+    closed = run_vectorized_backtest(strategy, bars)['trades'].dropna(subset=['pnlcomm'])
+    actual = list(closed[['entry_price', 'size', 'pnl', 'pnlcomm']].itertuples(index=False, name=None))
+    assert len(actual) == len(expected) > 0
+    np.testing.assert_allclose(np.array(actual, dtype=float), np.array(expected, dtype=float), rtol=1e-9)
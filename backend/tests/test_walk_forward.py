@@ -0,0 +1,53 @@
+# tests/test_walk_forward.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies_tester import MovingAverageCrossover
+from strategies_tester.optimizer import parameter_grid
+from strategies_tester.walk_forward import walk_forward, walk_forward_windows
+
+
+def test_out_of_sample_windows_tile_without_overlap():
+    index = pd.date_range('2024-01-01', periods=100, freq='D')
+    windows = walk_forward_windows(index, 30, 20)
+    assert windows == [(0, 30, 30, 50), (20, 50, 50, 70), (40, 70, 70, 90), (60, 90, 90, 100)]
+    for (_, _, _, previous_end), (_, _, start, _) in zip(windows, windows[1:]):
+        assert start == previous_end
+
+    # Time spans measure the same windows on a daily index
+    assert walk_forward_windows(index, '30D', '20D') == windows
+
+
+def test_step_shorter_than_out_of_sample_is_rejected():
+    index = pd.date_range('2024-01-01', periods=100, freq='D')
+    with pytest.raises(ValueError):
+        walk_forward_windows(index, 30, 20, step=10)
+
+
+def test_out_of_sample_equity_is_chained(daily_bars):
+    initial_cash = 100000
+    results = walk_forward(
+        MovingAverageCrossover,
+        {'EURUSD': daily_bars},
+        parameter_grid({'fast_length': [5, 10], 'slow_length': [30, 50]}),
+        in_sample=300,
+        out_of_sample=100,
+        initial_cash=initial_cash,
+        workers=2
+    )
+    windows, equity = results['windows'], results['equity']
+    assert len(windows) == 5
+    assert equity.index.is_monotonic_increasing and equity.index.is_unique
+    assert equity.index[0] == daily_bars.index[300] and equity.index[-1] == daily_bars.index[-1]
+
+    # Each window compounds on the equity the previous one ended with
+    growth = (windows['oos_final_value'] / initial_cash).prod()
+    assert equity.iloc[-1] == pytest.approx(initial_cash * growth)
+    boundaries = pd.DatetimeIndex(windows['out_of_sample_end'])[:-1]
+    ends = equity.loc[boundaries].to_numpy()
+    starts = equity.iloc[equity.index.get_indexer(boundaries) + 1].to_numpy()
+    # No jump at a boundary beyond one bar's move (a window starts flat, the next bar is its first)
+    assert np.all(np.abs(starts / ends - 1.0) < 0.05)
+    assert results['metrics']['final_value'] == pytest.approx(equity.iloc[-1])